@@ -20,7 +20,8 @@ ALLOWED_HOSTS = []
 
 INSTALLED_APPS = [
     'jazzmin',
-    'django.contrib.admin',
+    # django.contrib.admin dengan MyAdminSite sebagai admin.site
+    'core.apps.CoreAdminConfig',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
@@ -31,13 +32,23 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Paling luar agar waktu seluruh middleware lain ikut terukur
+    'core.middleware.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    # File statis disajikan sebelum middleware lain (header cache dari WhiteNoise)
+    'whitenoise.middleware.WhiteNoiseMiddleware',
+    # Sebelum session: hit cache halaman anonim tidak menyentuh session/user/view
+    'core.middleware.AnonymousPageCacheMiddleware',
+    # SessionMiddleware Django + session kurir terpisah (core.sessions)
+    'core.sessions.RoutedSessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.ActorMiddleware',
+    'core.middleware.ProfilerMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.QueryDetectorMiddleware',
 ]
 
 ROOT_URLCONF = 'TPL.urls'
@@ -46,8 +57,16 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],  # opsional kalau kamu punya template global
-        'APP_DIRS': True,  # penting! agar Django cari templates di setiap app
+        # Template dikompilasi sekali per proses (cached loader) lalu dipakai
+        # ulang; loader app_directories menggantikan APP_DIRS=True. Dengan
+        # DEBUG, perubahan file template tetap terbaca ulang oleh autoreload.
         'OPTIONS': {
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
@@ -68,6 +87,12 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # Kunci tulis diambil di awal transaksi: tanpa ini update status
+            # kurir yang bersamaan gagal "database is locked" (lihat bench_http)
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+        },
     }
 }
 
@@ -121,10 +146,141 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
+# Hasil `manage.py build_static` (collectstatic), disajikan oleh WhiteNoise
+STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+# Dari static/ hanya file yang dirujuk template yang dikumpulkan (core.static_assets)
+STATICFILES_FINDERS = [
+    'core.static_assets.ReferencedFilesFinder',
+    'django.contrib.staticfiles.finders.AppDirectoriesFinder',
+]
+# Produksi: nama file ber-hash (cache 10 tahun, immutable) + salinan .gz
+# (dan .br bila paket Brotli terpasang) yang dibuat saat collectstatic.
+# Saat DEBUG dan test, file disajikan langsung tanpa manifest.
+STATIC_STORAGE_BACKEND = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage' if DEBUG else STATIC_STORAGE_BACKEND,
+    },
+}
+# Sama dengan default WhiteNoise, tetapi ditetapkan saat settings dimuat: test
+# runner mematikan DEBUG saat berjalan, dan tanpa ini WhiteNoise memindai
+# STATIC_ROOT yang belum dibangun.
+WHITENOISE_AUTOREFRESH = DEBUG
 
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Foto upload diproses worker run_jobs (core/images.py): sisi terpanjang
+# foto dan thumbnail (piksel), format hasil ('WEBP' atau 'JPEG') dan kualitasnya
+IMAGE_MAX_SIZE = 1600
+IMAGE_THUMB_SIZE = 320
+IMAGE_FORMAT = 'WEBP'
+IMAGE_QUALITY = 80
+# Upload di atas jumlah piksel ini ditolak worker (kamera ponsel: 12–50 MP)
+IMAGE_MAX_PIXELS = 64_000_000
+
+# Hasil ekspor background job (tidak disajikan publik seperti MEDIA)
+EXPORT_ROOT = os.path.join(BASE_DIR, 'exports')
+# Hasil job yang sama boleh dipakai ulang selama umur ini (detik)
+JOB_RESULT_TTL = 10 * 60
+# Job 'berjalan' tanpa detak worker selama ini (detik) ditandai gagal
+JOB_STALE_TIMEOUT = 15 * 60
+# Total proses untuk merender laporan PDF besar secara paralel (1 = serial);
+# dibagi rata ke job yang berjalan bersamaan di run_jobs --workers
+REPORT_WORKERS = min(4, os.cpu_count() or 1)
+
+# Cache hasil laporan di memori proses (LRU), dibatasi jumlah entri dan ukuran
+REPORT_CACHE_MAX_ENTRIES = 32
+REPORT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+VERSION_CACHE_ALIAS = 'versions'
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Salinan stempel versi data (core.versioning; penghitungnya tabel
+    # VersiData). File di bawah BASE_DIR agar semua proses (worker web,
+    # run_jobs) membaca angka yang sama tanpa query database; cache per proses
+    # (refdata, report_cache) dikunci dengan angka ini. Tanpa kedaluwarsa:
+    # stempel yang hilang dibaca ulang dari database.
+    'versions': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'versions',
+        'TIMEOUT': None,
+    },
+    # Cache session (write-through di depan django_session). Harus terlihat
+    # oleh semua worker web, kalau tidak logout/flush/purge_sessions di satu
+    # worker tidak terlihat di worker lain: file di bawah BASE_DIR untuk satu
+    # server, Redis/Memcached bila web berjalan di beberapa server. LocMem
+    # dengan WEB_WORKERS > 1 ditolak `manage.py check` (core/checks.py).
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'sessions',
+        'OPTIONS': {'MAX_ENTRIES': 50000},
+    },
+    # Halaman publik utuh (AnonymousPageCacheMiddleware) dan fragmen {% cache %}
+    'pages': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'pages',
+    },
+}
+
+# Halaman yang disajikan dari cache untuk pengunjung tanpa session:
+# nama URL -> umur cache (detik)
+PAGE_CACHE_ALIAS = 'pages'
+PAGE_CACHE = {
+    'beranda': 10 * 60,
+}
+
+# Session: baca dari cache, tulis ke cache + database (core.sessions)
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+SESSION_CACHE_ALIAS = 'sessions'
+# Jumlah proses web (gunicorn membaca WEB_CONCURRENCY), untuk system check
+# cache session bersama di core/checks.py
+WEB_WORKERS = int(os.environ.get('WEB_CONCURRENCY', 1))
+# Opsional: engine session sendiri untuk halaman kurir, mis.
+# 'django.contrib.sessions.backends.signed_cookies' (tanpa baca/tulis
+# django_session). Session cookie tidak bisa dicabut dari server: logout
+# hanya menghapus cookie di browser, salinannya tetap sah sampai kedaluwarsa
+# (kurir_required tetap menolak kurir yang dihapus/nonaktif).
+# None = ikut SESSION_ENGINE dan cookie session biasa
+KURIR_SESSION_ENGINE = None
+KURIR_SESSION_COOKIE_NAME = 'kurir_sessionid'
+KURIR_SESSION_PATH = '/kurir/'
+# Ukuran batch manage.py purge_sessions
+SESSION_PURGE_BATCH = 1000
+
+# Deteksi pola N+1 per request (core.middleware.QueryDetectorMiddleware), untuk dev/staging.
+# Bentuk query yang sama >= THRESHOLD kali dalam satu request dilaporkan ke logger
+# "core.querycheck"; dengan STRICT request tersebut gagal dengan NPlusOneError.
+QUERY_DETECTOR_ENABLED = DEBUG
+QUERY_DETECTOR_THRESHOLD = 5
+QUERY_DETECTOR_STRICT = False
+
+# Statistik p50/p95/p99 per nama URL + header Server-Timing (core.middleware.ServerTimingMiddleware).
+# Statistik selalu dicatat (juga di produksi); header hanya dikirim saat DEBUG,
+# ke pengguna staff, atau ke request ber-token (bench_http).
+PERF_TIMING_ENABLED = True
+# Jumlah request terakhir yang disimpan per nama URL
+PERF_STATS_WINDOW = 500
+
+# Sampling profiler untuk request staff berizin core.view_profiler dengan ?_profile=1 / header X-Profile (core.profiling)
+PROFILE_ROOT = os.path.join(BASE_DIR, 'profiles')
+PROFILER_INTERVAL = 0.005  # detik antar sampel
+PROFILER_MAX_FILES = 50
+
+# Log query lambat + EXPLAIN (core.slowlog); None mematikan. Ringkasan: manage.py slow_queries
+SLOW_QUERY_MS = 200
+SLOW_QUERY_LOG = os.path.join(BASE_DIR, 'logs', 'slow_queries.jsonl')
+SLOW_QUERY_LOG_MAX_BYTES = 5 * 1024 * 1024
+SLOW_QUERY_LOG_BACKUPS = 3
+# Hitungan query yang sama ditulis ulang paling sering sekali per interval ini (detik)
+SLOW_QUERY_FLUSH_SECONDS = 60
+
+# Hasil JSON manage.py bench_http (dibandingkan antar commit dengan --compare)
+BENCH_ROOT = os.path.join(BASE_DIR, 'bench')
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -149,6 +305,9 @@ JAZZMIN_SETTINGS = {
         "core.faktur": "fas fa-file-invoice",
         "core.keluhan": "fas fa-exclamation-circle",
     },
+    "topmenu_links": [
+        {"name": "Profiler", "url": "admin:profiler", "permissions": ["core.view_profiler"]},
+    ],
 #    "show_ui_builder":"True",
     "footer": "TPL - Trio Prima Logistik",
    "order_with_respect_to": ["auth", "core.Kecamatan", "core.Kelurahan", "core.Pembeli", "core.Vendor", "core.Kategori", "core.Barang", "core.Kurir", "core.Faktur"],
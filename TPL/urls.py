@@ -9,7 +9,6 @@ urlpatterns = [
     path('', include('core.urls')),
 ]
 
-# Tambahkan ini dengan benar:
+# File statis disajikan WhiteNoiseMiddleware; media hanya saat development
 if settings.DEBUG:
-    urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -1,26 +1,24 @@
 # core/admin.py
 from django.contrib import admin
-from django.contrib.admin import AdminSite
-from django.urls import path
-from django.shortcuts import redirect
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.urls import path, reverse
+from django.shortcuts import redirect, get_object_or_404
+from django.template.response import TemplateResponse
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Group
-from django.db.models import Count
-from django.http import HttpResponse
-
-# 🔹 ReportLab untuk PDF profesional
-from reportlab.lib.pagesizes import landscape, A4
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import (
-    SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-)
-
+from django.core.exceptions import PermissionDenied
+from django.db.models import Q
+from django.db import transaction
+from django.http import FileResponse, Http404, HttpResponse
 from django.utils.html import format_html
 
+from . import jobs, refdata
+from .report_cache import report_cache
+from .versioning import get_version
 from .models import (
     Kecamatan, Kelurahan, Pembeli, Vendor, Kategori, Barang,
-    Faktur, DetailFaktur, Keluhan, Kurir
+    Faktur, DetailFaktur, Keluhan, Kurir, BackgroundJob,
+    StatistikKelurahan, StatistikKecamatan
 )
 
 User = get_user_model()
@@ -51,6 +49,36 @@ def render_action_buttons(app_label, model_name, obj_id):
     )
 
 
+# ==============================================================
+# 🔹 Helper: data referensi dari core.refdata (tanpa query)
+# ==============================================================
+class RefDataFilter(admin.RelatedFieldListFilter):
+    """Filter relasi ke Kecamatan/Kelurahan/Kategori/Barang dengan pilihan dari cache refdata."""
+
+    def field_choices(self, field, request, model_admin):
+        return refdata.choices(refdata.table_for(field.related_model))
+
+
+class RefDataAutocompleteSelect(AutocompleteSelect):
+    """
+    Autocomplete yang merender pilihan terpilih dari cache refdata.
+
+    AutocompleteSelect bawaan menjalankan satu query per widget untuk label
+    nilai terpilih, jadi inline dengan N baris = N query.
+    """
+
+    def optgroups(self, name, value, attr=None):
+        table = refdata.table_for(self.field.remote_field.model)
+        options = []
+        if not self.is_required and not self.allow_multiple_selected:
+            options.append(self.create_option(name, "", "", False, 0))
+        for selected in value:
+            row = refdata.get(table, selected)
+            if row is not None:
+                options.append(self.create_option(name, row.pk, str(row), True, len(options)))
+        return [(None, options, 0)]
+
+
 # ==============================================================
 # =================== KURIR ===================
 # ==============================================================
@@ -85,53 +113,35 @@ class KecamatanAdmin(admin.ModelAdmin):
 @admin.register(Kelurahan)
 class KelurahanAdmin(admin.ModelAdmin):
     list_display = ('id_kelurahan', 'nama_kelurahan', 'kode_pos', 'kecamatan', 'actions_column')
-    list_filter = ('kecamatan',)
+    list_filter = (('kecamatan', RefDataFilter),)
     search_fields = ('nama_kelurahan', 'kode_pos')
     actions = ["export_kelurahan_terbanyak"]
 
+    def get_queryset(self, request):
+        # __str__ kelurahan memakai nama kecamatan (juga untuk autocomplete)
+        return super().get_queryset(request).select_related('kecamatan')
+
     def actions_column(self, obj):
         return render_action_buttons('core', 'kelurahan', obj.pk)
     actions_column.short_description = 'Actions'
 
     def export_kelurahan_terbanyak(self, request, queryset):
-        response = HttpResponse(content_type="application/pdf")
+        # Laporan dikunci dengan versi data; selama data belum berubah,
+        # PDF yang sama langsung dikirim dari cache tanpa query agregat.
+        versi = get_version("laporan_wilayah")
+        cache_key = ("laporan_kelurahan_pdf", versi)
+        pdf = report_cache.get(cache_key)
+
+        if pdf is None:
+            job = jobs.enqueue("laporan_kelurahan_pdf", {"versi": versi}, user=request.user)
+            if job.status != "selesai":
+                return redirect("admin:core_backgroundjob_status", job.pk)
+            with job.hasil.open("rb") as f:
+                pdf = f.read()
+            report_cache.set(cache_key, pdf)
+
+        response = HttpResponse(pdf, content_type="application/pdf")
         response["Content-Disposition"] = "attachment; filename=laporan_kelurahan.pdf"
-
-        doc = SimpleDocTemplate(response, pagesize=A4,
-                                leftMargin=40, rightMargin=40, topMargin=40, bottomMargin=60)
-        styles = getSampleStyleSheet()
-        elements = []
-        title_style = ParagraphStyle(name="Title", fontSize=16, alignment=1, spaceAfter=20, leading=20)
-        elements.append(Paragraph("LAPORAN DATA KELURAHAN TRIO PRIMA LOGISTIK", title_style))
-        elements.append(Spacer(1, 12))
-
-        data = (
-            Kelurahan.objects
-            .annotate(total_pengiriman=Count("pembeli__faktur"))
-            .filter(total_pengiriman__gt=0)
-            .order_by("-total_pengiriman")
-        )
-        table_data = [["No", "Nama Kelurahan", "Kecamatan", "Kode Pos", "Total Pengiriman"]]
-        for i, k in enumerate(data, start=1):
-            table_data.append([str(i), k.nama_kelurahan, k.kecamatan.nama_kecamatan, k.kode_pos, str(k.total_pengiriman)])
-
-        table = Table(table_data, repeatRows=1, colWidths=[30, 120, 120, 80, 100])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor("#203864")),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('GRID', (0, 0), (-1, -1), 0.25, colors.grey),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.whitesmoke, colors.lightgrey])
-        ]))
-        elements.append(table)
-        elements.append(Spacer(1, 30))
-        elements.append(Paragraph("Mengetahui,", ParagraphStyle(name="left", alignment=2, fontSize=11)))
-        elements.append(Spacer(1, 10))
-        elements.append(Paragraph("<b>Pimpinan Trio Prima Logistik</b>", ParagraphStyle(name="center", alignment=2, fontSize=11)))
-        elements.append(Spacer(1, 40))
-        elements.append(Paragraph("................................................", ParagraphStyle(name="center", alignment=2)))
-        doc.build(elements)
         return response
 
     export_kelurahan_terbanyak.short_description = "Cetak Laporan Kelurahan (PDF)"
@@ -143,7 +153,8 @@ class KelurahanAdmin(admin.ModelAdmin):
 @admin.register(Pembeli)
 class PembeliAdmin(admin.ModelAdmin):
     list_display = ('id_pembeli', 'nama', 'no_hp', 'kelurahan', 'actions_column')
-    list_filter = ('kelurahan',)
+    list_select_related = ('kelurahan__kecamatan',)
+    list_filter = (('kelurahan', RefDataFilter),)
     search_fields = ('nama', 'no_hp', 'alamat')
 
     def actions_column(self, obj):
@@ -183,7 +194,7 @@ class KategoriAdmin(admin.ModelAdmin):
 @admin.register(Barang)
 class BarangAdmin(admin.ModelAdmin):
     list_display = ('id_barang', 'nama_barang', 'harga_barang', 'kategori', 'actions_column')
-    list_filter = ('kategori',)
+    list_filter = (('kategori', RefDataFilter),)
     search_fields = ('nama_barang',)
 
     def actions_column(self, obj):
@@ -198,6 +209,12 @@ class DetailFakturInline(admin.TabularInline):
     model = DetailFaktur
     extra = 1
     autocomplete_fields = ['barang']
+    readonly_fields = ('harga_satuan', 'subtotal')
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name == 'barang':
+            kwargs['widget'] = RefDataAutocompleteSelect(db_field, self.admin_site, using=kwargs.get('using'))
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
 
 
 # ==============================================================
@@ -213,12 +230,31 @@ class FakturAdmin(admin.ModelAdmin):
     readonly_fields = ('total_faktur',)
     actions = ["export_laporan_faktur_pdf"]
 
+    def get_queryset(self, request):
+        # __str__ faktur memakai nama pembeli (juga untuk autocomplete di Keluhan).
+        # Changelist tidak menambah list_select_related bila queryset sudah
+        # memakai select_related, jadi semua relasi kolom daftar disebut di sini.
+        return super().get_queryset(request).select_related('pembeli', 'vendor', 'kurir')
+
     def formfield_for_foreignkey(self, db_field, request, **kwargs):
         from .models import Kurir
         if db_field.name == "kurir":
             kwargs["queryset"] = Kurir.objects.filter(aktif=True).order_by('nama')
         return super().formfield_for_foreignkey(db_field, request, **kwargs)
 
+    def save_formset(self, request, form, formset, change):
+        if formset.model is not DetailFaktur:
+            return super().save_formset(request, form, formset, change)
+
+        # Simpan detail secara massal agar total faktur tidak dihitung ulang per baris
+        faktur = form.instance
+        instances = formset.save(commit=False)
+        with transaction.atomic():
+            faktur.remove_items(formset.deleted_objects)
+            faktur.update_items([d for d in instances if d.pk is not None])
+            faktur.add_items([d for d in instances if d.pk is None])
+        formset.save_m2m()
+
     def get_kurir_display(self, obj):
         return obj.kurir.nama if obj.kurir else "-"
     get_kurir_display.short_description = 'Kurir'
@@ -226,99 +262,14 @@ class FakturAdmin(admin.ModelAdmin):
     def actions_column(self, obj):
         return render_action_buttons('core', 'faktur', obj.pk)
     actions_column.short_description = 'Actions'
-      # ========== ACTION CETAK PDF (Versi Final) ==========
+    # ========== ACTION CETAK PDF (dijalankan worker run_jobs) ==========
     def export_laporan_faktur_pdf(self, request, queryset):
-        response = HttpResponse(content_type="application/pdf")
-        response["Content-Disposition"] = "attachment; filename=laporan_faktur.pdf"
-
-        # Konfigurasi dokumen PDF
-        doc = SimpleDocTemplate(
-            response,
-            pagesize=landscape(A4),
-            leftMargin=30, rightMargin=30, topMargin=30, bottomMargin=60
-        )
-        styles = getSampleStyleSheet()
-        elements = []
-
-        # Judul laporan
-        title_style = ParagraphStyle(
-            name='CenterTitle',
-            fontSize=16,
-            alignment=1,  # center
-            spaceAfter=20,
-            leading=20
-        )
-        elements.append(Paragraph("LAPORAN DATA FAKTUR TRIO PRIMA LOGISTIK", title_style))
-        elements.append(Spacer(1, 12))
-
-        faktur_list = queryset if queryset else Faktur.objects.all()
-
-        # Header tabel (tanpa kolom ID Faktur)
-        data = [["No", "Pembeli", "Vendor", "Kurir", "Status", "Total", "Barang (Detail Faktur)"]]
-
-        # Isi tabel dinamis
-        for i, faktur in enumerate(faktur_list, start=1):
-            details = ", ".join([
-                f"{d.barang.nama_barang} ({d.jumlah_barang})"
-                for d in faktur.detail.all()
-            ])
-            data.append([
-                str(i),
-                faktur.pembeli.nama,
-                faktur.vendor.nama,
-                faktur.kurir.nama,
-                faktur.status,
-                f"Rp {faktur.total_faktur:,.0f}",
-                details
-            ])
-
-        # Tabel dengan lebar kolom fleksibel
-        table = Table(
-            data,
-            repeatRows=1,
-            colWidths=[30, 90, 90, 90, 80, 70, 250]  # menyesuaikan isi dinamis
-        )
-
-        # Gaya tabel
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor("#1F4E79")),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('FONTSIZE', (0, 1), (-1, -1), 9),
-            ('GRID', (0, 0), (-1, -1), 0.25, colors.grey),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.whitesmoke, colors.lightgrey]),
-            ('LEFTPADDING', (0, 0), (-1, -1), 6),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 6),
-        ]))
-
-        elements.append(table)
-
-        # Spacer sebelum tanda tangan
-        elements.append(Spacer(1, 40))
-
-        # ========== Bagian tanda tangan “Mengetahui” ==========
-        # Gunakan indentasi agar posisi agak ke kanan
-        signature_indent = 400  # jarak dari kiri halaman (sesuaikan bila perlu)
-        para_style_right = ParagraphStyle(
-            name="RightAligned",
-            alignment=0,  # kiri, tapi dengan indent
-            leftIndent=signature_indent,
-            fontSize=11,
-            leading=15
-        )
-
-        elements.append(Paragraph("Mengetahui,", para_style_right))
-        elements.append(Spacer(1, 8))
-        elements.append(Paragraph("<b>Pimpinan Trio Prima Logistik</b>", para_style_right))
-        elements.append(Spacer(1, 40))
-        elements.append(Paragraph("................................................", para_style_right))
-
-        # Bangun dokumen PDF
-        doc.build(elements)
-        return response
+        # Pilihan disimpan sebagai rentang id; versi data ikut di kunci job agar
+        # pilihan yang sama setelah fakturnya berubah tidak memakai PDF lama
+        ids = sorted(queryset.values_list("id_faktur", flat=True))
+        parameter = {"rentang": jobs.id_ranges(ids), "versi": get_version("laporan_faktur")}
+        job = jobs.enqueue("laporan_faktur_pdf", parameter, user=request.user)
+        return redirect("admin:core_backgroundjob_status", job.pk)
 
     export_laporan_faktur_pdf.short_description = "Cetak Laporan Faktur (PDF Rapi)"
 
@@ -327,10 +278,11 @@ class FakturAdmin(admin.ModelAdmin):
 # ==============================================================
 @admin.register(Keluhan)
 class KeluhanAdmin(admin.ModelAdmin):
-    list_display = ('id_keluhan', 'pembeli', 'isi_keluhan', 'foto', 'actions_column')
+    list_display = ('id_keluhan', 'pembeli', 'faktur', 'isi_keluhan', 'foto', 'actions_column')
+    list_select_related = ('pembeli', 'faktur__pembeli')
     list_filter = ('pembeli',)
     search_fields = ('pembeli__nama', 'isi_keluhan')
-    autocomplete_fields = ['pembeli']
+    autocomplete_fields = ['pembeli', 'faktur']
 
     def actions_column(self, obj):
         return render_action_buttons('core', 'keluhan', obj.pk)
@@ -338,24 +290,100 @@ class KeluhanAdmin(admin.ModelAdmin):
 
 
 # ==============================================================
-# =================== CUSTOM ADMIN SITE ===================
+# =================== STATISTIK WILAYAH (rollup) ===================
+# ==============================================================
+class StatistikWilayahAdmin(admin.ModelAdmin):
+    """Dashboard baca-saja; datanya dipelihara oleh core/rollups.py."""
+    ordering = ('-jumlah_faktur',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(StatistikKelurahan)
+class StatistikKelurahanAdmin(StatistikWilayahAdmin):
+    list_display = ('kelurahan', 'jumlah_faktur', 'jumlah_diproses', 'jumlah_selesai', 'jumlah_dibatalkan', 'pendapatan')
+    list_select_related = ('kelurahan__kecamatan',)
+    search_fields = ('kelurahan__nama_kelurahan',)
+
+
+@admin.register(StatistikKecamatan)
+class StatistikKecamatanAdmin(StatistikWilayahAdmin):
+    list_display = ('kecamatan', 'jumlah_faktur', 'jumlah_diproses', 'jumlah_selesai', 'jumlah_dibatalkan', 'pendapatan')
+    list_select_related = ('kecamatan',)
+    search_fields = ('kecamatan__nama_kecamatan',)
+
+
+# ==============================================================
+# =================== BACKGROUND JOB ===================
 # ==============================================================
-class MyAdminSite(AdminSite):
-    site_header = "Dashboard Trio Prima Logistik"
-    site_title = "Manajemen Pengiriman"
-    index_title = "Selamat Datang di Sistem Admin Trio Prima Logistik"
-
-    def index(self, request, extra_context=None):
-        user = request.user
-        if not user.is_authenticated:
-            return super().index(request, extra_context)
-        if user.is_superuser or user.groups.filter(name='Admin').exists():
-            return super().index(request, extra_context)
-        elif user.groups.filter(name='Kurir').exists():
-            return redirect('/admin/core/faktur/')
-        elif user.groups.filter(name='Pimpinan').exists():
-            return redirect('/admin/core/faktur/')
-        return super().index(request, extra_context)
-
-
-admin_site = MyAdminSite(name='myadmin')
+@admin.register(BackgroundJob)
+class BackgroundJobAdmin(admin.ModelAdmin):
+    list_display = ('id_job', 'jenis', 'status', 'progres_display', 'dibuat_oleh', 'dibuat_pada', 'download_column')
+    list_filter = ('status', 'jenis')
+    list_select_related = ('dibuat_oleh',)
+    readonly_fields = [f.name for f in BackgroundJob._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
+    def get_queryset(self, request):
+        # Selain superuser, hanya job milik sendiri dan job sistem (tanpa pembuat)
+        queryset = super().get_queryset(request)
+        if request.user.is_superuser:
+            return queryset
+        return queryset.filter(Q(dibuat_oleh=request.user) | Q(dibuat_oleh__isnull=True))
+
+    def get_job(self, request, job_id):
+        job = get_object_or_404(BackgroundJob, pk=job_id)
+        # Aturan yang sama dengan get_queryset, tanpa query tambahan
+        milik = request.user.is_superuser or job.dibuat_oleh_id in (None, request.user.pk)
+        if not milik or not self.has_view_permission(request, job):
+            raise PermissionDenied
+        return job
+
+    def get_urls(self):
+        urls = [
+            path('<int:job_id>/status/', self.admin_site.admin_view(self.status_view),
+                 name='core_backgroundjob_status'),
+            path('<int:job_id>/download/', self.admin_site.admin_view(self.download_view),
+                 name='core_backgroundjob_download'),
+        ]
+        return urls + super().get_urls()
+
+    def status_view(self, request, job_id):
+        job = self.get_job(request, job_id)
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': f"Status Job #{job.pk}",
+            'job': job,
+        }
+        return TemplateResponse(request, 'admin/core/backgroundjob/status.html', context)
+
+    def download_view(self, request, job_id):
+        job = self.get_job(request, job_id)
+        if job.status != 'selesai' or not job.hasil:
+            raise Http404("File hasil tidak ditemukan.")
+        filename = job.hasil.name.rsplit('/', 1)[-1]
+        return FileResponse(job.hasil.open('rb'), as_attachment=True, filename=filename)
+
+    def progres_display(self, obj):
+        return f"{obj.persen}%"
+    progres_display.short_description = 'Progres'
+
+    def download_column(self, obj):
+        if obj.status == 'selesai' and obj.hasil:
+            return format_html('<a href="{}">Download</a>', reverse('admin:core_backgroundjob_download', args=[obj.pk]))
+        return format_html('<a href="{}">Status</a>', reverse('admin:core_backgroundjob_status', args=[obj.pk]))
+    download_column.short_description = 'Hasil'
+
+
+# MyAdminSite (core/sites.py) adalah admin.site, dipasang lewat CoreAdminConfig
+admin_site = admin.site
@@ -1,4 +1,12 @@
 from django.apps import AppConfig
+from django.contrib.admin import apps as admin_apps
+from django.db.models.signals import post_migrate
+
+
+class CoreAdminConfig(admin_apps.AdminConfig):
+    """django.contrib.admin dengan MyAdminSite sebagai admin.site."""
+    default = False  # 'core' tetap memakai CoreConfig
+    default_site = 'core.sites.MyAdminSite'
 
 
 class CoreConfig(AppConfig):
@@ -7,56 +15,16 @@ class CoreConfig(AppConfig):
 
     def ready(self):
         """
-        Buat otomatis:
-        - Data dummy Kurir (kurir1, kurir2)
-        - Group 'Pimpinan' dengan user 'pimpinan1'
-        """
-        from django.db.utils import OperationalError, ProgrammingError
-
-        try:
-            from django.contrib.auth import get_user_model
-            from django.contrib.auth.models import Group, Permission
-            from django.contrib.contenttypes.models import ContentType
-            from .models import Faktur, Kurir  # pastikan Kurir sudah ada di models.py
-
-            User = get_user_model()
-            content_type = ContentType.objects.get_for_model(Faktur)
+        Hanya mendaftarkan hook; tidak boleh menyentuh database karena
+        dijalankan di setiap proses (worker, manage.py, test).
 
-            # ======================================================
-            # GROUP DAN USER UNTUK PIMPINAN
-            # ======================================================
-            pimpinan_group, _ = Group.objects.get_or_create(name='Pimpinan')
-            pimpinan_perms = Permission.objects.filter(
-                content_type=content_type,
-                codename__in=['view_faktur']
-            )
-            pimpinan_group.permissions.set(pimpinan_perms)
-
-            # Buat user pimpinan
-            pimpinan1, created = User.objects.get_or_create(username='pimpinan1')
-            if created:
-                pimpinan1.set_password('12345')
-                pimpinan1.is_staff = True
-                pimpinan1.save()
-                pimpinan1.groups.add(pimpinan_group)
-
-            # ======================================================
-            # DATA DUMMY KURIR (masuk ke model Kurir, bukan User)
-            # ======================================================
-            dummy_kurirs = [
-                {'nama': 'Kurir 1', 'no_hp': '081234567890', 'email': 'kurir1@example.com'},
-                {'nama': 'Kurir 2', 'no_hp': '089876543210', 'email': 'kurir2@example.com'},
-            ]
-
-            for data in dummy_kurirs:
-                Kurir.objects.get_or_create(
-                    nama=data['nama'],
-                    defaults={
-                        'no_hp': data['no_hp'],
-                        'email': data['email']
-                    }
-                )
-
-        except (OperationalError, ProgrammingError):
-            # Dijalankan saat awal migrate, tabel belum siap
-            pass
+        Data awal (group Pimpinan, user pimpinan1, kurir dummy) dibuat oleh
+        core.provisioning setelah `manage.py migrate`.
+        """
+        from . import checks, signals  # noqa: F401  (daftarkan system check dan receiver sinyal)
+        from . import provisioning, slowlog
+        slowlog.install()
+        post_migrate.connect(
+            provisioning.post_migrate_handler, sender=self,
+            dispatch_uid="core_provisioning",
+        )
@@ -0,0 +1,41 @@
+# core/checks.py
+"""
+System check (`manage.py check`, juga dijalankan runserver/migrate) untuk
+konfigurasi yang hanya benar dengan satu proses.
+"""
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+# Engine session yang membaca session dari cache
+CACHE_SESSION_ENGINES = {
+    'django.contrib.sessions.backends.cache',
+    'django.contrib.sessions.backends.cached_db',
+}
+PROCESS_LOCAL_CACHES = {
+    'django.core.cache.backends.locmem.LocMemCache',
+}
+
+
+@register(Tags.caches)
+def check_session_cache_shared(app_configs, **kwargs):
+    """
+    Cache session per proses dengan beberapa worker web ditolak.
+
+    Logout, flush, dan purge_sessions di satu worker hanya menghapus salinan
+    di proses itu; worker lain tetap menerima session yang sudah dicabut
+    sampai entri cache-nya kedaluwarsa.
+    """
+    engines = {settings.SESSION_ENGINE, getattr(settings, 'KURIR_SESSION_ENGINE', None)}
+    if engines.isdisjoint(CACHE_SESSION_ENGINES) or getattr(settings, 'WEB_WORKERS', 1) <= 1:
+        return []
+    alias = settings.SESSION_CACHE_ALIAS
+    backend = settings.CACHES.get(alias, {}).get('BACKEND')
+    if backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [Error(
+        f"Cache session '{alias}' ({backend}) hanya berlaku per proses, "
+        f"sedangkan WEB_WORKERS = {settings.WEB_WORKERS}.",
+        hint=f"Arahkan CACHES['{alias}'] ke backend bersama (file, Redis, Memcached) "
+             "atau pakai SESSION_ENGINE 'django.contrib.sessions.backends.db'.",
+        id='core.E001',
+    )]
@@ -0,0 +1,197 @@
+# core/datagen.py
+"""
+Generator data sintetis berskala besar untuk benchmark (`manage.py seed --scale N`).
+
+- Semua baris dibuat dengan bulk_create per batch, masing-masing dalam
+  transaksinya sendiri; tidak ada save() per baris sehingga sinyal dan
+  rollup per faktur dilewati, lalu rollup dihitung ulang sekali di akhir.
+- RNG deterministik (random.Random(seed)): seed yang sama menghasilkan
+  dataset yang sama, sehingga hasil benchmark antar commit bisa dibandingkan.
+- Hash password dihitung sekali dan dipakai ulang untuk semua akun.
+
+Akun benchmark dapat ditebak: `bench_email("pembeli", 0)` ... dengan password
+BENCH_PASSWORD (kurir memakai password teks biasa, seperti login kurir).
+"""
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from .models import (
+    Barang, DetailFaktur, Faktur, Kategori, Kecamatan, Kelurahan, Keluhan, Kurir,
+    Pembeli, Vendor,
+)
+from .rollups import rebuild_rollups
+from .versioning import bump_version
+
+BENCH_PASSWORD = "bench123"
+BATCH_SIZE = 5000
+
+KECAMATAN = ["Oebobo", "Kelapa Lima", "Maulafa", "Alak", "Kota Raja", "Kota Lama"]
+KATEGORI = ["Air Galon", "Minuman", "Makanan", "Sembako", "Kebersihan", "Lainnya"]
+NAMA_DEPAN = ["Andi", "Budi", "Citra", "Dewi", "Eka", "Fajar", "Gita", "Hendra", "Indah", "Joko",
+              "Kevin", "Lina", "Maria", "Nanda", "Oktavia", "Putra", "Rina", "Sinta", "Theo", "Yohanes"]
+NAMA_BELAKANG = ["Bria", "Ndun", "Lay", "Manafe", "Tallo", "Fanggidae", "Pello", "Riwu", "Kana", "Dethan"]
+
+# Sebaran status: faktur lama hampir semua selesai, antrian terbaru masih diproses
+STATUS_LAMA = (["selesai"] * 92) + (["dibatalkan"] * 5) + (["diproses"] * 3)
+STATUS_BARU = (["diproses"] * 70) + (["selesai"] * 25) + (["dibatalkan"] * 5)
+PORSI_BARU = 0.05
+RASIO_KELUHAN = 0.02
+
+
+def bench_email(role, index):
+    return f"{role}{index}@bench.tpl"
+
+
+def plan(scale):
+    """Jumlah baris per tabel untuk `scale` faktur."""
+    return {
+        "kecamatan": len(KECAMATAN),
+        "kelurahan_per_kecamatan": 8,
+        "pembeli": max(10, scale // 20),
+        "vendor": max(3, scale // 2000),
+        "kurir": max(2, scale // 4000),
+        "barang": 250,
+        "faktur": scale,
+    }
+
+
+class Generator:
+    def __init__(self, scale, seed=42, batch_size=BATCH_SIZE, log=None):
+        self.scale = scale
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.log = log or (lambda message: None)
+        self.plan = plan(scale)
+        self.password_hash = make_password(BENCH_PASSWORD)
+        self.counts = {}
+
+    # ---------- util ----------
+    def _bulk(self, model, objs):
+        created = []
+        for start in range(0, len(objs), self.batch_size):
+            with transaction.atomic():
+                created += model.objects.bulk_create(objs[start:start + self.batch_size])
+        self.counts[model.__name__] = self.counts.get(model.__name__, 0) + len(created)
+        return created
+
+    def _nama(self):
+        return f"{self.rng.choice(NAMA_DEPAN)} {self.rng.choice(NAMA_BELAKANG)}"
+
+    def _skewed_weights(self, n, alpha=1.2):
+        # Sebaran berekor panjang: sebagian kecil pelanggan/wilayah menyumbang banyak faktur
+        return [self.rng.paretovariate(alpha) for _ in range(n)]
+
+    # ---------- wilayah & master ----------
+    def wilayah(self):
+        kecamatan = self._bulk(Kecamatan, [Kecamatan(nama_kecamatan=n) for n in KECAMATAN])
+        per = self.plan["kelurahan_per_kecamatan"]
+        return self._bulk(Kelurahan, [
+            Kelurahan(nama_kelurahan=f"Kelurahan {k.nama_kecamatan} {i + 1}",
+                      kode_pos=f"851{k.pk % 10}{i}", kecamatan=k)
+            for k in kecamatan for i in range(per)
+        ])
+
+    def pembeli(self, kelurahan):
+        weights = self._skewed_weights(len(kelurahan))
+        pilihan = self.rng.choices(kelurahan, weights=weights, k=self.plan["pembeli"])
+        return self._bulk(Pembeli, [
+            Pembeli(nama=self._nama(), email=bench_email("pembeli", i), password=self.password_hash,
+                    alamat=f"Jl. Bench No. {i}", no_hp=f"0812{i:08d}", kelurahan=kel)
+            for i, kel in enumerate(pilihan)
+        ])
+
+    def vendor(self):
+        return self._bulk(Vendor, [
+            Vendor(nama=f"Vendor Bench {i}", email=bench_email("vendor", i), password=self.password_hash,
+                   alamat=f"Gudang {i}", no_hp=f"0813{i:08d}")
+            for i in range(self.plan["vendor"])
+        ])
+
+    def kurir(self):
+        return self._bulk(Kurir, [
+            Kurir(nama=f"Kurir Bench {i}", email=bench_email("kurir", i), password=BENCH_PASSWORD,
+                  no_hp=f"0814{i:08d}", aktif=True)
+            for i in range(self.plan["kurir"])
+        ])
+
+    def barang(self):
+        kategori = self._bulk(Kategori, [Kategori(nama=n) for n in KATEGORI])
+        items = []
+        for i in range(self.plan["barang"]):
+            # Harga log-normal dibulatkan ke Rp500: banyak barang murah, sedikit yang mahal
+            harga = max(2000, round(self.rng.lognormvariate(10, 0.8) / 500) * 500)
+            items.append(Barang(nama_barang=f"Barang {i}", harga_barang=Decimal(harga),
+                                kategori=self.rng.choice(kategori)))
+        return self._bulk(Barang, items)
+
+    # ---------- transaksi ----------
+    def faktur(self, pembeli, vendor, kurir, barang):
+        rng = self.rng
+        total = self.plan["faktur"]
+        batas_baru = int(total * (1 - PORSI_BARU))
+        pembeli_weights = self._skewed_weights(len(pembeli))
+        barang_weights = self._skewed_weights(len(barang), alpha=1.5)
+        now = timezone.now()
+
+        for start in range(0, total, self.batch_size):
+            size = min(self.batch_size, total - start)
+            pembeli_batch = rng.choices(pembeli, weights=pembeli_weights, k=size)
+            fakturs, lines = [], []
+            for n in range(size):
+                index = start + n
+                items = []
+                jumlah_total = Decimal("0.00")
+                for item in rng.choices(barang, weights=barang_weights, k=rng.randint(1, 6)):
+                    qty = rng.randint(1, 10)
+                    subtotal = item.harga_barang * qty
+                    jumlah_total += subtotal
+                    items.append(DetailFaktur(barang=item, jumlah_barang=qty,
+                                              harga_satuan=item.harga_barang, subtotal=subtotal))
+                status = rng.choice(STATUS_BARU if index >= batas_baru else STATUS_LAMA)
+                fakturs.append(Faktur(
+                    total_faktur=jumlah_total, status=status,
+                    berat=Decimal(rng.randint(50, 3000)) / 100, koli=rng.randint(1, 12),
+                    pembeli=pembeli_batch[n], vendor=rng.choice(vendor), kurir=rng.choice(kurir),
+                ))
+                lines.append(items)
+
+            with transaction.atomic():
+                fakturs = Faktur.objects.bulk_create(fakturs)
+                details = []
+                for faktur, items in zip(fakturs, lines):
+                    for detail in items:
+                        detail.faktur = faktur
+                        details.append(detail)
+                DetailFaktur.objects.bulk_create(details, batch_size=self.batch_size)
+                keluhan = [
+                    Keluhan(pembeli_id=f.pembeli_id, faktur=f,
+                            isi_keluhan=rng.choice(["Pengiriman terlambat", "Galon bocor",
+                                                    "Barang kurang", "Kurir tidak ramah"]),
+                            tanggal=now - timedelta(minutes=rng.randint(0, 365 * 24 * 60)))
+                    for f in fakturs if rng.random() < RASIO_KELUHAN
+                ]
+                Keluhan.objects.bulk_create(keluhan)
+
+            for model, added in ((Faktur, len(fakturs)), (DetailFaktur, len(details)), (Keluhan, len(keluhan))):
+                self.counts[model.__name__] = self.counts.get(model.__name__, 0) + added
+            self.log(f"  faktur {start + size:,}/{total:,}")
+
+    def run(self):
+        kelurahan = self.wilayah()
+        pembeli = self.pembeli(kelurahan)
+        vendor = self.vendor()
+        kurir = self.kurir()
+        barang = self.barang()
+        self.log(f"Master data selesai: {len(pembeli):,} pembeli, {len(vendor)} vendor, {len(kurir)} kurir")
+        self.faktur(pembeli, vendor, kurir, barang)
+
+        # bulk_create melewati save()/sinyal: hitung ulang turunan sekali di akhir
+        # rebuild_rollups sudah menaikkan versi "laporan_wilayah"
+        rebuild_rollups()
+        bump_version("refdata")
+        return self.counts
@@ -1,5 +1,5 @@
 from django import forms
-from . import models
+from . import models, refdata
 
 class LoginPembeliForm(forms.Form):
     email = forms.EmailField(label="Email", widget=forms.EmailInput(attrs={
@@ -24,8 +24,8 @@ class KeluhanForm(forms.ModelForm):
 
     class Meta:
         model = models.Keluhan
-        # Hapus 'faktur' dari daftar fields, field lainnya tetap
-        fields = ['isi_keluhan', 'foto']
+        # 'faktur' memakai ModelChoiceField di atas (queryset diisi oleh view)
+        fields = ['faktur', 'isi_keluhan', 'foto']
         widgets = {
             'isi_keluhan': forms.Textarea(attrs={'class': 'form-control', 'rows': 4}),
             'foto': forms.ClearableFileInput(attrs={'class': 'form-control'}),
@@ -62,6 +62,13 @@ class PembeliRegisterForm(forms.ModelForm):
             'kelurahan': forms.Select(attrs={'class': 'form-select'}),
         }
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Pilihan dirender dari cache data referensi (tanpa query); queryset
+        # field tetap dipakai untuk validasi nilai yang dikirim
+        kelurahan = self.fields['kelurahan']
+        kelurahan.choices = [('', kelurahan.empty_label), *refdata.choices('kelurahan')]
+
     def clean(self):
         cleaned_data = super().clean()
         password = cleaned_data.get('password')
@@ -0,0 +1,139 @@
+# core/images.py
+"""
+Pipeline foto upload (Faktur.foto_pengiriman, Keluhan.foto).
+
+Foto kamera ponsel (3–8 MB, orientasi disimpan di EXIF) disimpan apa adanya
+saat upload agar request tetap cepat. post_save (core/signals.py) lalu
+memasukkan job "proses_foto" ke antrian, dan worker `run_jobs`:
+- memutar foto sesuai orientasi EXIF lalu membuang semua metadata (EXIF/GPS),
+- menyimpan ulang sebagai IMAGE_FORMAT dengan sisi terpanjang IMAGE_MAX_SIZE,
+- membuat thumbnail IMAGE_THUMB_SIZE untuk daftar, di <folder>/thumbs/,
+- menghapus file asli bila tidak ada baris lain yang masih memakainya.
+
+Pillow (modul berat, lihat bench_startup.HEAVY_MODULES) hanya diimpor di
+dalam fungsi yang dijalankan worker.
+"""
+import io
+import posixpath
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+
+# nama model -> (field foto, field thumbnail)
+PHOTO_FIELDS = {
+    "faktur": ("foto_pengiriman", "foto_pengiriman_thumb"),
+    "keluhan": ("foto", "foto_thumb"),
+}
+
+EXTENSIONS = {"WEBP": "webp", "JPEG": "jpg"}
+
+
+def thumb_name(name):
+    """Nama thumbnail untuk foto yang sudah diproses: <folder>/thumbs/<nama file>."""
+    folder, filename = posixpath.split(name)
+    return posixpath.join(folder, "thumbs", filename)
+
+
+def pending_job(instance):
+    """
+    Parameter job "proses_foto" bila foto instance belum diproses, selain itu None.
+
+    Foto dianggap sudah diproses bila thumbnail-nya bernama thumb_name(foto),
+    jadi cukup perbandingan string (tanpa query) di setiap save().
+    """
+    model_name = instance._meta.model_name
+    field, thumb_field = PHOTO_FIELDS[model_name]
+    photo = getattr(instance, field)
+    if not photo or getattr(instance, thumb_field).name == thumb_name(photo.name):
+        return None
+    return {"model": model_name, "pk": instance.pk, "foto": photo.name}
+
+
+def referenced(name):
+    """True bila masih ada Faktur/Keluhan yang fotonya menunjuk ke file `name`."""
+    return any(
+        apps.get_model("core", model_name).objects.filter(**{field: name}).exists()
+        for model_name, (field, _) in PHOTO_FIELDS.items()
+    )
+
+
+# ==============================================================
+# 🔹 Dijalankan di worker (run_jobs)
+# ==============================================================
+def encode(source):
+    """File gambar -> (bytes foto, bytes thumbnail) tanpa metadata, sudah diputar."""
+    from PIL import Image, ImageOps
+
+    image_format = settings.IMAGE_FORMAT
+    max_size = settings.IMAGE_MAX_SIZE
+    # Batas dekompresi Pillow ditetapkan sendiri (bawaan: hanya peringatan
+    # sampai ~179 MP); gambar di atas batas ditolak sebelum didekode
+    Image.MAX_IMAGE_PIXELS = settings.IMAGE_MAX_PIXELS
+    with Image.open(source) as original:
+        if original.width * original.height > settings.IMAGE_MAX_PIXELS:
+            raise ValueError(
+                f"Gambar {original.width}x{original.height} melebihi IMAGE_MAX_PIXELS "
+                f"({settings.IMAGE_MAX_PIXELS:,} piksel)"
+            )
+        # JPEG: dekode langsung pada skala yang lebih kecil (jauh lebih cepat
+        # untuk foto 12 MP daripada dekode penuh lalu diperkecil)
+        original.draft("RGB", (max_size, max_size))
+        image = ImageOps.exif_transpose(original)
+
+    has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+    image = image.convert("RGBA" if has_alpha and image_format == "WEBP" else "RGB")
+    image.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+    full = _save(image, image_format)
+    image.thumbnail((settings.IMAGE_THUMB_SIZE, settings.IMAGE_THUMB_SIZE), Image.Resampling.LANCZOS)
+    return full, _save(image, image_format)
+
+
+def _save(image, image_format):
+    # Tanpa argumen exif/icc_profile: metadata foto asli tidak ikut tersimpan
+    out = io.BytesIO()
+    image.save(out, image_format, quality=settings.IMAGE_QUALITY, optimize=True)
+    return out.getvalue()
+
+
+def process_photo(model_name, pk, name):
+    """
+    Proses satu foto dan arahkan field model ke hasilnya.
+
+    Mengembalikan False (dan membuang hasil) bila foto sudah diganti atau
+    dihapus sebelum job selesai.
+    """
+    model = apps.get_model("core", model_name)
+    field, thumb_field = PHOTO_FIELDS[model_name]
+    storage = model._meta.get_field(field).storage
+    if not storage.exists(name):
+        return False
+
+    with storage.open(name, "rb") as source:
+        full, thumb = encode(source)
+
+    stem = posixpath.splitext(name)[0]
+    full_name = storage.save(f"{stem}.{EXTENSIONS[settings.IMAGE_FORMAT]}", ContentFile(full))
+    new_thumb = thumb_name(full_name)
+    if storage.exists(new_thumb):
+        # Sisa dari foto lama dengan nama yang sama; nama thumbnail harus persis
+        storage.delete(new_thumb)
+    storage.save(new_thumb, ContentFile(thumb))
+
+    old_thumb = model.objects.filter(pk=pk).values_list(thumb_field, flat=True).first()
+    # UPDATE bersyarat (tanpa save()/sinyal): hanya bila foto belum diganti
+    updated = model.objects.filter(pk=pk, **{field: name}).update(
+        **{field: full_name, thumb_field: new_thumb}
+    )
+    if not updated:
+        storage.delete(full_name)
+        storage.delete(new_thumb)
+        return False
+
+    # File yang sama bisa dipakai beberapa baris (mis. foto default dari
+    # manage.py seed); baris lain diproses job-nya sendiri dari file ini
+    if not referenced(name):
+        storage.delete(name)
+    if old_thumb and old_thumb != new_thumb:
+        storage.delete(old_thumb)
+    return True
@@ -0,0 +1,321 @@
+# core/instrumentation.py
+"""
+Alat bantu observasi query untuk lingkungan dev/staging.
+
+- `fingerprint_sql` menormalkan SQL menjadi "bentuk" query (literal, parameter
+  dan daftar IN diganti ?), sehingga query yang sama dengan nilai berbeda
+  dikenali sebagai satu kelompok.
+- `QueryDetector` dipasang sebagai execute_wrapper pada koneksi database dan
+  mencatat query yang berulang dengan bentuk sama dalam satu request (pola
+  N+1), lengkap dengan baris template, baris kode, dan saran relasi untuk
+  select_related / prefetch_related.
+- `RequestMetrics` mengukur waktu total, SQL dan render template satu
+  request; `perf_stats` menyimpan jendela bergulir per nama URL untuk
+  persentil p50/p95/p99.
+"""
+import contextvars
+import os
+import re
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connections
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w\"])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%s|\?")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_SPACE = re.compile(r"\s+")
+# WHERE "tabel"."kolom" = ? : pola query relasi yang dimuat satu per satu
+_RELATION_FILTER = re.compile(r'WHERE \(?"(\w+)"\."(\w+)" (?:= \?|IN \(\.\.\.\))')
+
+# Frame alat ini sendiri tidak dilaporkan sebagai lokasi kode
+_INTERNAL_FILES = {__file__} | {
+    os.path.join(os.path.dirname(__file__), name) for name in ("middleware.py", "slowlog.py")
+}
+_TEMPLATE_BASE = os.path.join("django", "template", "base.py")
+_RELATED_DESCRIPTORS = os.path.join("django", "db", "models", "fields", "related_descriptors.py")
+
+
+class NPlusOneError(Exception):
+    """Dilempar pada mode strict bila request memuat pola N+1."""
+
+
+def fingerprint_sql(sql):
+    sql = _STRING.sub("?", sql)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _IN_LIST.sub("IN (...)", sql)
+    return _SPACE.sub(" ", sql).strip()
+
+
+def _project_frame(frame):
+    filename = frame.f_code.co_filename
+    return (
+        filename.startswith(str(settings.BASE_DIR))
+        and "site-packages" not in filename
+        and filename not in _INTERNAL_FILES
+        and os.path.basename(filename) != "manage.py"
+    )
+
+
+def _suggest_from_descriptor(descriptor):
+    """Saran untuk relasi forward (FK / one-to-one) yang dimuat lewat descriptor."""
+    field = getattr(descriptor, "field", None)
+    if field is not None:
+        return f"{field.model.__name__}: select_related('{field.name}')"
+    related = getattr(descriptor, "related", None)
+    if related is not None:
+        return f"{related.model.__name__}: select_related('{related.get_accessor_name()}')"
+    return None
+
+
+def _suggest_from_sql(fingerprint):
+    """Saran untuk relasi reverse yang dimuat per objek: prefetch_related."""
+    match = _RELATION_FILTER.search(fingerprint)
+    if not match:
+        return None
+    table, column = match.groups()
+    for model in apps.get_models():
+        if model._meta.db_table != table:
+            continue
+        for field in model._meta.concrete_fields:
+            if field.column == column and field.is_relation:
+                accessor = field.remote_field.get_accessor_name()
+                if accessor:
+                    return f"{field.related_model.__name__}: prefetch_related('{accessor}')"
+    return None
+
+
+def query_context(frame):
+    """(baris template, baris kode proyek, saran dari descriptor) untuk query yang sedang jalan."""
+    template = code = suggestion = None
+    while frame is not None and not (template and code and suggestion):
+        filename = frame.f_code.co_filename
+        if suggestion is None and filename.endswith(_RELATED_DESCRIPTORS):
+            suggestion = _suggest_from_descriptor(frame.f_locals.get("self"))
+        elif (template is None and filename.endswith(_TEMPLATE_BASE)
+              and frame.f_code.co_name == "render_annotated"):
+            node = frame.f_locals.get("self")
+            origin = getattr(node, "origin", None)
+            token = getattr(node, "token", None)
+            if origin is not None and token is not None:
+                template = f"{origin.template_name or origin.name}:{token.lineno}"
+        elif code is None and _project_frame(frame):
+            path = os.path.relpath(frame.f_code.co_filename, settings.BASE_DIR)
+            code = f"{path}:{frame.f_lineno} ({frame.f_code.co_name})"
+        frame = frame.f_back
+    return template, code, suggestion
+
+
+class QueryDetector:
+    """
+    Kumpulkan query per bentuk selama blok `with` aktif.
+
+        with QueryDetector() as detector:
+            ...
+        for temuan in detector.findings(threshold=5):
+            ...
+    """
+
+    def __init__(self):
+        self.counts = {}
+        self.contexts = {}
+        self._stack = None
+
+    def __call__(self, execute, sql, params, many, context):
+        fingerprint = fingerprint_sql(sql)
+        count = self.counts.get(fingerprint, 0) + 1
+        self.counts[fingerprint] = count
+        # Cukup telusuri stack sekali, saat bentuk query ini pertama kali berulang
+        if count == 2:
+            self.contexts[fingerprint] = query_context(sys._getframe(1))
+        return execute(sql, params, many, context)
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stack.close()
+        self._stack = None
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+    def findings(self, threshold):
+        """Daftar dict untuk setiap bentuk query yang dijalankan >= threshold kali."""
+        result = []
+        for fingerprint, count in self.counts.items():
+            if count < threshold:
+                continue
+            template, code, suggestion = self.contexts.get(fingerprint, (None, None, None))
+            result.append({
+                "count": count,
+                "sql": fingerprint,
+                "template": template,
+                "code": code,
+                "suggestion": suggestion or _suggest_from_sql(fingerprint),
+            })
+        return sorted(result, key=lambda item: -item["count"])
+
+
+def format_findings(view, findings):
+    lines = [f"Terdeteksi {len(findings)} pola N+1 di {view}:"]
+    for item in findings:
+        lines.append(f"  {item['count']}x {item['sql'][:300]}")
+        if item["template"]:
+            lines.append(f"      template : {item['template']}")
+        if item["code"]:
+            lines.append(f"      kode     : {item['code']}")
+        if item["suggestion"]:
+            lines.append(f"      saran    : {item['suggestion']}")
+    return "\n".join(lines)
+
+
+# ==============================================================
+# 🔹 Metrik per request (Server-Timing)
+# ==============================================================
+_current_metrics = contextvars.ContextVar("core_request_metrics", default=None)
+_template_timer_lock = threading.Lock()
+_template_timer_installed = False
+
+
+class RequestMetrics:
+    """Akumulasi waktu satu request; dipasang sebagai execute_wrapper saat `with`."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.total_ms = 0.0
+        self.sql_count = 0
+        self.sql_ms = 0.0
+        self.template_ms = 0.0
+        self.upload_bytes = 0
+        self._template_depth = 0
+        self._stack = None
+        self._token = None
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_count += 1
+            self.sql_ms += (time.perf_counter() - start) * 1000
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self))
+        self._token = _current_metrics.set(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        _current_metrics.reset(self._token)
+        self._stack.close()
+        self._stack = None
+        self.total_ms = (time.perf_counter() - self.started) * 1000
+
+    def server_timing(self):
+        metrics = [
+            f"total;dur={self.total_ms:.1f}",
+            f'sql;dur={self.sql_ms:.1f};desc="{self.sql_count} query"',
+            f"tpl;dur={self.template_ms:.1f}",
+        ]
+        if self.upload_bytes:
+            metrics.append(f'upload;desc="{self.upload_bytes} bytes"')
+        return ", ".join(metrics)
+
+
+def install_template_timer():
+    """
+    Bungkus django.template.base.Template.render sekali untuk seluruh proses.
+
+    Hanya render terluar yang dihitung ({% include %} / {% extends %} ada di
+    dalamnya), dan hanya bila ada RequestMetrics aktif di context saat ini.
+    """
+    global _template_timer_installed
+    with _template_timer_lock:
+        if _template_timer_installed:
+            return
+        from django.template.base import Template
+
+        original = Template.render
+
+        def render(self, context):
+            metrics = _current_metrics.get()
+            if metrics is None:
+                return original(self, context)
+            metrics._template_depth += 1
+            start = time.perf_counter()
+            try:
+                return original(self, context)
+            finally:
+                metrics._template_depth -= 1
+                if not metrics._template_depth:
+                    metrics.template_ms += (time.perf_counter() - start) * 1000
+
+        Template.render = render
+        _template_timer_installed = True
+
+
+def percentile(sorted_values, pct):
+    """Persentil nearest-rank dari daftar yang sudah diurutkan."""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+class PerfStats:
+    """Jendela bergulir metrik request per nama URL, aman untuk banyak thread."""
+
+    def __init__(self, window):
+        self.window = window
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, metrics):
+        sample = (metrics.total_ms, metrics.sql_ms, metrics.sql_count,
+                  metrics.template_ms, metrics.upload_bytes)
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.window)
+            samples.append(sample)
+
+    def clear(self):
+        with self._lock:
+            self._samples.clear()
+
+    def snapshot(self):
+        with self._lock:
+            data = {name: list(samples) for name, samples in self._samples.items()}
+
+        result = {}
+        for name, samples in sorted(data.items()):
+            n = len(samples)
+            totals = sorted(s[0] for s in samples)
+            result[name] = {
+                "count": n,
+                "p50_ms": round(percentile(totals, 50), 2),
+                "p95_ms": round(percentile(totals, 95), 2),
+                "p99_ms": round(percentile(totals, 99), 2),
+                "max_ms": round(totals[-1], 2),
+                "avg_sql_ms": round(sum(s[1] for s in samples) / n, 2),
+                "avg_sql_count": round(sum(s[2] for s in samples) / n, 2),
+                "avg_template_ms": round(sum(s[3] for s in samples) / n, 2),
+                "upload_bytes": sum(s[4] for s in samples),
+            }
+        return result
+
+
+perf_stats = PerfStats(getattr(settings, "PERF_STATS_WINDOW", 500))
@@ -0,0 +1,232 @@
+# core/jobs.py
+"""
+Subsistem background job lokal tanpa broker eksternal.
+
+Job disimpan di tabel BackgroundJob. Admin (laporan PDF) dan core/signals.py
+(foto upload, core/images.py) hanya memasukkan job ke antrian (`enqueue`), lalu management command `run_jobs` mengklaim job yang antri dan
+menjalankannya di ProcessPoolExecutor (`run_job`).
+"""
+import hashlib
+import json
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import images
+from .models import BackgroundJob, Faktur
+
+logger = logging.getLogger(__name__)
+
+# Jumlah baris antar update progres ke database
+PROGRESS_EVERY = 200
+
+
+# ==============================================================
+# 🔹 Handler per jenis job
+# ==============================================================
+# core.reports (ReportLab) diimpor di dalam handler: jobs ikut dimuat admin di
+# setiap worker, sedangkan PDF hanya dibuat oleh proses run_jobs.
+def _laporan_faktur_pdf(job, progress):
+    from . import reports
+
+    if "rentang" in job.parameter:
+        ids = expand_ranges(job.parameter["rentang"])
+    else:
+        # Job lama menyimpan daftar id utuh; tanpa pilihan = semua faktur
+        ids = sorted(job.parameter["ids"]) if job.parameter.get("ids") else None
+    total = len(ids) if ids is not None else Faktur.objects.count()
+    progress(0, total)
+    rows = reports.count_rows(reports.faktur_rows(Faktur.objects.all(), ids=ids), progress, every=PROGRESS_EVERY)
+    # REPORT_WORKERS dibagi rata ke semua job yang bisa berjalan bersamaan,
+    # agar pool render di dalam worker run_jobs tidak melipatgandakan jumlah
+    # proses. Laporan kecil tidak sebanding dengan ongkos membuat pool.
+    workers = max(1, settings.REPORT_WORKERS // job.workers)
+    if total <= reports.ROWS_PER_FRAGMENT:
+        workers = 1
+    return "laporan_faktur.pdf", reports.spooled_pdf(
+        lambda out: reports.build_faktur_pdf_parallel(out, rows, workers)
+    )
+
+
+def _laporan_kelurahan_pdf(job, progress):
+    from . import reports
+
+    rows = reports.count_rows(reports.kelurahan_rows(), progress, every=PROGRESS_EVERY)
+    return "laporan_kelurahan.pdf", reports.spooled_pdf(lambda out: reports.build_kelurahan_pdf(out, rows))
+
+
+def _proses_foto(job, progress):
+    # Tanpa file hasil: foto hasil proses langsung menggantikan foto upload
+    progress(0, 1)
+    images.process_photo(job.parameter["model"], job.parameter["pk"], job.parameter["foto"])
+    progress(1)
+
+
+# jenis -> fungsi(job, progress) yang mengembalikan (nama_file, file-like),
+# atau None untuk job tanpa file hasil
+HANDLERS = {
+    "laporan_faktur_pdf": _laporan_faktur_pdf,
+    "laporan_kelurahan_pdf": _laporan_kelurahan_pdf,
+    "proses_foto": _proses_foto,
+}
+
+
+# ==============================================================
+# 🔹 Antrian
+# ==============================================================
+def id_ranges(ids):
+    """
+    Id urut naik -> [[awal, akhir], ...] untuk id yang berurutan.
+
+    Pilihan "pilih semua" di admin berisi puluhan ribu id yang hampir selalu
+    berurutan; disimpan sebagai rentang, parameter job tetap kecil.
+    """
+    ranges = []
+    for pk in ids:
+        if ranges and pk == ranges[-1][1] + 1:
+            ranges[-1][1] = pk
+        else:
+            ranges.append([pk, pk])
+    return ranges
+
+
+def expand_ranges(ranges):
+    return [pk for start, end in ranges for pk in range(start, end + 1)]
+
+
+def job_key(jenis, parameter):
+    payload = json.dumps([jenis, parameter], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def enqueue(jenis, parameter=None, user=None, retry_failed=True):
+    """
+    Masukkan job ke antrian, atau kembalikan job yang sama bila sudah ada.
+
+    Job dengan jenis + parameter + pembuat yang sama dipakai ulang bila masih
+    antri, sedang berjalan, atau sudah selesai dalam JOB_RESULT_TTL terakhir.
+    Job hanya dipakai ulang untuk pembuatnya karena halaman status/download
+    di admin hanya terbuka bagi pembuat job (dan superuser).
+
+    Dengan retry_failed=False, job yang pernah gagal juga dikembalikan (tidak
+    diulang), untuk pemicu otomatis seperti sinyal save yang bisa terpanggil
+    berkali-kali untuk input yang sama.
+    """
+    if jenis not in HANDLERS:
+        raise ValueError(f"Jenis job tidak dikenal: {jenis}")
+    parameter = parameter or {}
+    kunci = job_key(jenis, parameter)
+    if user is not None and not user.is_authenticated:
+        user = None
+
+    batas = timezone.now() - timedelta(seconds=settings.JOB_RESULT_TTL)
+    statuses = ["antri", "berjalan", "selesai"] + ([] if retry_failed else ["gagal"])
+    existing = (
+        BackgroundJob.objects
+        .filter(kunci=kunci, status__in=statuses, dibuat_oleh=user)
+        .order_by("-id_job")
+        .first()
+    )
+    if existing and (existing.status != "selesai" or existing.selesai_pada >= batas):
+        return existing
+
+    return BackgroundJob.objects.create(
+        jenis=jenis,
+        parameter=parameter,
+        kunci=kunci,
+        dibuat_oleh=user,
+    )
+
+
+def fail(job_ids, pesan):
+    """Tandai job yang masih 'berjalan' sebagai gagal; mengembalikan jumlahnya."""
+    return BackgroundJob.objects.filter(pk__in=job_ids, status="berjalan").update(
+        status="gagal", pesan_error=pesan, selesai_pada=timezone.now()
+    )
+
+
+def fail_stale():
+    """
+    Gagalkan job 'berjalan' yang workernya mati (tanpa detak > JOB_STALE_TIMEOUT).
+
+    Job tidak dikembalikan ke antrian: job yang membuat worker crash akan
+    terus mengulang. enqueue() berikutnya membuat job baru.
+
+    Dipanggil di setiap polling, jadi hanya SELECT kecuali ada job macet:
+    UPDATE tanpa syarat akan meminta kunci tulis SQLite di setiap polling dan
+    bertabrakan dengan worker yang sedang membaca/menulis progres.
+    """
+    batas = timezone.now() - timedelta(seconds=settings.JOB_STALE_TIMEOUT)
+    stale = list(
+        BackgroundJob.objects.filter(status="berjalan")
+        .filter(Q(diperbarui_pada__lt=batas) | Q(diperbarui_pada__isnull=True, dibuat_pada__lt=batas))
+        .values_list("id_job", flat=True)
+    )
+    if not stale:
+        return 0
+    return fail(stale, f"Worker berhenti: tidak ada progres selama {settings.JOB_STALE_TIMEOUT} detik.")
+
+
+def claim_next():
+    """Klaim satu job antri tertua; mengembalikan id-nya atau None."""
+    fail_stale()
+    while True:
+        job_id = (
+            BackgroundJob.objects.filter(status="antri")
+            .order_by("id_job")
+            .values_list("id_job", flat=True)
+            .first()
+        )
+        if job_id is None:
+            return None
+        # UPDATE bersyarat: hanya satu worker yang berhasil mengubah status
+        if BackgroundJob.objects.filter(pk=job_id, status="antri").update(
+            status="berjalan", diperbarui_pada=timezone.now()
+        ):
+            return job_id
+
+
+# ==============================================================
+# 🔹 Eksekusi (di proses worker)
+# ==============================================================
+def run_job(job_id, workers=1):
+    """
+    Jalankan satu job yang sudah diklaim dan simpan hasilnya.
+
+    `workers` adalah jumlah job yang bisa berjalan bersamaan (run_jobs
+    --workers); handler membaca nilainya dari `job.workers`.
+    """
+    job = BackgroundJob.objects.get(pk=job_id)
+    job.workers = workers
+    state = {"total": 0}
+
+    def progress(done, total=None):
+        if total is not None:
+            state["total"] = total
+        BackgroundJob.objects.filter(pk=job_id).update(
+            progres=done, total=state["total"], diperbarui_pada=timezone.now()
+        )
+
+    try:
+        result = HANDLERS[job.jenis](job, progress)
+        with transaction.atomic():
+            if result is not None:
+                filename, fileobj = result
+                job.hasil.save(filename, File(fileobj, name=filename), save=False)
+            BackgroundJob.objects.filter(pk=job_id).update(
+                status="selesai", hasil=job.hasil.name, selesai_pada=timezone.now()
+            )
+        if result is not None:
+            fileobj.close()
+    except Exception:
+        logger.exception("Job #%s gagal", job_id)
+        BackgroundJob.objects.filter(pk=job_id).update(
+            status="gagal", pesan_error=traceback.format_exc(), selesai_pada=timezone.now()
+        )
+    return job_id
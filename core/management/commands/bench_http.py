@@ -0,0 +1,434 @@
+import http.cookiejar
+import io
+import json
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core import datagen
+from core.instrumentation import percentile
+from core.middleware import timing_token
+from core.models import Kurir, Pembeli, Vendor
+
+CSRF_RE = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+FAKTUR_LINK_RE = re.compile(r'/kurir/faktur/(\d+)/"')
+FAKTUR_OPTION_RE = re.compile(r'<option value="(\d+)"')
+TIMING_TOTAL_RE = re.compile(r"total;dur=([\d.]+)")
+TIMING_QUERIES_RE = re.compile(r'desc="(\d+) query"')
+
+ROLES = ("kurir", "pembeli", "vendor")
+
+
+class _KeepResponses(urllib.request.HTTPErrorProcessor):
+    """Jangan ikuti redirect dan jangan lempar HTTPError: tiap langkah = satu request."""
+
+    def http_response(self, request, response):
+        return response
+
+    https_response = http_response
+
+
+def _multipart(fields, files):
+    boundary = uuid.uuid4().hex
+    body = io.BytesIO()
+    for name, value in fields.items():
+        body.write(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    for name, (filename, content, content_type) in files.items():
+        body.write(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n".encode()
+        )
+        body.write(content)
+        body.write(b"\r\n")
+    body.write(f"--{boundary}--\r\n".encode())
+    return body.getvalue(), f"multipart/form-data; boundary={boundary}"
+
+
+def _foto_pengiriman():
+    """JPEG seukuran foto ponsel (1280x960, bernoise agar ukuran filenya realistis)."""
+    from PIL import Image
+
+    image = Image.effect_noise((1280, 960), 40).convert("RGB")
+    output = io.BytesIO()
+    image.save(output, "JPEG", quality=85)
+    return output.getvalue()
+
+
+class StepFailed(Exception):
+    pass
+
+
+# ==============================================================
+# 🔹 Pengguna virtual
+# ==============================================================
+class VirtualUser:
+    """Satu klien dengan cookie jar sendiri yang menjalankan alur satu peran berulang kali."""
+
+    def __init__(self, base_url, role, index, rng, results, foto, relogin):
+        self.base_url = base_url.rstrip("/")
+        self.role = role
+        self.email = datagen.bench_email(role, index)
+        self.rng = rng
+        self.results = results
+        self.foto = foto
+        self.relogin = relogin
+        self.cookies = http.cookiejar.CookieJar()
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(self.cookies), _KeepResponses()
+        )
+        self.logged_in = False
+        # Header Server-Timing hanya dikirim ke staff / DEBUG, atau dengan token ini
+        self.timing_token = timing_token()
+
+    # ---------- HTTP ----------
+    def request(self, step, path, data=None, content_type=None, expect=(200,)):
+        url = self.base_url + path
+        headers = {"Referer": url, "X-Server-Timing-Token": self.timing_token}
+        if content_type:
+            headers["Content-Type"] = content_type
+        req = urllib.request.Request(url, data=data, headers=headers)
+        start = time.perf_counter()
+        try:
+            with self.opener.open(req, timeout=60) as response:
+                body = response.read().decode("utf-8", "replace")
+                status = response.status
+                location = response.headers.get("Location", "")
+                timing = response.headers.get("Server-Timing", "")
+        except (urllib.error.URLError, OSError) as exc:
+            self.results.add(step, (time.perf_counter() - start) * 1000, error=str(exc))
+            raise StepFailed(step) from exc
+        elapsed = (time.perf_counter() - start) * 1000
+
+        server_ms = TIMING_TOTAL_RE.search(timing)
+        queries = TIMING_QUERIES_RE.search(timing)
+        error = None if status in expect else f"HTTP {status}"
+        if status == 302 and "login" in location and "login" not in step:
+            error = "sesi hilang (redirect ke login)"
+        self.results.add(
+            step, elapsed, error=error,
+            server_ms=float(server_ms.group(1)) if server_ms else None,
+            queries=int(queries.group(1)) if queries else None,
+        )
+        if error:
+            raise StepFailed(step)
+        return body, location
+
+    def csrf_token(self, html):
+        match = CSRF_RE.search(html)
+        if match:
+            return match.group(1)
+        for cookie in self.cookies:
+            if cookie.name == settings.CSRF_COOKIE_NAME:
+                return cookie.value
+        return ""
+
+    def post(self, step, path, token, fields, files=None, expect=(302,)):
+        fields = dict(fields, csrfmiddlewaretoken=token)
+        if files:
+            data, content_type = _multipart(fields, files)
+        else:
+            data = urllib.parse.urlencode(fields).encode()
+            content_type = "application/x-www-form-urlencoded"
+        return self.request(step, path, data, content_type, expect)
+
+    # ---------- alur ----------
+    def login(self):
+        path = f"/{self.role}/login/"
+        html, _ = self.request(f"{self.role}_login_page", path)
+        _, location = self.post(f"{self.role}_login", path, self.csrf_token(html), {
+            "email": self.email, "password": datagen.BENCH_PASSWORD,
+        })
+        if "login" in location:
+            raise StepFailed(f"{self.role}_login")
+        self.logged_in = True
+
+    def iteration(self):
+        if self.relogin or not self.logged_in:
+            self.cookies.clear()
+            self.login()
+        getattr(self, f"flow_{self.role}")()
+
+    def flow_kurir(self):
+        html, _ = self.request("kurir_dashboard", "/kurir/dashboard/")
+        faktur_ids = FAKTUR_LINK_RE.findall(html)
+        if not faktur_ids:
+            return
+        faktur_id = self.rng.choice(faktur_ids)
+        detail, _ = self.request("kurir_faktur_detail", f"/kurir/faktur/{faktur_id}/")
+        self.post(
+            "kurir_update_status", f"/kurir/faktur/{faktur_id}/update-status/", self.csrf_token(detail),
+            {"status": "selesai"},
+            files={"foto_pengiriman": (f"bukti-{faktur_id}.jpg", self.foto, "image/jpeg")},
+        )
+
+    def flow_pembeli(self):
+        self.request("pembeli_dashboard", "/pembeli/dashboard/")
+        html, _ = self.request("pembeli_keluhan_form", "/pembeli/keluhan/buat/")
+        faktur_ids = FAKTUR_OPTION_RE.findall(html)
+        self.post("pembeli_keluhan_kirim", "/pembeli/keluhan/buat/", self.csrf_token(html), {
+            "faktur": self.rng.choice(faktur_ids) if faktur_ids else "",
+            "isi_keluhan": "Keluhan benchmark: pengiriman terlambat",
+        })
+        self.request("pembeli_keluhan_riwayat", "/pembeli/keluhan/riwayat/")
+
+    def flow_vendor(self):
+        self.request("vendor_dashboard", "/vendor/dashboard/")
+        self.request("vendor_keluhan_laporan", "/vendor/keluhan/laporan/")
+
+    def run(self, stop_at):
+        while time.monotonic() < stop_at:
+            try:
+                self.iteration()
+            except StepFailed:
+                # Mulai ulang dari login agar satu error tidak merusak iterasi berikutnya
+                self.logged_in = False
+
+
+# ==============================================================
+# 🔹 Pengumpulan hasil
+# ==============================================================
+class Results:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.steps = {}
+
+    def add(self, step, elapsed_ms, error=None, server_ms=None, queries=None):
+        with self.lock:
+            item = self.steps.setdefault(step, {"ms": [], "server_ms": [], "queries": [], "errors": {}})
+            item["ms"].append(elapsed_ms)
+            if server_ms is not None:
+                item["server_ms"].append(server_ms)
+            if queries is not None:
+                item["queries"].append(queries)
+            if error:
+                item["errors"][error] = item["errors"].get(error, 0) + 1
+
+    def summary(self, elapsed_s):
+        steps = {}
+        for name, item in sorted(self.steps.items()):
+            ms = sorted(item["ms"])
+            server_ms = sorted(item["server_ms"])
+            steps[name] = {
+                "count": len(ms),
+                "errors": sum(item["errors"].values()),
+                "error_detail": item["errors"],
+                "rps": round(len(ms) / elapsed_s, 2),
+                "mean_ms": round(sum(ms) / len(ms), 1),
+                **{f"p{p}_ms": round(percentile(ms, p), 1) for p in (50, 90, 95, 99)},
+                "max_ms": round(ms[-1], 1),
+                "server_p50_ms": round(percentile(server_ms, 50), 1) if server_ms else None,
+                "server_p95_ms": round(percentile(server_ms, 95), 1) if server_ms else None,
+                "queries_max": max(item["queries"]) if item["queries"] else None,
+            }
+        total = sum(s["count"] for s in steps.values())
+        return {
+            "requests": total,
+            "errors": sum(s["errors"] for s in steps.values()),
+            "throughput_rps": round(total / elapsed_s, 2),
+            "steps": steps,
+        }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, timeout=5,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _parse_mix(value):
+    mix = {}
+    for part in value.split(","):
+        role, _, weight = part.partition("=")
+        role = role.strip()
+        if role not in ROLES:
+            raise CommandError(f"Peran tidak dikenal di --mix: {role!r} (pilihan: {', '.join(ROLES)})")
+        mix[role] = int(weight or 1)
+    return mix
+
+
+def _allocate(mix, concurrency):
+    """Bagi pengguna virtual sesuai bobot (sisa terbesar); tiap peran berbobot dapat minimal satu."""
+    total = sum(mix.values())
+    shares = {role: concurrency * weight / total for role, weight in mix.items()}
+    counts = {role: int(share) for role, share in shares.items()}
+    by_remainder = sorted(mix, key=lambda role: shares[role] - counts[role], reverse=True)
+    for role in by_remainder[:concurrency - sum(counts.values())]:
+        counts[role] += 1
+    for role in mix:
+        if not counts[role] and mix[role] and concurrency >= len(mix):
+            donor = max(counts, key=counts.get)
+            counts[donor] -= 1
+            counts[role] += 1
+    return counts
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark HTTP end-to-end alur kurir, pembeli, dan vendor terhadap server lokal. "
+        "Memakai akun dari `seed --scale N` dan MENGUBAH data (status faktur, keluhan baru): "
+        "jalankan pada database benchmark."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://127.0.0.1:8000", help="Alamat server yang diuji")
+        parser.add_argument("--serve", action="store_true",
+                            help="Jalankan `runserver --noreload` sendiri di port bebas selama benchmark")
+        parser.add_argument("--concurrency", type=int, default=8, help="Jumlah pengguna virtual paralel")
+        parser.add_argument("--duration", type=float, default=30, help="Lama benchmark (detik)")
+        parser.add_argument("--mix", default="kurir=6,pembeli=3,vendor=1",
+                            help="Bobot peran pengguna virtual, mis. kurir=6,pembeli=3,vendor=1")
+        parser.add_argument("--relogin", action="store_true", help="Login ulang di setiap iterasi")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--output", help="File JSON hasil (default: BENCH_ROOT/http-<waktu>-<commit>.json)")
+        parser.add_argument("--compare", help="File JSON hasil sebelumnya untuk dibandingkan")
+
+    def handle(self, *args, **options):
+        mix = _parse_mix(options["mix"])
+        accounts = {
+            "kurir": Kurir.objects.filter(email__endswith="@bench.tpl").count(),
+            "pembeli": Pembeli.objects.filter(email__endswith="@bench.tpl").count(),
+            "vendor": Vendor.objects.filter(email__endswith="@bench.tpl").count(),
+        }
+        missing = [role for role in mix if not accounts[role]]
+        if missing:
+            raise CommandError(f"Akun benchmark {', '.join(missing)} belum ada; jalankan `seed --scale N` dulu.")
+
+        rng = random.Random(options["seed"])
+        counts = _allocate(mix, options["concurrency"])
+        roles = [role for role in mix for _ in range(counts[role])]
+        foto = _foto_pengiriman()
+
+        server = None
+        base_url = options["url"]
+        if options["serve"]:
+            server, base_url = self.start_server()
+
+        try:
+            results = Results()
+            counters = dict.fromkeys(ROLES, 0)
+            users = []
+            for role in roles:
+                index = counters[role] % accounts[role]
+                counters[role] += 1
+                users.append(VirtualUser(base_url, role, index, random.Random(rng.random()),
+                                         results, foto, options["relogin"]))
+
+            self.stdout.write(
+                f"🚚 {len(users)} pengguna virtual ({', '.join(f'{r}={roles.count(r)}' for r in mix)}) "
+                f"→ {base_url} selama {options['duration']:.0f} detik"
+            )
+            started_at = timezone.now()
+            start = time.perf_counter()
+            stop_at = time.monotonic() + options["duration"]
+            threads = [threading.Thread(target=user.run, args=(stop_at,), daemon=True) for user in users]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+        finally:
+            if server:
+                server.terminate()
+                server.wait(timeout=10)
+
+        report = {
+            "commit": _git_commit(),
+            "started_at": started_at.isoformat(),
+            "url": base_url,
+            "concurrency": options["concurrency"],
+            "duration_s": round(elapsed, 2),
+            "mix": {role: roles.count(role) for role in mix},
+            "relogin": options["relogin"],
+            "accounts": accounts,
+            **results.summary(elapsed),
+        }
+        self.print_report(report)
+
+        output = options["output"] or os.path.join(
+            settings.BENCH_ROOT,
+            f"http-{started_at:%Y%m%d-%H%M%S}-{report['commit'] or 'nocommit'}.json",
+        )
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        self.stdout.write(self.style.SUCCESS(f"✅ Hasil disimpan: {output}"))
+
+        if options["compare"]:
+            with open(options["compare"], encoding="utf-8") as f:
+                self.print_comparison(json.load(f), report)
+
+    def start_server(self):
+        port = _free_port()
+        process = subprocess.Popen(
+            [sys.executable, os.path.join(settings.BASE_DIR, "manage.py"), "runserver",
+             f"127.0.0.1:{port}", "--noreload"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=1).close()
+                return process, f"http://127.0.0.1:{port}"
+            except OSError:
+                if process.poll() is not None:
+                    break
+                time.sleep(0.2)
+        process.terminate()
+        raise CommandError("runserver tidak bisa dijalankan untuk benchmark.")
+
+    def print_report(self, report):
+        self.stdout.write(
+            f"\n{report['requests']:,} request, {report['errors']:,} error, "
+            f"{report['throughput_rps']:.1f} req/detik\n"
+        )
+        self.stdout.write(
+            f"{'langkah':<26}{'jumlah':>8}{'error':>7}{'req/s':>8}{'p50':>8}{'p95':>8}{'p99':>8}"
+            f"{'maks':>8}{'server p50':>12}{'query':>7}"
+        )
+        for name, step in report["steps"].items():
+            server = f"{step['server_p50_ms']:.1f}" if step["server_p50_ms"] is not None else "-"
+            self.stdout.write(
+                f"{name:<26}{step['count']:>8}{step['errors']:>7}{step['rps']:>8.1f}"
+                f"{step['p50_ms']:>8.1f}{step['p95_ms']:>8.1f}{step['p99_ms']:>8.1f}{step['max_ms']:>8.1f}"
+                f"{server:>12}{step['queries_max'] if step['queries_max'] is not None else '-':>7}"
+            )
+            for error, count in step["error_detail"].items():
+                self.stdout.write(self.style.WARNING(f"    ⚠️ {count}x {error}"))
+
+    def print_comparison(self, old, new):
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"\nPerbandingan dengan {old.get('commit') or '?'} ({old.get('started_at', '?')})"
+        ))
+        self.stdout.write(
+            f"throughput: {old['throughput_rps']:.1f} → {new['throughput_rps']:.1f} req/detik"
+        )
+        for name, step in new["steps"].items():
+            before = old["steps"].get(name)
+            if not before:
+                continue
+            change = (step["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100 if before["p95_ms"] else 0
+            line = f"  {name:<26} p95 {before['p95_ms']:>8.1f} → {step['p95_ms']:>8.1f} ms ({change:+.0f}%)"
+            self.stdout.write(self.style.WARNING(line) if change > 10 else line)
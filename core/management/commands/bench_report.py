@@ -0,0 +1,59 @@
+import io
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from core import reports
+
+
+class Command(BaseCommand):
+    help = "Benchmark render laporan faktur PDF: serial vs paralel per jumlah worker"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=50000, help="Jumlah baris sintetis")
+        parser.add_argument(
+            "--workers", default="1,2,4,8",
+            help="Daftar jumlah worker dipisah koma, mis. 1,2,4,8",
+        )
+        parser.add_argument("--fragment", type=int, default=reports.ROWS_PER_FRAGMENT,
+                            help="Jumlah baris per fragmen PDF")
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        rows = self.synthetic_rows(options["rows"], options["seed"])
+        worker_counts = [int(w) for w in options["workers"].split(",")]
+
+        self.stdout.write(f"📄 {len(rows)} baris, fragmen {options['fragment']} baris")
+        baseline = None
+        for workers in worker_counts:
+            output = io.BytesIO()
+            start = time.perf_counter()
+            reports.build_faktur_pdf_parallel(output, iter(rows), workers, options["fragment"])
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            self.stdout.write(
+                f"workers={workers:<3} waktu={elapsed:8.2f}s  "
+                f"speedup={baseline / elapsed:5.2f}x  ukuran={output.tell() / 1024:,.0f} KB"
+            )
+
+    def synthetic_rows(self, count, seed):
+        """Baris mirip data asli, termasuk kolom detail barang yang panjang."""
+        rng = random.Random(seed)
+        barang = [f"Barang {i:03d}" for i in range(300)]
+        status = ["diproses", "selesai", "dibatalkan"]
+        rows = []
+        for i in range(1, count + 1):
+            details = ", ".join(
+                f"{rng.choice(barang)} ({rng.randint(1, 20)})" for _ in range(rng.randint(1, 12))
+            )
+            rows.append([
+                str(i),
+                f"Pembeli {rng.randint(1, 5000)}",
+                f"Vendor {rng.randint(1, 50)}",
+                f"Kurir {rng.randint(1, 40)}",
+                rng.choice(status),
+                f"Rp {rng.randint(10, 5000) * 1000:,.0f}",
+                details,
+            ])
+        return rows
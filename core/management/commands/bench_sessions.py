@@ -0,0 +1,122 @@
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core import datagen
+from core.models import Kurir, Pembeli
+
+# nama -> setting session yang dibandingkan
+SCENARIOS = {
+    "db": {
+        "SESSION_ENGINE": "django.contrib.sessions.backends.db",
+        "KURIR_SESSION_ENGINE": None,
+    },
+    "cached_db": {
+        "SESSION_ENGINE": "django.contrib.sessions.backends.cached_db",
+        "KURIR_SESSION_ENGINE": None,
+    },
+    "cached_db+kurir_cookie": {
+        "SESSION_ENGINE": "django.contrib.sessions.backends.cached_db",
+        "KURIR_SESSION_ENGINE": "django.contrib.sessions.backends.signed_cookies",
+    },
+}
+
+
+def _session_queries(queries):
+    return sum(1 for q in queries.captured_queries if "django_session" in q["sql"])
+
+
+class Command(BaseCommand):
+    help = (
+        "Bandingkan query per request untuk engine session db, cached_db, dan "
+        "cached_db + cookie kurir (memakai akun benchmark dari `seed --scale N`)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=50, help="Request per langkah per skenario")
+        parser.add_argument("--json", action="store_true", help="Keluaran JSON")
+
+    def handle(self, *args, **options):
+        pembeli_email = datagen.bench_email("pembeli", 0)
+        kurir_email = datagen.bench_email("kurir", 0)
+        if not (Pembeli.objects.filter(email=pembeli_email).exists()
+                and Kurir.objects.filter(email=kurir_email).exists()):
+            raise CommandError("Akun benchmark belum ada; jalankan `seed --scale N` dulu.")
+
+        results = {}
+        for name, overrides in SCENARIOS.items():
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"], **overrides):
+                caches[settings.SESSION_CACHE_ALIAS].clear()
+                results[name] = self.run_scenario(options["requests"], pembeli_email, kurir_email)
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        self.print_results(results)
+
+    def run_scenario(self, count, pembeli_email, kurir_email):
+        steps = {}
+
+        def measure(step, send, runs):
+            total = session = 0
+            start = time.perf_counter()
+            for _ in range(runs):
+                with CaptureQueriesContext(connection) as queries:
+                    response = send()
+                if response.status_code >= 400:
+                    raise CommandError(f"{step}: HTTP {response.status_code}")
+                total += len(queries)
+                session += _session_queries(queries)
+            steps[step] = {
+                "requests": runs,
+                "queries": round(total / runs, 2),
+                "session_queries": round(session / runs, 2),
+                "ms": round((time.perf_counter() - start) * 1000 / runs, 2),
+            }
+
+        pembeli = Client()
+        measure("pembeli_login", lambda: pembeli.post(reverse("pembeli_login"), {
+            "email": pembeli_email, "password": datagen.BENCH_PASSWORD,
+        }), 1)
+        measure("beranda", lambda: pembeli.get(reverse("beranda")), count)
+        measure("pembeli_dashboard", lambda: pembeli.get(reverse("pembeli_dashboard")), count)
+
+        kurir = Client()
+        measure("kurir_login", lambda: kurir.post(reverse("kurir_login"), {
+            "email": kurir_email, "password": datagen.BENCH_PASSWORD,
+        }), 1)
+        measure("kurir_dashboard", lambda: kurir.get(reverse("kurir_dashboard")), count)
+
+        # Logout agar session benchmark tidak tertinggal di database
+        pembeli.get(reverse("pembeli_logout"))
+        kurir.get(reverse("kurir_logout"))
+        return steps
+
+    def print_results(self, results):
+        steps = list(next(iter(results.values())))
+        self.stdout.write(f"{'langkah':<20}" + "".join(f"{name:>26}" for name in results))
+        self.stdout.write(f"{'':<20}" + "".join(f"{'query (sesi) / ms':>26}" for _ in results))
+        for step in steps:
+            row = "".join(
+                f"{r[step]['queries']:>12.1f} ({r[step]['session_queries']:.1f}) {r[step]['ms']:>6.1f} ms"
+                for r in results.values()
+            )
+            self.stdout.write(f"{step:<20}{row}")
+
+        baseline, best = results["db"], results[list(results)[-1]]
+        saved = sum(
+            (baseline[s]["session_queries"] - best[s]["session_queries"]) * baseline[s]["requests"]
+            for s in steps
+        )
+        total = sum(baseline[s]["requests"] for s in steps)
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {saved:.0f} query django_session lebih sedikit dari {total} request "
+            f"({saved / total:.2f} per request) dibanding engine db."
+        ))
@@ -0,0 +1,125 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.instrumentation import percentile
+
+# Modul yang tidak boleh ikut dimuat saat boot worker: hanya dipakai oleh
+# laporan PDF / job (core.reports, run_jobs) dan harus diimpor di sana.
+HEAVY_MODULES = ("core.reports", "reportlab", "pypdf", "PIL", "concurrent.futures.process")
+
+# Dijalankan di proses baru, persis seperti worker WSGI yang baru start:
+# django.setup() + get_wsgi_application(), lalu laporkan waktu dan apakah
+# ada koneksi database yang dibuka / query yang dijalankan selama boot.
+BOOT_SCRIPT = """
+import json, time
+start = time.perf_counter()
+from django.db.backends.signals import connection_created
+opened = []
+connection_created.connect(lambda sender, connection, **kw: opened.append(connection.alias), weak=False)
+from django.core.wsgi import get_wsgi_application
+get_wsgi_application()
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({"ms": elapsed, "connections": opened}))
+"""
+
+
+def parse_importtime(stderr):
+    """
+    Baris `-X importtime` -> (total ms modul tingkat atas, {modul berat: rantai impor}).
+
+    Format: `import time: self | kumulatif | <indentasi>nama`; anak dicetak
+    sebelum induknya, jadi induk adalah baris berikutnya dengan indentasi lebih kecil.
+    Modul yang dimuat lewat importlib.import_module (mis. autodiscover admin)
+    tidak tercatat, jadi rantai dimulai dari impor tercatat pertama.
+    """
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((depth, int(cumulative), name.strip()))
+
+    total_ms = sum(cumulative for depth, cumulative, _ in entries if depth == 0) / 1000
+    heavy = {}
+    for index, (depth, _, name) in enumerate(entries):
+        module = next((m for m in HEAVY_MODULES if name == m or name.startswith(m + ".")), None)
+        if module is None or module in heavy:
+            continue
+        chain = [name]
+        for parent_depth, _, parent in entries[index + 1:]:
+            if parent_depth < depth:
+                chain.append(parent)
+                depth = parent_depth
+                if depth == 0:
+                    break
+        heavy[module] = list(reversed(chain))
+    return total_ms, heavy
+
+
+def measure_boot(importtime=False):
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get("DJANGO_SETTINGS_MODULE", "TPL.settings"))
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(settings.BASE_DIR), env.get("PYTHONPATH")]))
+    flags = ["-X", "importtime"] if importtime else []
+    result = subprocess.run(
+        [sys.executable, *flags, "-c", BOOT_SCRIPT], cwd=settings.BASE_DIR, env=env,
+        capture_output=True, text=True, timeout=120,
+    )
+    if result.returncode != 0:
+        raise CommandError(f"Boot gagal:\n{result.stderr}")
+    boot = json.loads(result.stdout.strip().splitlines()[-1])
+    if importtime:
+        boot["import_ms"], boot["heavy_modules"] = parse_importtime(result.stderr)
+    return boot
+
+
+class Command(BaseCommand):
+    help = (
+        "Ukur waktu boot worker (django.setup + aplikasi WSGI) dengan -X importtime; "
+        "gagal bila boot menyentuh database atau memuat modul berat (HEAVY_MODULES)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=5, help="Jumlah proses boot yang diukur")
+        parser.add_argument("--budget-ms", type=float,
+                            help="Gagal bila p50 waktu impor melebihi angka ini")
+        parser.add_argument("--json", action="store_true", help="Keluaran JSON")
+
+    def handle(self, *args, **options):
+        runs = [measure_boot(importtime=True) for _ in range(options["runs"])]
+        times = sorted(run["ms"] for run in runs)
+        import_times = sorted(run["import_ms"] for run in runs)
+        report = {
+            "runs": len(runs),
+            "p50_ms": round(percentile(times, 50), 1),
+            "max_ms": round(times[-1], 1),
+            "import_p50_ms": round(percentile(import_times, 50), 1),
+            "db_connections": sorted({alias for run in runs for alias in run["connections"]}),
+            "heavy_modules": {k: v for run in runs for k, v in run["heavy_modules"].items()},
+        }
+
+        problems = []
+        if report["db_connections"]:
+            problems.append(f"Boot membuka koneksi database: {', '.join(report['db_connections'])}")
+        for module, chain in report["heavy_modules"].items():
+            problems.append(f"Boot memuat {module}: {' → '.join(chain)}")
+        budget = options["budget_ms"]
+        if budget is not None and report["import_p50_ms"] > budget:
+            problems.append(f"Waktu impor {report['import_p50_ms']:.0f} ms melebihi anggaran {budget:.0f} ms")
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report))
+        else:
+            self.stdout.write(
+                f"🚀 boot worker {report['runs']}x: p50 {report['p50_ms']:.0f} ms, "
+                f"maks {report['max_ms']:.0f} ms, impor p50 {report['import_p50_ms']:.0f} ms"
+            )
+            if not problems:
+                self.stdout.write(self.style.SUCCESS("✅ Boot tidak menyentuh database dan tidak memuat modul berat."))
+        if problems:
+            raise CommandError("\n".join(f"❌ {problem}" for problem in problems))
@@ -0,0 +1,28 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from core import images, jobs
+
+
+class Command(BaseCommand):
+    help = (
+        "Masukkan foto Faktur/Keluhan yang belum diproses (mis. upload sebelum "
+        "pipeline foto ada, atau yang pernah gagal) ke antrian job proses_foto"
+    )
+
+    def handle(self, *args, **options):
+        queued = 0
+        for model_name, (field, thumb_field) in images.PHOTO_FIELDS.items():
+            model = apps.get_model("core", model_name)
+            rows = (
+                model.objects.exclude(**{f"{field}__isnull": True}).exclude(**{field: ""})
+                .only("pk", field, thumb_field)
+            )
+            for instance in rows.iterator():
+                parameter = images.pending_job(instance)
+                if parameter is not None:
+                    jobs.enqueue("proses_foto", parameter)
+                    queued += 1
+        self.stdout.write(self.style.SUCCESS(
+            f"🖼️ {queued:,} foto masuk antrian; jalankan `run_jobs` untuk memprosesnya."
+        ))
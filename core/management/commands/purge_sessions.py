@@ -0,0 +1,49 @@
+import time
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = (
+        "Hapus session kedaluwarsa per batch (pengganti clearsessions yang "
+        "menghapus semuanya dalam satu DELETE besar)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch", type=int, default=settings.SESSION_PURGE_BATCH,
+                            help="Jumlah session per DELETE")
+        parser.add_argument("--sleep", type=float, default=0.0,
+                            help="Jeda antar batch (detik) agar request lain tidak tertahan")
+        parser.add_argument("--limit", type=int, default=0, help="Berhenti setelah N session (0 = semua)")
+
+    def handle(self, *args, **options):
+        # Batas waktu tetap selama proses supaya jumlah pekerjaan tidak terus bertambah
+        now = timezone.now()
+        batch = options["batch"]
+        deleted = 0
+        start = time.perf_counter()
+
+        while not options["limit"] or deleted < options["limit"]:
+            size = batch if not options["limit"] else min(batch, options["limit"] - deleted)
+            # expire_date ber-index: ambil kunci dulu, lalu DELETE kecil per transaksi
+            keys = list(
+                Session.objects.filter(expire_date__lt=now)
+                .values_list("session_key", flat=True)[:size]
+            )
+            if not keys:
+                break
+            with transaction.atomic():
+                count, _ = Session.objects.filter(session_key__in=keys, expire_date__lt=now).delete()
+            deleted += count
+            if options["verbosity"] >= 2:
+                self.stdout.write(f"  {deleted:,} session terhapus")
+            if options["sleep"]:
+                time.sleep(options["sleep"])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"🧹 {deleted:,} session kedaluwarsa dihapus dalam {time.perf_counter() - start:.1f} detik."
+        ))
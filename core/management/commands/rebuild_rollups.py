@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from core.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Hitung ulang tabel statistik per kelurahan dan kecamatan dari data faktur"
+
+    def handle(self, *args, **options):
+        kelurahan, kecamatan = rebuild_rollups()
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Statistik dihitung ulang: {kelurahan} kelurahan, {kecamatan} kecamatan."
+        ))
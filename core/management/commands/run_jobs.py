@@ -0,0 +1,77 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core import jobs
+
+
+class Command(BaseCommand):
+    help = "Jalankan worker background job (ekspor laporan, dsb.) dengan process pool"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=2, help="Jumlah proses worker")
+        parser.add_argument("--poll", type=float, default=2.0, help="Jeda polling antrian (detik)")
+        parser.add_argument(
+            "--once", action="store_true",
+            help="Berhenti setelah antrian kosong dan semua job selesai",
+        )
+
+    def handle(self, *args, **options):
+        workers = options["workers"]
+        self.stdout.write(f"🚚 Worker job berjalan dengan {workers} proses. Tekan Ctrl+C untuk berhenti.")
+
+        stale = jobs.fail_stale()
+        if stale:
+            self.stdout.write(self.style.WARNING(f"⚠️ {stale} job macet dari worker sebelumnya ditandai gagal."))
+
+        pool = self.new_pool(workers)
+        # future -> id job
+        running = {}
+        broken = False
+        try:
+            while True:
+                for future in [f for f in running if f.done()]:
+                    job_id = running.pop(future)
+                    try:
+                        future.result()
+                    except Exception as exc:
+                        # Proses worker mati (BrokenProcessPool) atau run_job sendiri gagal
+                        jobs.fail([job_id], f"Worker gagal menjalankan job: {exc!r}")
+                        self.stdout.write(self.style.ERROR(f"❌ Job #{job_id} gagal: {exc!r}"))
+                        broken = broken or isinstance(exc, BrokenProcessPool)
+                    else:
+                        self.stdout.write(f"Job #{job_id} selesai diproses.")
+
+                if broken and not running:
+                    # Pool yang rusak menolak submit berikutnya; buat baru
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    pool = self.new_pool(workers)
+                    broken = False
+
+                while not broken and len(running) < workers:
+                    job_id = jobs.claim_next()
+                    if job_id is None:
+                        break
+                    # Jangan wariskan koneksi database yang terbuka ke proses hasil fork
+                    connections.close_all()
+                    running[pool.submit(jobs.run_job, job_id, workers)] = job_id
+                    self.stdout.write(f"Job #{job_id} dimulai.")
+
+                if options["once"] and not running:
+                    break
+                time.sleep(options["poll"])
+        except KeyboardInterrupt:
+            self.stdout.write("Menunggu job yang sedang berjalan selesai...")
+        finally:
+            pool.shutdown(wait=True)
+
+        self.stdout.write(self.style.SUCCESS("✅ Worker job berhenti."))
+
+    @staticmethod
+    def new_pool(workers):
+        # initializer=django.setup agar worker juga siap saat start method 'spawn' (Windows/macOS)
+        return ProcessPoolExecutor(max_workers=workers, initializer=django.setup)
@@ -3,23 +3,55 @@ from django.contrib.auth.models import User, Group, Permission
 from django.contrib.contenttypes.models import ContentType
 from core.models import (
     Kecamatan, Kelurahan, Pembeli, Vendor, Kategori, Barang,
-    Faktur, DetailFaktur, Keluhan
+    Faktur, Keluhan, Kurir
 )
+from core import datagen
 from django.db import transaction
 from decimal import Decimal
 import random
+import time
 
 
 class Command(BaseCommand):
-    help = "Seed database dengan data dummy dan setup group + user"
+    help = "Seed database dengan data dummy dan setup group + user (--scale N untuk dataset benchmark)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scale", type=int, default=0,
+            help="Buat dataset benchmark dengan N faktur (bulk_create per batch)",
+        )
+        parser.add_argument("--seed", type=int, default=42, help="Seed RNG agar dataset bisa diulang")
+        parser.add_argument("--batch", type=int, default=datagen.BATCH_SIZE, help="Ukuran batch bulk_create")
 
-    @transaction.atomic
     def handle(self, *args, **options):
         # 1️⃣ CEK apakah sudah ada data
         if Kecamatan.objects.exists():
             self.stdout.write("❗ Data sudah ada, seeding dibatalkan.")
             return
 
+        with transaction.atomic():
+            self.setup_users()
+
+        if options["scale"] > 0:
+            self.seed_scale(options["scale"], options["seed"], options["batch"])
+        else:
+            with transaction.atomic():
+                self.seed_demo()
+
+    def seed_scale(self, scale, seed, batch):
+        # Tiap batch punya transaksinya sendiri (lihat core/datagen.py)
+        started = time.perf_counter()
+        self.stdout.write(f"⏳ Membuat dataset benchmark: {scale:,} faktur (seed={seed}, batch={batch})")
+        counts = datagen.Generator(scale, seed=seed, batch_size=batch, log=self.stdout.write).run()
+        for model, jumlah in counts.items():
+            self.stdout.write(f"  {model}: {jumlah:,}")
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Dataset benchmark selesai dalam {time.perf_counter() - started:.1f} detik. "
+            f"Login: {datagen.bench_email('pembeli', 0)} / {datagen.BENCH_PASSWORD} "
+            f"(juga vendor0@…, kurir0@…)"
+        ))
+
+    def setup_users(self):
         # 2️⃣ BERSIHKAN group (optional jika flush sudah dilakukan)
         Group.objects.all().delete()
 
@@ -68,6 +100,7 @@ class Command(BaseCommand):
         pimpinan_user.save()
         pimpinan_user.groups.add(grup_pimpinan)
 
+    def seed_demo(self):
         # 6️⃣ DATA KECAMATAN, KELURAHAN, PEMBELI, VENDOR, DLL
         kec1 = Kecamatan.objects.create(nama_kecamatan="Oebobo")
         kec2 = Kecamatan.objects.create(nama_kecamatan="Kelapa Lima")
@@ -76,11 +109,25 @@ class Command(BaseCommand):
         kel2 = Kelurahan.objects.create(nama_kelurahan="Fatululi", kode_pos="85112", kecamatan=kec1)
         kel3 = Kelurahan.objects.create(nama_kelurahan="Namosain", kode_pos="85113", kecamatan=kec2)
 
-        pemb1 = Pembeli.objects.create(nama="Verel", alamat="Jl. Perintis", no_hp="081234567890", kelurahan=kel1)
-        pemb2 = Pembeli.objects.create(nama="Andi", alamat="Jl. Cakra", no_hp="081298765432", kelurahan=kel2)
-
-        vendor1 = Vendor.objects.create(nama="CV Sumber Rejeki", email="cv@rejeki.com", alamat="Jl. Sam Ratulangi", no_hp="08111222333")
-        vendor2 = Vendor.objects.create(nama="PT Warisan Enak", email="info@warisanenak.com", alamat="Jl. Eltari", no_hp="08199887766")
+        pemb1 = Pembeli.objects.create(nama="Verel", email="verel@example.com", password="pembeli123",
+                                       alamat="Jl. Perintis", no_hp="081234567890", kelurahan=kel1)
+        pemb2 = Pembeli.objects.create(nama="Andi", email="andi@example.com", password="pembeli123",
+                                       alamat="Jl. Cakra", no_hp="081298765432", kelurahan=kel2)
+
+        vendor1 = Vendor.objects.create(nama="CV Sumber Rejeki", email="cv@rejeki.com", password="vendor123",
+                                        alamat="Jl. Sam Ratulangi", no_hp="08111222333")
+        vendor2 = Vendor.objects.create(nama="PT Warisan Enak", email="info@warisanenak.com", password="vendor123",
+                                        alamat="Jl. Eltari", no_hp="08199887766")
+
+        # Faktur.kurir menunjuk ke model Kurir (login kurir), bukan auth User.
+        # kurir1@example.com sudah dibuat provisioning (tanpa password) saat
+        # migrate; password demo tetap dipasang. Login kurir membandingkan
+        # password teks biasa, jadi tidak di-hash.
+        kurir, _ = Kurir.objects.update_or_create(
+            email="kurir1@example.com",
+            defaults={"password": "kurir123", "aktif": True},
+            create_defaults={"nama": "Kurir Satu", "password": "kurir123", "no_hp": "081300000001"},
+        )
 
         kat1 = Kategori.objects.create(nama="Minuman")
         kat2 = Kategori.objects.create(nama="Makanan")
@@ -97,12 +144,11 @@ class Command(BaseCommand):
                 berat=Decimal(random.uniform(1.0, 5.0)),
                 koli=random.randint(1, 5),
                 foto_pengiriman="faktur_images/default.jpg",
-                kurir=kurir_user,
+                kurir=kurir,
                 vendor=random.choice([vendor1, vendor2]),
                 pembeli=random.choice([pemb1, pemb2])
             )
-            DetailFaktur.objects.create(faktur=faktur, barang=barang1, jumlah_barang=2)
-            DetailFaktur.objects.create(faktur=faktur, barang=barang2, jumlah_barang=1)
+            faktur.add_items([(barang1, 2), (barang2, 1)])
 
         # 8️⃣ DATA KELUHAN
         Keluhan.objects.create(isi_keluhan="Produk tidak sesuai pesanan", pembeli=pemb1)
@@ -0,0 +1,78 @@
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+def _log_files():
+    base = settings.SLOW_QUERY_LOG
+    files = [f"{base}.{i}" for i in range(settings.SLOW_QUERY_LOG_BACKUPS, 0, -1)] + [base]
+    return [path for path in files if os.path.exists(path)]
+
+
+def _full_scans(plan):
+    """Baris rencana yang membaca seluruh tabel (SQLite: SCAN tanpa index, PostgreSQL: Seq Scan)."""
+    return [
+        line for line in plan or []
+        if (line.startswith("SCAN") and "INDEX" not in line) or "Seq Scan" in line
+    ]
+
+
+class Command(BaseCommand):
+    help = "Ringkas log query lambat (SLOW_QUERY_LOG) per fingerprint SQL"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=20, help="Jumlah query teratas yang ditampilkan")
+        parser.add_argument("--plan", action="store_true", help="Tampilkan rencana EXPLAIN lengkap")
+        parser.add_argument("--json", action="store_true", help="Keluaran JSON")
+
+    def handle(self, *args, **options):
+        summary = {}
+        for path in _log_files():
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        row = json.loads(line)
+                    except ValueError:
+                        continue
+                    item = summary.setdefault(row["hash"], {
+                        "hash": row["hash"], "fingerprint": row["fingerprint"],
+                        "hits": 0, "total_ms": 0.0, "max_ms": 0.0,
+                        "views": set(), "plan": None, "sql": None,
+                    })
+                    item["hits"] += row["hits"]
+                    item["total_ms"] += row["total_ms"]
+                    item["max_ms"] = max(item["max_ms"], row["max_ms"])
+                    if row.get("view") or row.get("path"):
+                        item["views"].add(row.get("view") or row.get("path"))
+                    if row.get("plan") is not None:
+                        item["plan"], item["sql"] = row["plan"], row.get("sql")
+
+        items = sorted(summary.values(), key=lambda i: -i["total_ms"])[:options["limit"]]
+        for item in items:
+            item["views"] = sorted(item["views"])
+            item["full_scans"] = _full_scans(item["plan"])
+
+        if options["json"]:
+            self.stdout.write(json.dumps(items, indent=2, ensure_ascii=False))
+            return
+        if not items:
+            self.stdout.write("Belum ada query lambat yang tercatat.")
+            return
+
+        for item in items:
+            avg = item["total_ms"] / item["hits"] if item["hits"] else 0
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"[{item['hash']}] {item['hits']}x  total {item['total_ms']:.0f} ms  "
+                f"rata-rata {avg:.1f} ms  maks {item['max_ms']:.1f} ms"
+            ))
+            self.stdout.write(f"  {item['fingerprint'][:400]}")
+            if item["views"]:
+                self.stdout.write(f"  view: {', '.join(item['views'])}")
+            for line in item["full_scans"]:
+                self.stdout.write(self.style.WARNING(f"  ⚠️ tanpa index: {line}"))
+            if options["plan"] and item["plan"]:
+                for line in item["plan"]:
+                    self.stdout.write(f"    {line}")
+            self.stdout.write("")
@@ -0,0 +1,52 @@
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db.models import Sum
+from django.db.models.functions import Coalesce
+
+from core.models import Faktur
+
+
+class Command(BaseCommand):
+    help = "Cocokkan total_faktur dengan jumlah detailnya dan laporkan selisihnya"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fix", action="store_true",
+            help="Perbaiki total_faktur yang tidak cocok dengan hasil hitung ulang",
+        )
+
+    def handle(self, *args, **options):
+        # Satu query: setiap faktur beserta total hasil agregasi detailnya
+        rows = (
+            Faktur.objects
+            .annotate(total_hitung=Coalesce(Sum("detail__subtotal"), Decimal("0.00")))
+            .values_list("id_faktur", "total_faktur", "total_hitung")
+            .order_by("id_faktur")
+        )
+
+        checked = 0
+        drift = []
+        for id_faktur, tersimpan, dihitung in rows.iterator(chunk_size=2000):
+            checked += 1
+            tersimpan = Decimal(tersimpan).quantize(Decimal("0.01"))
+            dihitung = Decimal(dihitung).quantize(Decimal("0.01"))
+            if tersimpan != dihitung:
+                drift.append((id_faktur, tersimpan, dihitung))
+
+        for id_faktur, tersimpan, dihitung in drift:
+            self.stdout.write(
+                f"Faktur #{id_faktur}: tersimpan {tersimpan}, seharusnya {dihitung} "
+                f"(selisih {tersimpan - dihitung})"
+            )
+
+        if drift and options["fix"]:
+            for id_faktur, _, dihitung in drift:
+                Faktur.objects.filter(pk=id_faktur).update(total_faktur=dihitung)
+            self.stdout.write(self.style.SUCCESS(f"✅ {len(drift)} total faktur diperbaiki."))
+
+        summary = f"{checked} faktur diperiksa, {len(drift)} tidak cocok."
+        if drift and not options["fix"]:
+            self.stdout.write(self.style.WARNING(summary))
+        else:
+            self.stdout.write(self.style.SUCCESS(summary))
@@ -0,0 +1,261 @@
+# core/middleware.py
+import logging
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import caches
+from django.urls import Resolver404, resolve
+from django.utils.cache import patch_vary_headers
+from django.utils.crypto import constant_time_compare, salted_hmac
+from django.utils.functional import SimpleLazyObject
+
+from .instrumentation import (
+    NPlusOneError, QueryDetector, RequestMetrics, format_findings,
+    install_template_timer, perf_stats,
+)
+
+from .models import Kurir, Pembeli, Vendor
+from .profiling import SamplingProfiler, can_profile, save_profile
+
+logger = logging.getLogger("core.querycheck")
+
+
+# ==============================================================
+# 🔹 Deteksi N+1 (dev/staging)
+# ==============================================================
+class QueryDetectorMiddleware:
+    """
+    Catat bentuk setiap query selama request dan laporkan yang berulang.
+
+    Aktif bila QUERY_DETECTOR_ENABLED; bentuk query yang muncul
+    QUERY_DETECTOR_THRESHOLD kali atau lebih dilaporkan ke logger
+    "core.querycheck". Dengan QUERY_DETECTOR_STRICT (mis. saat test)
+    request tersebut menghasilkan NPlusOneError.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        # Dibaca per request agar bisa diubah dengan override_settings di test
+        if not getattr(settings, "QUERY_DETECTOR_ENABLED", False):
+            return self.get_response(request)
+
+        with QueryDetector() as detector:
+            response = self.get_response(request)
+
+        findings = detector.findings(settings.QUERY_DETECTOR_THRESHOLD)
+        if findings:
+            match = request.resolver_match
+            view = match.view_name if match else request.path
+            message = format_findings(view, findings)
+            if settings.QUERY_DETECTOR_STRICT:
+                raise NPlusOneError(message)
+            logger.warning(message)
+        return response
+
+
+# ==============================================================
+# 🔹 Server-Timing & statistik per URL
+# ==============================================================
+class ServerTimingMiddleware:
+    """
+    Ukur waktu total, SQL (jumlah & durasi), render template dan byte upload.
+
+    Hasilnya selalu dicatat ke `perf_stats` per nama URL (ringkasannya
+    tersedia untuk staff di endpoint JSON `perf_stats`) dan dikirim sebagai
+    header Server-Timing (terlihat di tab Network browser) hanya bila DEBUG,
+    pengguna staff, atau request membawa timing_token() di header
+    X-Server-Timing-Token (dipakai bench_http): jumlah query dan waktu render
+    tidak untuk pengunjung umum.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        install_template_timer()
+
+    def __call__(self, request):
+        if not getattr(settings, "PERF_TIMING_ENABLED", False):
+            return self.get_response(request)
+
+        with RequestMetrics() as metrics:
+            response = self.get_response(request)
+
+        if request.content_type == "multipart/form-data":
+            metrics.upload_bytes = int(request.META.get("CONTENT_LENGTH") or 0)
+        if settings.DEBUG or _has_timing_token(request) or _is_staff(request):
+            response["Server-Timing"] = metrics.server_timing()
+
+        match = request.resolver_match
+        perf_stats.record(match.view_name if match else "<tidak dikenal>", metrics)
+        return response
+
+
+TIMING_TOKEN_HEADER = "HTTP_X_SERVER_TIMING_TOKEN"
+
+
+def timing_token():
+    """Token header Server-Timing untuk klien non-staff (bench_http), diturunkan dari SECRET_KEY."""
+    return salted_hmac("core.middleware.ServerTimingMiddleware", "server-timing").hexdigest()
+
+
+def _has_timing_token(request):
+    token = request.META.get(TIMING_TOKEN_HEADER)
+    return bool(token) and constant_time_compare(token, timing_token())
+
+
+def _is_staff(request):
+    # request.user tidak ada bila middleware lain menjawab sebelum AuthenticationMiddleware
+    user = getattr(request, "user", None)
+    return bool(user and user.is_staff)
+
+
+# ==============================================================
+# 🔹 Cache halaman utuh untuk pengunjung anonim
+# ==============================================================
+PAGE_CACHE_HEADER = "X-Page-Cache"
+
+
+class AnonymousPageCacheMiddleware:
+    """
+    Sajikan halaman di settings.PAGE_CACHE dari cache untuk pengunjung anonim.
+
+    Anonim = GET tanpa query string dan tanpa cookie session. Tanpa session
+    tidak ada pembeli, vendor, maupun admin yang login, jadi semua pengunjung
+    itu menerima halaman yang sama (kunci cache: tipe pengunjung + path).
+    Middleware ini dipasang sebelum SessionMiddleware: hit cache tidak membuka
+    session, tidak memuat user, dan tidak menjalankan view.
+
+    Respons yang disimpan selalu membawa `Vary: Cookie`, agar cache browser
+    atau proxy tidak menyajikannya lagi setelah pengunjung login. Respons yang
+    memasang cookie (mis. csrftoken) atau bukan 200 tidak disimpan.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def cache_timeout(self, request):
+        if (request.method != "GET" or request.META.get("QUERY_STRING")
+                or settings.SESSION_COOKIE_NAME in request.COOKIES):
+            return None
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return None
+        timeout = settings.PAGE_CACHE.get(match.view_name)
+        if timeout is not None:
+            request.resolver_match = match
+        return timeout
+
+    def __call__(self, request):
+        timeout = self.cache_timeout(request)
+        if timeout is None:
+            return self.get_response(request)
+
+        cache = caches[settings.PAGE_CACHE_ALIAS]
+        key = f"halaman:anonim:{request.path}"
+        response = cache.get(key)
+        if response is not None:
+            response[PAGE_CACHE_HEADER] = "hit"
+            return response
+
+        response = self.get_response(request)
+        if response.status_code == 200 and not response.streaming and not response.cookies:
+            patch_vary_headers(response, ("Cookie",))
+            response[PAGE_CACHE_HEADER] = "miss"
+            cache.set(key, response, timeout)
+        return response
+
+
+# ==============================================================
+# 🔹 Profiler sesuai permintaan (staff)
+# ==============================================================
+PROFILE_PARAM = "_profile"
+PROFILE_HEADER = "HTTP_X_PROFILE"
+PROFILE_TRUE = {"1", "true", "yes", "on"}
+
+
+class ProfilerMiddleware:
+    """
+    Jalankan request di bawah sampling profiler bila diminta staff.
+
+    Dipicu dengan query `?_profile=1` atau header `X-Profile: 1` (juga
+    true/yes/on; "0", "false" dsb. tidak memicu) dari pengguna yang lolos
+    profiling.can_profile. Request tanpa pemicu hanya membayar dua pengecekan
+    dictionary. Nama file hasil dikirim di header X-Profile dan daftarnya ada
+    di admin (Profiler).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if PROFILE_PARAM not in request.GET and PROFILE_HEADER not in request.META:
+            return self.get_response(request)
+
+        requested = _truthy(request.META.get(PROFILE_HEADER))
+        # Jangan teruskan parameter pemicu ke view (changelist admin menganggapnya filter)
+        if PROFILE_PARAM in request.GET:
+            requested = requested or _truthy(request.GET[PROFILE_PARAM])
+            request.GET = request.GET.copy()
+            del request.GET[PROFILE_PARAM]
+        if not requested or not can_profile(getattr(request, "user", None)):
+            return self.get_response(request)
+
+        profiler = SamplingProfiler().start()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.stop()
+        response["X-Profile"] = save_profile(profiler, request.path)
+        return response
+
+
+def _truthy(value):
+    return value is not None and value.strip().lower() in PROFILE_TRUE
+
+
+# ==============================================================
+# 🔹 Aktor yang login (pembeli / vendor / kurir)
+# ==============================================================
+# atribut request -> (model, kunci id di session)
+ACTORS = {
+    "pembeli": (Pembeli, "pembeli_id"),
+    "vendor": (Vendor, "vendor_id"),
+    "kurir": (Kurir, "kurir_id"),
+}
+
+
+def get_actor(request, name):
+    """Objek aktor dari session, dimuat paling banyak sekali per request; None bila tidak ada."""
+    cache_name = f"_cached_{name}"
+    if not hasattr(request, cache_name):
+        model, session_key = ACTORS[name]
+        pk = request.session.get(session_key)
+        actor = None
+        if pk is not None:
+            try:
+                actor = model.objects.get(pk=pk)
+            except model.DoesNotExist:
+                pass
+        setattr(request, cache_name, actor)
+    return getattr(request, cache_name)
+
+
+class ActorMiddleware:
+    """
+    Pasang request.pembeli, request.vendor, dan request.kurir sebagai objek lazy.
+
+    Query baru dijalankan saat atribut pertama kali disentuh, dan hasilnya
+    dipakai ulang sampai request selesai. Seperti request.user, nilainya
+    dibungkus SimpleLazyObject: cek dengan `if request.pembeli:` (bukan
+    `is None`), karena aktor yang tidak login/terhapus bernilai None.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        for name in ACTORS:
+            setattr(request, name, SimpleLazyObject(partial(get_actor, request, name)))
+        return self.get_response(request)
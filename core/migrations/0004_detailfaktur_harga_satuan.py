@@ -0,0 +1,52 @@
+# Generated by Django 5.1.6 on 2026-10-18 12:40
+
+from django.db import migrations, models, transaction
+
+
+BATCH_SIZE = 1000
+
+
+def isi_harga_satuan(apps, schema_editor):
+    """Salin harga barang saat ini ke setiap baris detail, per batch."""
+    DetailFaktur = apps.get_model('core', 'DetailFaktur')
+    db_alias = schema_editor.connection.alias
+
+    last_id = 0
+    while True:
+        with transaction.atomic(using=db_alias):
+            batch = list(
+                DetailFaktur.objects.using(db_alias)
+                .filter(id_detail__gt=last_id)
+                .select_related('barang')
+                .order_by('id_detail')[:BATCH_SIZE]
+            )
+            if not batch:
+                break
+            for detail in batch:
+                detail.harga_satuan = detail.barang.harga_barang
+                detail.subtotal = detail.harga_satuan * detail.jumlah_barang
+            DetailFaktur.objects.using(db_alias).bulk_update(batch, ['harga_satuan', 'subtotal'])
+        last_id = batch[-1].id_detail
+
+
+class Migration(migrations.Migration):
+    # Backfill berjalan per batch dalam transaksi kecil agar tabel tidak terkunci lama
+    atomic = False
+
+    dependencies = [
+        ('core', '0003_vendor_password'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='detailfaktur',
+            name='harga_satuan',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='detailfaktur',
+            name='subtotal',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=15),
+        ),
+        migrations.RunPython(isi_harga_satuan, migrations.RunPython.noop),
+    ]
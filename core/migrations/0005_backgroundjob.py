@@ -0,0 +1,40 @@
+# Generated by Django 5.1.6 on 2026-10-18 12:44
+
+import core.models
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_detailfaktur_harga_satuan'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BackgroundJob',
+            fields=[
+                ('id_job', models.AutoField(primary_key=True, serialize=False)),
+                ('jenis', models.CharField(max_length=50)),
+                ('parameter', models.JSONField(blank=True, default=dict)),
+                ('kunci', models.CharField(db_index=True, max_length=64)),
+                ('status', models.CharField(choices=[('antri', 'Antri'), ('berjalan', 'Berjalan'), ('selesai', 'Selesai'), ('gagal', 'Gagal')], default='antri', max_length=20)),
+                ('progres', models.IntegerField(default=0)),
+                ('total', models.IntegerField(default=0)),
+                ('hasil', models.FileField(blank=True, null=True, storage=core.models.export_storage, upload_to='%Y/%m/')),
+                ('pesan_error', models.TextField(blank=True)),
+                ('dibuat_pada', models.DateTimeField(default=django.utils.timezone.now)),
+                ('selesai_pada', models.DateTimeField(blank=True, null=True)),
+                ('dibuat_oleh', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Background Job',
+                'verbose_name_plural': 'Background Job',
+                'indexes': [models.Index(fields=['status', 'id_job'], name='core_job_status_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 5.1.6 on 2026-10-18 12:48
+
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, F, Q, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def isi_statistik(apps, schema_editor):
+    # Agregat ditulis ulang di sini (bukan memanggil core.rollups) agar
+    # migrasi ini tetap sama walaupun kode aplikasi berubah
+    using = schema_editor.connection.alias
+    Faktur = apps.get_model('core', 'Faktur')
+    aggregates = dict(
+        jumlah_faktur=Count('pk'),
+        jumlah_diproses=Count('pk', filter=Q(status='diproses')),
+        jumlah_selesai=Count('pk', filter=Q(status='selesai')),
+        jumlah_dibatalkan=Count('pk', filter=Q(status='dibatalkan')),
+        pendapatan=Coalesce(Sum('total_faktur', filter=~Q(status='dibatalkan')), Value(Decimal('0.00'))),
+    )
+    for region, stat, key, path in (
+        ('Kelurahan', 'StatistikKelurahan', 'kelurahan_id', 'pembeli__kelurahan_id'),
+        ('Kecamatan', 'StatistikKecamatan', 'kecamatan_id', 'pembeli__kelurahan__kecamatan_id'),
+    ):
+        stat_model = apps.get_model('core', stat)
+        totals = {
+            row.pop('region'): row
+            for row in Faktur.objects.using(using).values(region=F(path)).annotate(**aggregates).order_by()
+        }
+        stat_model.objects.using(using).bulk_create([
+            stat_model(**{key: pk}, **totals.get(pk, {}))
+            for pk in apps.get_model('core', region).objects.using(using).values_list('pk', flat=True)
+        ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_backgroundjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatistikKecamatan',
+            fields=[
+                ('jumlah_faktur', models.IntegerField(default=0)),
+                ('jumlah_diproses', models.IntegerField(default=0)),
+                ('jumlah_selesai', models.IntegerField(default=0)),
+                ('jumlah_dibatalkan', models.IntegerField(default=0)),
+                ('pendapatan', models.DecimalField(decimal_places=2, default=0, max_digits=17)),
+                ('kecamatan', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='statistik', serialize=False, to='core.kecamatan')),
+            ],
+            options={
+                'verbose_name': 'Statistik Kecamatan',
+                'verbose_name_plural': 'Statistik Kecamatan',
+                'indexes': [models.Index(fields=['-jumlah_faktur'], name='core_statkec_jumlah_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='StatistikKelurahan',
+            fields=[
+                ('jumlah_faktur', models.IntegerField(default=0)),
+                ('jumlah_diproses', models.IntegerField(default=0)),
+                ('jumlah_selesai', models.IntegerField(default=0)),
+                ('jumlah_dibatalkan', models.IntegerField(default=0)),
+                ('pendapatan', models.DecimalField(decimal_places=2, default=0, max_digits=17)),
+                ('kelurahan', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='statistik', serialize=False, to='core.kelurahan')),
+            ],
+            options={
+                'verbose_name': 'Statistik Kelurahan',
+                'verbose_name_plural': 'Statistik Kelurahan',
+                'indexes': [models.Index(fields=['-jumlah_faktur'], name='core_statkel_jumlah_idx')],
+            },
+        ),
+        migrations.RunPython(isi_statistik, migrations.RunPython.noop),
+    ]
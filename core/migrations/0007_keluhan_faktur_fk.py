@@ -0,0 +1,82 @@
+# Generated by Django 5.1.6 on 2026-10-18 15:10
+
+import django.db.models.deletion
+from django.db import migrations, models, transaction
+
+
+BATCH_SIZE = 1000
+
+
+def isi_faktur_ref(apps, schema_editor):
+    """
+    Salin ID faktur (string) ke kolom foreign key baru, per batch.
+
+    Nilai yang bukan angka, faktur yang sudah tidak ada, atau faktur milik
+    pembeli lain dibiarkan kosong.
+    """
+    Keluhan = apps.get_model('core', 'Keluhan')
+    Faktur = apps.get_model('core', 'Faktur')
+    db_alias = schema_editor.connection.alias
+
+    last_id = 0
+    while True:
+        with transaction.atomic(using=db_alias):
+            batch = list(
+                Keluhan.objects.using(db_alias)
+                .filter(id_keluhan__gt=last_id)
+                .exclude(faktur__isnull=True)
+                .exclude(faktur='')
+                .only('id_keluhan', 'pembeli_id', 'faktur')
+                .order_by('id_keluhan')[:BATCH_SIZE]
+            )
+            if not batch:
+                break
+            wanted = {
+                int(k.faktur.strip()) for k in batch if k.faktur.strip().isdigit()
+            }
+            pemilik = dict(
+                Faktur.objects.using(db_alias)
+                .filter(id_faktur__in=wanted)
+                .values_list('id_faktur', 'pembeli_id')
+            )
+            changed = []
+            for keluhan in batch:
+                value = keluhan.faktur.strip()
+                faktur_id = int(value) if value.isdigit() else None
+                if faktur_id in pemilik and pemilik[faktur_id] == keluhan.pembeli_id:
+                    keluhan.faktur_ref_id = faktur_id
+                    changed.append(keluhan)
+            Keluhan.objects.using(db_alias).bulk_update(changed, ['faktur_ref'])
+        last_id = batch[-1].id_keluhan
+
+
+class Migration(migrations.Migration):
+    # Backfill berjalan per batch dalam transaksi kecil agar tabel tidak terkunci lama
+    atomic = False
+
+    dependencies = [
+        ('core', '0006_statistik_wilayah'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='keluhan',
+            name='faktur_ref',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.faktur'),
+        ),
+        migrations.RunPython(isi_faktur_ref, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='keluhan',
+            name='faktur',
+        ),
+        migrations.RenameField(
+            model_name='keluhan',
+            old_name='faktur_ref',
+            new_name='faktur',
+        ),
+        migrations.AlterField(
+            model_name='keluhan',
+            name='faktur',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='keluhan', to='core.faktur'),
+        ),
+    ]
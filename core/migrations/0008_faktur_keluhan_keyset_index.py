@@ -0,0 +1,25 @@
+# Generated by Django 5.1.6 on 2026-10-18 12:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_keluhan_faktur_fk'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='faktur',
+            index=models.Index(fields=['kurir', 'status', 'id_faktur'], name='core_faktur_kurir_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='keluhan',
+            index=models.Index(fields=['pembeli', 'tanggal', 'id_keluhan'], name='core_keluhan_pembeli_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='keluhan',
+            index=models.Index(fields=['faktur', 'tanggal', 'id_keluhan'], name='core_keluhan_faktur_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.1.6 on 2026-10-18 13:06
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_faktur_keluhan_keyset_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VersiProvisioning',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nama', models.CharField(max_length=50, unique=True)),
+                ('versi', models.IntegerField(default=0)),
+                ('diterapkan_pada', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Versi Provisioning',
+                'verbose_name_plural': 'Versi Provisioning',
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.6 on 2026-10-18 13:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_versiprovisioning'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='faktur',
+            name='foto_pengiriman_thumb',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='faktur_images/thumbs/'),
+        ),
+        migrations.AddField(
+            model_name='keluhan',
+            name='foto_thumb',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='keluhan_images/thumbs/'),
+        ),
+    ]
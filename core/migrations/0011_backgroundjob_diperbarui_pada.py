@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-18 13:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_foto_thumbnail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='backgroundjob',
+            name='diperbarui_pada',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
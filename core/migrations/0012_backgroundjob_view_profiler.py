@@ -0,0 +1,17 @@
+# Generated by Django 5.1.6 on 2026-10-18 13:52
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_backgroundjob_diperbarui_pada'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='backgroundjob',
+            options={'permissions': [('view_profiler', 'Dapat memakai profiler request')], 'verbose_name': 'Background Job', 'verbose_name_plural': 'Background Job'},
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.6 on 2026-10-18 13:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_backgroundjob_view_profiler'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VersiData',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nama', models.CharField(max_length=50, unique=True)),
+                ('versi', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Versi Data',
+                'verbose_name_plural': 'Versi Data',
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.6 on 2026-10-18 14:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_versidata'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='detailfaktur',
+            name='barang',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='detail', to='core.barang'),
+        ),
+    ]
@@ -1,9 +1,14 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Sum
 from django.conf import settings
+from django.core.files.storage import FileSystemStorage
 from decimal import Decimal
 from django.utils import timezone
 from django.contrib.auth.hashers import make_password
 
+from . import rollups
+from .versioning import bump_on_commit
+
 # =============================
 # MODEL KECAMATAN
 # =============================
@@ -31,6 +36,20 @@ class Kelurahan(models.Model):
     def __str__(self):
         return f"{self.nama_kelurahan}, Kec. {self.kecamatan.nama_kecamatan}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_kecamatan_id = instance.__dict__.get('kecamatan_id')
+        return instance
+
+    def save(self, *args, **kwargs):
+        old_kecamatan_id = getattr(self, '_loaded_kecamatan_id', None)
+        super().save(*args, **kwargs)
+        if old_kecamatan_id is not None and old_kecamatan_id != self.kecamatan_id:
+            # Semua faktur kelurahan ini pindah kecamatan
+            rollups.rebuild_rollups(kecamatan_ids=[old_kecamatan_id, self.kecamatan_id])
+        self._loaded_kecamatan_id = self.kecamatan_id
+
     class Meta:
         verbose_name = "Kelurahan"
         verbose_name_plural = "Kelurahan"
@@ -55,8 +74,22 @@ class Pembeli(models.Model):
         # maka hash password baru.
         if not self.password.startswith('pbkdf2_sha256$'):
             self.password = make_password(self.password)
+        old_kelurahan_id = getattr(self, '_loaded_kelurahan_id', None)
         super().save(*args, **kwargs)
-   
+        if old_kelurahan_id is not None and old_kelurahan_id != self.kelurahan_id:
+            # Semua faktur pembeli ini pindah wilayah: hitung ulang wilayah lama & baru
+            kecamatan_ids = Kelurahan.objects.filter(
+                pk__in=[old_kelurahan_id, self.kelurahan_id]
+            ).values_list('kecamatan_id', flat=True)
+            rollups.rebuild_rollups(kelurahan_ids=[old_kelurahan_id, self.kelurahan_id])
+            rollups.rebuild_rollups(kecamatan_ids=list(kecamatan_ids))
+        self._loaded_kelurahan_id = self.kelurahan_id
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_kelurahan_id = instance.__dict__.get('kelurahan_id')
+        return instance
 
     def __str__(self):
         return self.nama
@@ -148,6 +181,49 @@ class Kurir(models.Model):
 # =============================
 # MODEL FAKTUR
 # =============================
+# Field faktur yang memengaruhi rollup wilayah (core/rollups.py)
+ROLLUP_FIELDS = {'status', 'pembeli', 'pembeli_id', 'total_faktur'}
+
+
+class FakturQuerySet(models.QuerySet):
+
+    def update(self, **kwargs):
+        """
+        update() massal yang menjaga rollup wilayah dan stempel laporan.
+
+        update() tidak mengirim sinyal, jadi versi "laporan_faktur" dinaikkan
+        di sini, dan bila field rollup ikut diubah, wilayah lama dan baru dari
+        faktur yang tersentuh dihitung ulang.
+        """
+        bump_on_commit('laporan_faktur', using=self.db)
+        if ROLLUP_FIELDS.isdisjoint(kwargs):
+            return super().update(**kwargs)
+        region = ('pembeli__kelurahan_id', 'pembeli__kelurahan__kecamatan_id')
+        with transaction.atomic(using=self.db):
+            regions = set(self.order_by().values_list(*region).distinct())
+            count = super().update(**kwargs)
+            pembeli = kwargs.get('pembeli', kwargs.get('pembeli_id'))
+            if hasattr(pembeli, 'resolve_expression'):
+                # Pembeli tujuan berupa ekspresi: wilayahnya tidak diketahui
+                rollups.rebuild_rollups(using=self.db)
+                return count
+            if pembeli is not None:
+                pembeli = pembeli.pk if isinstance(pembeli, models.Model) else pembeli
+                regions.update(Pembeli.objects.using(self.db).filter(pk=pembeli).values_list(
+                    'kelurahan_id', 'kelurahan__kecamatan_id'))
+            if regions:
+                rollups.rebuild_rollups(
+                    kelurahan_ids=[kelurahan for kelurahan, _ in regions],
+                    kecamatan_ids=[kecamatan for _, kecamatan in regions],
+                    using=self.db,
+                )
+        return count
+
+    def update_raw(self, **kwargs):
+        """update() biasa tanpa sinkronisasi rollup; pemanggil menerapkan delta-nya sendiri."""
+        return super().update(**kwargs)
+
+
 class Faktur(models.Model):
     STATUS_CHOICES = [
         ('diproses', 'Diproses'),
@@ -161,6 +237,8 @@ class Faktur(models.Model):
     berat = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     koli = models.IntegerField(default=0)
     foto_pengiriman = models.ImageField(upload_to='faktur_images/', blank=True, null=True)
+    # Diisi worker setelah foto diproses (core/images.py)
+    foto_pengiriman_thumb = models.ImageField(upload_to='faktur_images/thumbs/', blank=True, null=True, editable=False)
     
     # 🔹 Ganti field kurir agar ambil dari model Kurir baru
     kurir = models.ForeignKey(Kurir, on_delete=models.SET_NULL, null=True, blank=True, related_name='faktur')
@@ -168,20 +246,142 @@ class Faktur(models.Model):
     vendor = models.ForeignKey(Vendor, on_delete=models.CASCADE, related_name='faktur')
     pembeli = models.ForeignKey(Pembeli, on_delete=models.CASCADE, related_name='faktur')
 
+    objects = FakturQuerySet.as_manager()
+
     def __str__(self):
         return f"Faktur #{self.id_faktur} - {self.pembeli.nama}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Wilayah (lewat pembeli) dan status terakhir, untuk rollup statistik
+        instance._loaded_rollup = (instance.__dict__.get('pembeli_id'), instance.__dict__.get('status'))
+        return instance
+
+    def _rollup_state(self):
+        """(pembeli_id, status, total_faktur) seperti yang tersimpan di database."""
+        return Faktur.objects.filter(pk=self.pk).values_list('pembeli_id', 'status', 'total_faktur').first()
+
+    def save(self, *args, **kwargs):
+        # total_faktur hanya berubah lewat delta F() atau update_total(), jadi
+        # saat update biasa jangan timpa dengan salinan lama yang ada di memori.
+        if (not self._state.adding and not kwargs.get('force_insert')
+                and kwargs.get('update_fields') is None):
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name != 'total_faktur'
+            ]
+        # Rollup wilayah diperbarui oleh sinyal (core/signals.py) di transaksi yang sama
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
     def update_total(self):
-        """Hitung ulang total faktur berdasarkan detailnya."""
-        total = Decimal('0.00')
-        for detail in self.detail.all():
-            total += detail.barang.harga_barang * detail.jumlah_barang
-        self.total_faktur = total
-        self.save(update_fields=['total_faktur'])
+        """Hitung ulang total faktur dari nol (satu SUM atas subtotal detail)."""
+        with transaction.atomic():
+            old = self._rollup_state()
+            self.total_faktur = _sum_lines(self.detail.all())
+            self.save(update_fields=['total_faktur'])
+            if old is not None:
+                rollups.total_changed(self.pk, self.total_faktur - old[2])
+
+    def apply_total_delta(self, delta):
+        """Tambahkan selisih ke total_faktur (dan pendapatan wilayahnya) dengan F()."""
+        if not delta:
+            return
+        Faktur.objects.filter(pk=self.pk).update_raw(total_faktur=F('total_faktur') + delta)
+        rollups.total_changed(self.pk, delta)
+        # Baris detail diubah massal tanpa sinyal (add/update/remove_items)
+        bump_on_commit('laporan_faktur')
+        self.total_faktur = (self.total_faktur or Decimal('0.00')) + delta
+
+    def add_items(self, items):
+        """
+        Tambahkan banyak baris detail sekaligus.
+
+        `items` berisi pasangan (barang, jumlah_barang) atau instance DetailFaktur
+        yang belum disimpan. Harga satuan diambil dari Barang saat ini, semua
+        baris dimasukkan dengan satu bulk_create dan total faktur ditambah
+        sekali dengan delta, di dalam satu transaksi.
+        """
+        details = []
+        for item in items:
+            if isinstance(item, DetailFaktur):
+                item.faktur = self
+                details.append(item)
+            else:
+                barang, jumlah_barang = item
+                details.append(DetailFaktur(
+                    faktur=self,
+                    barang_id=barang.pk if isinstance(barang, Barang) else barang,
+                    jumlah_barang=jumlah_barang,
+                ))
+        if not details:
+            return []
+
+        harga = _harga_barang({d.barang_id for d in details})
+        for detail in details:
+            detail.harga_satuan = harga[detail.barang_id]
+            detail.subtotal = detail.harga_satuan * detail.jumlah_barang
+
+        with transaction.atomic():
+            created = DetailFaktur.objects.bulk_create(details)
+            self.apply_total_delta(sum((d.subtotal for d in details), Decimal('0.00')))
+        for detail in created:
+            detail._remember_state()
+        return created
+
+    def update_items(self, details):
+        """Simpan perubahan banyak baris detail dengan satu bulk_update."""
+        details = list(details)
+        if not details:
+            return
+
+        # Harga hanya diambil ulang untuk baris yang barangnya diganti
+        ganti_barang = [d for d in details if d.barang_id != d._loaded_barang_id()]
+        harga = _harga_barang({d.barang_id for d in ganti_barang})
+        for detail in ganti_barang:
+            detail.harga_satuan = harga[detail.barang_id]
+        for detail in details:
+            detail.subtotal = detail.harga_satuan * detail.jumlah_barang
+
+        with transaction.atomic():
+            before = _sum_lines(self.detail.filter(pk__in=[d.pk for d in details]))
+            DetailFaktur.objects.bulk_update(
+                details, ['barang', 'jumlah_barang', 'harga_satuan', 'subtotal']
+            )
+            self.apply_total_delta(sum((d.subtotal for d in details), Decimal('0.00')) - before)
+        for detail in details:
+            detail._remember_state()
+
+    def remove_items(self, details):
+        """Hapus banyak baris detail (instance atau id) dengan satu DELETE."""
+        ids = [d.pk if isinstance(d, DetailFaktur) else d for d in details]
+        if not ids:
+            return
+
+        lines = self.detail.filter(pk__in=ids)
+        with transaction.atomic():
+            delta = -_sum_lines(lines)
+            lines.delete()
+            self.apply_total_delta(delta)
 
     class Meta:
         verbose_name = "Faktur"
         verbose_name_plural = "Faktur"
+        indexes = [
+            # Dashboard kurir: keyset per status, id_faktur menurun (lihat core/pagination.py)
+            models.Index(fields=['kurir', 'status', 'id_faktur'], name='core_faktur_kurir_idx'),
+        ]
+
+
+def _sum_lines(queryset):
+    return queryset.aggregate(total=Sum('subtotal'))['total'] or Decimal('0.00')
+
+
+def _harga_barang(barang_ids):
+    if not barang_ids:
+        return {}
+    return dict(Barang.objects.filter(pk__in=barang_ids).values_list('pk', 'harga_barang'))
 
 
 # =============================
@@ -190,20 +390,59 @@ class Faktur(models.Model):
 class DetailFaktur(models.Model):
     id_detail = models.AutoField(primary_key=True)
     faktur = models.ForeignKey(Faktur, on_delete=models.CASCADE, related_name='detail')
-    barang = models.ForeignKey(Barang, on_delete=models.CASCADE, related_name='detail')
+    # PROTECT: cascade dari Barang menghapus baris secara massal tanpa
+    # DetailFaktur.delete(), sehingga total faktur dan rollup tidak ikut turun
+    barang = models.ForeignKey(Barang, on_delete=models.PROTECT, related_name='detail')
     jumlah_barang = models.IntegerField()
+    # Harga saat baris ditulis, agar faktur lama tidak berubah ketika harga barang diedit
+    harga_satuan = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    subtotal = models.DecimalField(max_digits=15, decimal_places=2, default=0)
 
     def __str__(self):
         return f"{self.barang.nama_barang} x {self.jumlah_barang}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_state()
+        return instance
+
+    def _remember_state(self):
+        # Nilai terakhir yang tersimpan di database, dipakai untuk menghitung delta
+        self._loaded = (
+            self.__dict__.get('faktur_id'),
+            self.__dict__.get('barang_id'),
+            self.__dict__.get('subtotal'),
+        )
+
+    def _loaded_barang_id(self):
+        return getattr(self, '_loaded', (None, None, None))[1]
+
     def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        self.faktur.update_total()
+        old_faktur_id, old_barang_id, old_subtotal = getattr(self, '_loaded', (None, None, None))
+        if old_subtotal is None:
+            old_subtotal = Decimal('0.00')
+        if self._state.adding or self.barang_id != old_barang_id:
+            self.harga_satuan = self.barang.harga_barang
+        self.subtotal = self.harga_satuan * self.jumlah_barang
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if old_faktur_id is not None and old_faktur_id != self.faktur_id:
+                Faktur(pk=old_faktur_id).apply_total_delta(-old_subtotal)
+                old_subtotal = Decimal('0.00')
+            self.faktur.apply_total_delta(self.subtotal - old_subtotal)
+        self._remember_state()
 
     def delete(self, *args, **kwargs):
-        faktur = self.faktur
-        super().delete(*args, **kwargs)
-        faktur.update_total()
+        if not hasattr(self, '_loaded'):
+            self._remember_state()
+        old_faktur_id, _, old_subtotal = self._loaded
+        faktur = self.faktur if old_faktur_id in (None, self.faktur_id) else Faktur(pk=old_faktur_id)
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            faktur.apply_total_delta(-(old_subtotal or Decimal('0.00')))
+        return result
 
     class Meta:
         verbose_name = "Detail Faktur"
@@ -216,14 +455,151 @@ class DetailFaktur(models.Model):
 class Keluhan(models.Model):
     id_keluhan = models.AutoField(primary_key=True)
     pembeli = models.ForeignKey(Pembeli, on_delete=models.CASCADE)
-    faktur = models.CharField(max_length=100, blank=True, null=True)
+    faktur = models.ForeignKey(
+        Faktur, on_delete=models.SET_NULL, blank=True, null=True, related_name='keluhan'
+    )
     isi_keluhan = models.TextField()
     foto = models.ImageField(upload_to='keluhan_images/', blank=True, null=True)
+    # Diisi worker setelah foto diproses (core/images.py)
+    foto_thumb = models.ImageField(upload_to='keluhan_images/thumbs/', blank=True, null=True, editable=False)
     tanggal = models.DateTimeField(default=timezone.now)
 
     def __str__(self):
-        return f"Keluhan {self.pembeli.nama} - {self.faktur if self.faktur else 'Tanpa Faktur'}"
+        return f"Keluhan {self.pembeli.nama} - {f'Faktur #{self.faktur_id}' if self.faktur_id else 'Tanpa Faktur'}"
 
     class Meta:
         verbose_name = "Keluhan"
         verbose_name_plural = "Keluhan"
+        indexes = [
+            models.Index(fields=['pembeli', 'tanggal', 'id_keluhan'], name='core_keluhan_pembeli_idx'),
+            models.Index(fields=['faktur', 'tanggal', 'id_keluhan'], name='core_keluhan_faktur_idx'),
+        ]
+
+
+# =============================
+# MODEL STATISTIK WILAYAH (rollup, lihat core/rollups.py)
+# =============================
+class StatistikWilayah(models.Model):
+    jumlah_faktur = models.IntegerField(default=0)
+    jumlah_diproses = models.IntegerField(default=0)
+    jumlah_selesai = models.IntegerField(default=0)
+    jumlah_dibatalkan = models.IntegerField(default=0)
+    # Total faktur yang tidak dibatalkan
+    pendapatan = models.DecimalField(max_digits=17, decimal_places=2, default=0)
+
+    class Meta:
+        abstract = True
+
+
+class StatistikKelurahan(StatistikWilayah):
+    kelurahan = models.OneToOneField(Kelurahan, on_delete=models.CASCADE, primary_key=True, related_name='statistik')
+
+    def __str__(self):
+        return f"Statistik {self.kelurahan_id}"
+
+    class Meta:
+        verbose_name = "Statistik Kelurahan"
+        verbose_name_plural = "Statistik Kelurahan"
+        indexes = [models.Index(fields=['-jumlah_faktur'], name='core_statkel_jumlah_idx')]
+
+
+class StatistikKecamatan(StatistikWilayah):
+    kecamatan = models.OneToOneField(Kecamatan, on_delete=models.CASCADE, primary_key=True, related_name='statistik')
+
+    def __str__(self):
+        return f"Statistik {self.kecamatan_id}"
+
+    class Meta:
+        verbose_name = "Statistik Kecamatan"
+        verbose_name_plural = "Statistik Kecamatan"
+        indexes = [models.Index(fields=['-jumlah_faktur'], name='core_statkec_jumlah_idx')]
+
+
+# =============================
+# MODEL BACKGROUND JOB
+# =============================
+def export_storage():
+    # Hasil ekspor disimpan di luar MEDIA_ROOT agar tidak ikut tersaji publik
+    return FileSystemStorage(location=settings.EXPORT_ROOT)
+
+
+class BackgroundJob(models.Model):
+    """Tugas berat (ekspor laporan, dsb.) yang dijalankan oleh worker `run_jobs`."""
+    STATUS_CHOICES = [
+        ('antri', 'Antri'),
+        ('berjalan', 'Berjalan'),
+        ('selesai', 'Selesai'),
+        ('gagal', 'Gagal'),
+    ]
+
+    id_job = models.AutoField(primary_key=True)
+    jenis = models.CharField(max_length=50)
+    parameter = models.JSONField(default=dict, blank=True)
+    # Hash dari jenis + parameter, dipakai untuk mendeteksi job yang sama
+    kunci = models.CharField(max_length=64, db_index=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='antri')
+    progres = models.IntegerField(default=0)
+    total = models.IntegerField(default=0)
+    hasil = models.FileField(upload_to='%Y/%m/', storage=export_storage, blank=True, null=True)
+    pesan_error = models.TextField(blank=True)
+    dibuat_oleh = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    dibuat_pada = models.DateTimeField(default=timezone.now)
+    # Detak terakhir worker (saat diklaim dan setiap update progres); job
+    # 'berjalan' yang detaknya lebih tua dari JOB_STALE_TIMEOUT dianggap mati
+    diperbarui_pada = models.DateTimeField(blank=True, null=True)
+    selesai_pada = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"Job #{self.id_job} - {self.jenis} ({self.status})"
+
+    @property
+    def persen(self):
+        if self.status == 'selesai':
+            return 100
+        if not self.total:
+            return 0
+        return min(100, int(self.progres * 100 / self.total))
+
+    class Meta:
+        verbose_name = "Background Job"
+        verbose_name_plural = "Background Job"
+        indexes = [
+            models.Index(fields=['status', 'id_job'], name='core_job_status_idx'),
+        ]
+        # Izin alat performa (core.profiling.can_profile); superuser otomatis punya
+        permissions = [
+            ('view_profiler', 'Dapat memakai profiler request'),
+        ]
+
+
+# =============================
+# PENANDA VERSI PROVISIONING
+# =============================
+class VersiProvisioning(models.Model):
+    """Versi langkah provisioning (core/provisioning.py) yang sudah diterapkan ke database ini."""
+    nama = models.CharField(max_length=50, unique=True)
+    versi = models.IntegerField(default=0)
+    diterapkan_pada = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.nama} v{self.versi}"
+
+    class Meta:
+        verbose_name = "Versi Provisioning"
+        verbose_name_plural = "Versi Provisioning"
+
+
+# =============================
+# STEMPEL VERSI DATA
+# =============================
+class VersiData(models.Model):
+    """Penghitung stempel versi data untuk invalidasi cache (core/versioning.py)."""
+    nama = models.CharField(max_length=50, unique=True)
+    versi = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.nama} v{self.versi}"
+
+    class Meta:
+        verbose_name = "Versi Data"
+        verbose_name_plural = "Versi Data"
@@ -0,0 +1,153 @@
+# core/pagination.py
+"""
+Keyset (cursor) pagination untuk daftar yang terus bertambah panjang.
+
+Berbeda dengan OFFSET, halaman berikutnya diambil dengan kondisi "setelah
+baris terakhir" pada kolom urutan, sehingga database cukup melanjutkan
+pembacaan index dan biaya per halaman tetap sama berapapun panjang riwayatnya.
+
+`keys` adalah daftar field urutan gaya `order_by` ('-tanggal', '-id_keluhan');
+field terakhir harus unik (biasanya primary key). `segments` (opsional) adalah
+daftar filter Q yang ditampilkan berurutan, misalnya faktur yang masih
+diproses lebih dulu, baru kemudian yang selesai/dibatalkan; cursor menyimpan
+nomor segmen beserta nilai kunci baris terakhir.
+"""
+import base64
+import datetime
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+PER_PAGE = 25
+CURSOR_PARAM = "setelah"
+
+
+class _CursorEncoder(DjangoJSONEncoder):
+    def default(self, o):
+        # DjangoJSONEncoder memotong mikrodetik; cursor harus persis sama dengan nilai di database
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+class KeysetPage:
+    """Satu halaman hasil; `next_cursor` None berarti halaman terakhir."""
+
+    def __init__(self, items, next_cursor):
+        self.object_list = items
+        self.next_cursor = next_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+
+def encode_cursor(payload):
+    raw = json.dumps(payload, cls=_CursorEncoder, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Kembalikan payload cursor, atau None bila cursor kosong/rusak."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+    except (ValueError, TypeError):
+        return None
+    if (not isinstance(payload, list) or len(payload) != 2 or isinstance(payload[0], bool)
+            or not isinstance(payload[0], int) or not isinstance(payload[1], list)):
+        return None
+    return payload
+
+
+def _parse_values(model, keys, values):
+    """
+    Nilai kunci dari cursor -> nilai Python per field (field.to_python).
+
+    Cursor datang dari query string dan bisa diubah pengguna; nilai yang tidak
+    valid untuk field-nya menghasilkan None (mulai lagi dari halaman pertama),
+    bukan error 500 saat query dijalankan.
+    """
+    if len(values) != len(keys):
+        return None
+    parsed = []
+    try:
+        for key, value in zip(keys, values):
+            name = key.lstrip("-")
+            field = model._meta.pk if name == "pk" else model._meta.get_field(name)
+            value = field.to_python(value)
+            if value is None or isinstance(value, (list, dict)):
+                return None
+            parsed.append(value)
+    except (ValidationError, ValueError, TypeError):
+        return None
+    return parsed
+
+
+def _after(keys, values):
+    """Kondisi "sesudah `values`" untuk urutan `keys`: (k1 > v1) OR (k1 = v1 AND k2 > v2) ..."""
+    condition = Q()
+    equal = {}
+    for key, value in zip(keys, values):
+        field = key.lstrip("-")
+        lookup = "lt" if key.startswith("-") else "gt"
+        condition |= Q(**equal, **{f"{field}__{lookup}": value})
+        equal[field] = value
+    return condition
+
+
+def _key_values(obj, keys):
+    values = []
+    for key in keys:
+        name = key.lstrip("-")
+        if name == "pk":
+            values.append(obj.pk)
+        else:
+            values.append(getattr(obj, obj._meta.get_field(name).attname))
+    return values
+
+
+def keyset_page(queryset, cursor=None, keys=("-pk",), per_page=PER_PAGE, segments=None):
+    """
+    Ambil satu halaman dari `queryset` sesudah `cursor`.
+
+    Setiap segmen diambil dengan satu query ber-LIMIT (per_page + 1 baris
+    untuk mengetahui apakah masih ada halaman berikutnya).
+    """
+    segments = list(segments) if segments else [Q()]
+    keys = list(keys)
+    state = decode_cursor(cursor)
+    start, last = (state[0], _parse_values(queryset.model, keys, state[1])) if state else (0, None)
+    if not 0 <= start < len(segments) or last is None:
+        start, last = 0, None
+
+    tagged = []  # (nomor segmen, baris)
+    for index in range(start, len(segments)):
+        qs = queryset.filter(segments[index]).order_by(*keys)
+        if index == start and last is not None:
+            qs = qs.filter(_after(keys, last))
+        tagged.extend((index, row) for row in qs[:per_page + 1 - len(tagged)])
+        if len(tagged) > per_page:
+            break
+
+    if len(tagged) <= per_page:
+        return KeysetPage([row for _, row in tagged], None)
+
+    # Masih ada baris: cursor menunjuk baris terakhir halaman ini
+    tagged = tagged[:per_page]
+    segment, last_row = tagged[-1]
+    next_cursor = encode_cursor([segment, _key_values(last_row, keys)])
+    return KeysetPage([row for _, row in tagged], next_cursor)
@@ -0,0 +1,50 @@
+# core/perf_budgets.py
+"""
+Anggaran performa per endpoint, dipakai oleh core/tests.py.
+
+`queries` adalah jumlah query maksimum untuk satu request (dengan dataset
+test, lihat PerfDataMixin); angka ini tidak boleh bergantung pada jumlah
+baris, jadi pola N+1 langsung melewati anggaran. `ms` adalah batas atas
+waktu (terbaik dari beberapa percobaan) yang sengaja longgar untuk mesin CI
+yang lambat; yang dijaga adalah regresi kasar, bukan angka pasti.
+
+Session dibaca dari cache (SESSION_ENGINE cached_db), jadi angka di bawah
+tidak memuat query django_session (kecuali request yang menulis session).
+
+Naikkan anggaran hanya bersama perubahan yang menjelaskan alasannya.
+"""
+
+BUDGETS = {
+    # Publik (anonim: dari cache halaman, AnonymousPageCacheMiddleware)
+    "beranda": {"queries": 0, "ms": 300},
+    # Nama dari session (ActorMiddleware/index); session dari cache (cached_db)
+    "beranda_pembeli": {"queries": 0, "ms": 300},
+
+    # Pembeli (pilihan kelurahan dari core.refdata)
+    "pembeli_register": {"queries": 0, "ms": 300},
+    "pembeli_dashboard": {"queries": 2, "ms": 400},
+    "pembeli_keluhan_riwayat": {"queries": 2, "ms": 400},
+    "pembeli_keluhan_buat": {"queries": 2, "ms": 400},
+    "pembeli_keluhan_buat_post": {"queries": 4, "ms": 400},
+
+    # Vendor
+    "vendor_dashboard": {"queries": 1, "ms": 300},
+    "vendor_keluhan_laporan": {"queries": 2, "ms": 400},
+
+    # Kurir (satu query cek kurir aktif di kurir_required; dashboard: paling
+    # banyak satu query per segmen status)
+    "kurir_dashboard": {"queries": 3, "ms": 400},
+    "kurir_dashboard_halaman_2": {"queries": 3, "ms": 400},
+    "kurir_faktur_detail": {"queries": 3, "ms": 400},
+    "kurir_update_status": {"queries": 5, "ms": 500},
+
+    # Admin
+    "admin_faktur_changelist": {"queries": 8, "ms": 1500},
+    "admin_faktur_changelist_search": {"queries": 8, "ms": 1500},
+    # Inline barang & filter relasi dirender dari core.refdata
+    "admin_faktur_change": {"queries": 10, "ms": 1500},
+    "admin_pembeli_changelist": {"queries": 6, "ms": 1500},
+    "admin_faktur_export": {"queries": 9, "ms": 800},
+    "admin_kelurahan_export": {"queries": 6, "ms": 800},
+    "admin_job_status": {"queries": 4, "ms": 800},
+}
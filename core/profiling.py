@@ -0,0 +1,129 @@
+# core/profiling.py
+"""
+Sampling profiler sesuai permintaan untuk satu request.
+
+Thread pengambil sampel membaca stack thread request lewat
+`sys._current_frames()` setiap PROFILER_INTERVAL detik. Hasilnya disimpan
+dalam format "collapsed stack" (satu baris per stack: `a;b;c jumlah`) yang
+bisa langsung dibuka dengan flamegraph.pl, speedscope, atau inferno.
+
+File disimpan di PROFILE_ROOT dan dibatasi PROFILER_MAX_FILES file terbaru.
+Merekam maupun melihat hasil butuh izin PERMISSION (lihat can_profile), izin
+yang sama dengan menu "Profiler" di JAZZMIN_SETTINGS.
+"""
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.utils import timezone
+
+SUFFIX = ".collapsed"
+_SAFE_NAME = re.compile(r"[^A-Za-z0-9_-]+")
+PERMISSION = "core.view_profiler"
+
+
+def can_profile(user):
+    """Staff aktif dengan izin PERMISSION (superuser selalu lolos)."""
+    return bool(user and user.is_active and user.is_staff and user.has_perm(PERMISSION))
+
+
+class SamplingProfiler:
+    """Ambil sampel stack satu thread sampai `stop()` dipanggil."""
+
+    def __init__(self, thread_id=None, interval=None):
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.interval = interval or settings.PROFILER_INTERVAL
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="core-profiler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self.started
+        return self
+
+    def collapsed(self):
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def _short_path(filename):
+    # Ringkas path: relatif ke proyek, atau mulai dari site-packages
+    base = str(settings.BASE_DIR)
+    if filename.startswith(base):
+        return os.path.relpath(filename, base)
+    marker = "site-packages" + os.sep
+    if marker in filename:
+        return filename.split(marker, 1)[1]
+    return os.path.basename(filename)
+
+
+# ==============================================================
+# 🔹 Penyimpanan hasil
+# ==============================================================
+def save_profile(profiler, label):
+    """Tulis hasil ke PROFILE_ROOT, buang file terlama di atas batas; kembalikan nama file."""
+    os.makedirs(settings.PROFILE_ROOT, exist_ok=True)
+    slug = _SAFE_NAME.sub("-", label).strip("-")[:60] or "root"
+    name = f"{timezone.now():%Y%m%d-%H%M%S-%f}-{slug}{SUFFIX}"
+    with open(os.path.join(settings.PROFILE_ROOT, name), "w", encoding="utf-8") as f:
+        f.write(profiler.collapsed())
+    _prune()
+    return name
+
+
+def _prune():
+    files = list_profiles()
+    for entry in files[settings.PROFILER_MAX_FILES:]:
+        try:
+            os.remove(entry["path"])
+        except FileNotFoundError:
+            pass
+
+
+def list_profiles():
+    """File profil terbaru lebih dulu."""
+    try:
+        names = [n for n in os.listdir(settings.PROFILE_ROOT) if n.endswith(SUFFIX)]
+    except FileNotFoundError:
+        return []
+    entries = []
+    for name in names:
+        path = os.path.join(settings.PROFILE_ROOT, name)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        entries.append({"name": name, "path": path, "size": stat.st_size, "mtime": stat.st_mtime})
+    return sorted(entries, key=lambda e: e["name"], reverse=True)
+
+
+def profile_path(name):
+    """Path file profil bila nama valid dan file ada, selain itu None."""
+    if os.path.basename(name) != name or not name.endswith(SUFFIX):
+        return None
+    path = os.path.join(settings.PROFILE_ROOT, name)
+    return path if os.path.isfile(path) else None
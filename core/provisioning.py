@@ -0,0 +1,97 @@
+# core/provisioning.py
+"""
+Data awal aplikasi (group Pimpinan, user pimpinan1, kurir dummy).
+
+Dulu dibuat di CoreConfig.ready(), sehingga setiap proses (worker, perintah
+manage.py, test) menjalankan belasan query dan tulis saat start, dan worker
+yang start bersamaan saling balapan. Sekarang dijalankan dari sinyal
+post_migrate, jadi hanya saat `manage.py migrate`:
+
+- versi yang sudah diterapkan disimpan di VersiProvisioning; bila sudah
+  >= VERSION, handler berhenti setelah satu query;
+- semua langkah idempoten, dan baris penanda dikunci (select_for_update)
+  selama provisioning agar dua `migrate` bersamaan tidak dobel.
+
+Ubah/tambah langkah di `_apply` lalu naikkan VERSION agar diterapkan ulang
+pada `migrate` berikutnya.
+"""
+from django.apps import apps as global_apps
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+MARKER = "core"
+VERSION = 1
+
+DUMMY_KURIR = [
+    {'nama': 'Kurir 1', 'no_hp': '081234567890', 'email': 'kurir1@example.com'},
+    {'nama': 'Kurir 2', 'no_hp': '089876543210', 'email': 'kurir2@example.com'},
+]
+
+
+def _apply(apps, using):
+    Group = apps.get_model('auth', 'Group')
+    Permission = apps.get_model('auth', 'Permission')
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    Kurir = apps.get_model('core', 'Kurir')
+
+    # ======================================================
+    # GROUP DAN USER UNTUK PIMPINAN
+    # ======================================================
+    pimpinan_group, _ = Group.objects.using(using).get_or_create(name='Pimpinan')
+    pimpinan_group.permissions.set(Permission.objects.using(using).filter(
+        content_type__app_label='core',
+        content_type__model='faktur',
+        codename__in=['view_faktur'],
+    ))
+
+    # Model historis tidak punya set_password(): hash dibuat langsung
+    pimpinan1, created = User.objects.using(using).get_or_create(
+        username='pimpinan1',
+        defaults={'password': make_password('12345'), 'is_staff': True},
+    )
+    if created:
+        pimpinan1.groups.add(pimpinan_group)
+
+    # ======================================================
+    # DATA DUMMY KURIR (masuk ke model Kurir, bukan User)
+    # ======================================================
+    for data in DUMMY_KURIR:
+        Kurir.objects.using(using).get_or_create(
+            email=data['email'],
+            defaults={'nama': data['nama'], 'no_hp': data['no_hp']},
+        )
+
+
+def provision(apps, using='default', verbosity=1):
+    """Terapkan provisioning bila versi di database lebih lama; kembalikan True bila dijalankan."""
+    Marker = apps.get_model('core', 'VersiProvisioning')
+    if Marker.objects.using(using).filter(nama=MARKER, versi__gte=VERSION).exists():
+        return False
+
+    with transaction.atomic(using=using):
+        marker, _ = Marker.objects.using(using).get_or_create(nama=MARKER)
+        marker = Marker.objects.using(using).select_for_update().get(pk=marker.pk)
+        if marker.versi >= VERSION:
+            return False
+        _apply(apps, using)
+        marker.versi = VERSION
+        marker.diterapkan_pada = timezone.now()
+        marker.save(update_fields=['versi', 'diterapkan_pada'])
+
+    if verbosity >= 1:
+        print(f"  Provisioning core diperbarui ke versi {VERSION}.")
+    return True
+
+
+def post_migrate_handler(sender, app_config=None, apps=global_apps, using='default', verbosity=1, plan=None, **kwargs):
+    # Dipasang dengan sender=CoreConfig; permission & content type core sudah
+    # dibuat oleh handler auth/contenttypes yang terdaftar lebih dulu.
+    # `manage.py flush` (juga TransactionTestCase) mengirim sinyal tanpa `apps`.
+    try:
+        apps.get_model('core', 'VersiProvisioning')
+    except LookupError:
+        # migrate mundur ke sebelum tabel penanda ada
+        return
+    provision(apps, using=using, verbosity=verbosity)
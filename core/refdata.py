@@ -0,0 +1,154 @@
+# core/refdata.py
+"""
+Cache data referensi (Kecamatan, Kelurahan, Kategori, Barang) di memori proses.
+
+Tabel-tabel ini kecil dan jarang berubah, tetapi dibaca di banyak tempat:
+pilihan kelurahan di form registrasi, filter admin, dan widget autocomplete.
+Setiap tabel dimuat sekali dengan satu query (join ke induknya) menjadi
+baris ringkas ber-__slots__, lalu dipakai ulang tanpa query.
+
+Validitas dijaga dengan stempel versi "refdata" (core.versioning) yang
+dinaikkan core/signals.py setelah commit setiap save/delete keempat model.
+Stempel dibaca dari cache bersama (settings.VERSION_CACHE_ALIAS), jadi
+perubahan dari proses lain terlihat pada akses berikutnya.
+"""
+import threading
+
+from .models import Barang, Kategori, Kecamatan, Kelurahan
+from .versioning import get_version
+
+VERSION_NAME = "refdata"
+
+
+class KecamatanRow:
+    __slots__ = ("pk", "nama")
+
+    def __init__(self, pk, nama):
+        self.pk = pk
+        self.nama = nama
+
+    def __str__(self):
+        return self.nama
+
+
+class KelurahanRow:
+    __slots__ = ("pk", "nama", "kode_pos", "kecamatan_id", "kecamatan_nama")
+
+    def __init__(self, pk, nama, kode_pos, kecamatan_id, kecamatan_nama):
+        self.pk = pk
+        self.nama = nama
+        self.kode_pos = kode_pos
+        self.kecamatan_id = kecamatan_id
+        self.kecamatan_nama = kecamatan_nama
+
+    def __str__(self):
+        # Sama dengan Kelurahan.__str__
+        return f"{self.nama}, Kec. {self.kecamatan_nama}"
+
+
+class KategoriRow:
+    __slots__ = ("pk", "nama")
+
+    def __init__(self, pk, nama):
+        self.pk = pk
+        self.nama = nama
+
+    def __str__(self):
+        return self.nama
+
+
+class BarangRow:
+    __slots__ = ("pk", "nama", "harga", "kategori_id", "kategori_nama")
+
+    def __init__(self, pk, nama, harga, kategori_id, kategori_nama):
+        self.pk = pk
+        self.nama = nama
+        self.harga = harga
+        self.kategori_id = kategori_id
+        self.kategori_nama = kategori_nama
+
+    def __str__(self):
+        return self.nama
+
+
+# ==============================================================
+# 🔹 Pemuat per tabel (satu query masing-masing)
+# ==============================================================
+def _load_kecamatan():
+    rows = Kecamatan.objects.order_by("nama_kecamatan").values_list("pk", "nama_kecamatan")
+    return [KecamatanRow(*row) for row in rows]
+
+
+def _load_kelurahan():
+    rows = Kelurahan.objects.order_by("kecamatan__nama_kecamatan", "nama_kelurahan").values_list(
+        "pk", "nama_kelurahan", "kode_pos", "kecamatan_id", "kecamatan__nama_kecamatan",
+    )
+    return [KelurahanRow(*row) for row in rows]
+
+
+def _load_kategori():
+    rows = Kategori.objects.order_by("nama").values_list("pk", "nama")
+    return [KategoriRow(*row) for row in rows]
+
+
+def _load_barang():
+    rows = Barang.objects.order_by("nama_barang").values_list(
+        "pk", "nama_barang", "harga_barang", "kategori_id", "kategori__nama",
+    )
+    return [BarangRow(*row) for row in rows]
+
+
+TABLES = {
+    Kecamatan: ("kecamatan", _load_kecamatan),
+    Kelurahan: ("kelurahan", _load_kelurahan),
+    Kategori: ("kategori", _load_kategori),
+    Barang: ("barang", _load_barang),
+}
+_LOADERS = dict(TABLES.values())
+
+_lock = threading.Lock()
+# nama tabel -> (versi, tuple baris, {pk: baris})
+_tables = {}
+
+
+def _table(name):
+    version = get_version(VERSION_NAME)
+    entry = _tables.get(name)
+    if entry is None or entry[0] != version:
+        with _lock:
+            entry = _tables.get(name)
+            if entry is None or entry[0] != version:
+                rows = tuple(_LOADERS[name]())
+                # Versi dibaca sebelum memuat: bila data berubah selama memuat,
+                # panggilan berikutnya melihat versi baru dan memuat ulang.
+                entry = (version, rows, {row.pk: row for row in rows})
+                _tables[name] = entry
+    return entry
+
+
+def table_for(model):
+    """Nama tabel refdata untuk model, atau None bila model bukan data referensi."""
+    entry = TABLES.get(model)
+    return entry[0] if entry else None
+
+
+def rows(name):
+    return _table(name)[1]
+
+
+def get(name, pk):
+    try:
+        return _table(name)[2].get(int(pk))
+    except (TypeError, ValueError):
+        return None
+
+
+def choices(name):
+    """[(pk, label)] untuk <select> / filter admin, urut sesuai label induk lalu nama."""
+    return [(row.pk, str(row)) for row in rows(name)]
+
+
+def clear():
+    """Kosongkan cache proses ini (untuk test); proses lain memakai stempel versi."""
+    with _lock:
+        _tables.clear()
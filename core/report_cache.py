@@ -0,0 +1,61 @@
+# core/report_cache.py
+"""
+Cache hasil laporan (bytes PDF) di memori proses dengan eviksi LRU.
+
+Kunci selalu menyertakan stempel versi data (lihat core.versioning), jadi
+entri lama tidak perlu dihapus manual: entri itu tidak akan diminta lagi
+dan akhirnya tergeser oleh eviksi LRU.
+"""
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+class LRUBytesCache:
+    """LRU sederhana yang dibatasi jumlah entri dan total ukuran bytes."""
+
+    def __init__(self, max_entries, max_bytes):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._data[key] = value
+            self._size += len(value)
+            while len(self._data) > self.max_entries or self._size > self.max_bytes:
+                _, evicted = self._data.popitem(last=False)
+                self._size -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._size = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    @property
+    def size(self):
+        return self._size
+
+
+report_cache = LRUBytesCache(
+    max_entries=settings.REPORT_CACHE_MAX_ENTRIES,
+    max_bytes=settings.REPORT_CACHE_MAX_BYTES,
+)
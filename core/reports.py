@@ -0,0 +1,521 @@
+# core/reports.py
+"""
+Pembuatan laporan PDF untuk admin.
+
+Laporan dirender halaman per halaman langsung ke canvas ReportLab: baris
+dibaca dari database per chunk, dipotong menjadi tabel seukuran halaman, dan
+setiap halaman langsung digambar lalu dilepas. Dengan begitu jumlah objek
+Python yang hidup tetap kecil berapapun jumlah fakturnya.
+"""
+import io
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.db.models import Prefetch
+from django.http import FileResponse
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import landscape, A4
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+from reportlab.platypus import Frame, Paragraph, Spacer, Table, TableStyle
+
+try:
+    from pypdf import PdfReader
+    from pypdf.generic import (
+        ArrayObject, DecodedStreamObject, DictionaryObject, IndirectObject,
+        NameObject, NumberObject, TextStringObject,
+    )
+except ImportError:  # pypdf opsional: tanpa pypdf laporan dirender serial
+    PdfReader = None
+
+from .models import DetailFaktur, StatistikKelurahan
+
+# Jumlah faktur yang dibaca per query saat iterasi
+CHUNK_SIZE = 500
+# Jumlah baris per potongan tabel (kira-kira satu halaman)
+ROWS_PER_TABLE = 25
+# File sementara tetap di memori sampai ukuran ini, setelah itu pindah ke disk
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
+# Jumlah baris per fragmen PDF pada render paralel
+ROWS_PER_FRAGMENT = 2000
+
+FAKTUR_PAGESIZE = landscape(A4)
+FAKTUR_MARGINS = dict(left=30, right=30, top=30, bottom=60)
+FAKTUR_HEADER = ["No", "Pembeli", "Vendor", "Kurir", "Status", "Total", "Barang (Detail Faktur)"]
+FAKTUR_COL_WIDTHS = [30, 90, 90, 90, 80, 70, 250]
+
+FAKTUR_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor("#1F4E79")),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 10),
+    ('FONTSIZE', (0, 1), (-1, -1), 9),
+    ('GRID', (0, 0), (-1, -1), 0.25, colors.grey),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.whitesmoke, colors.lightgrey]),
+    ('LEFTPADDING', (0, 0), (-1, -1), 6),
+    ('RIGHTPADDING', (0, 0), (-1, -1), 6),
+])
+
+TITLE_STYLE = ParagraphStyle(name='CenterTitle', fontSize=16, alignment=1, spaceAfter=20, leading=20)
+DETAIL_STYLE = ParagraphStyle(name='DetailBarang', fontSize=9, leading=11)
+# Tanda tangan "Mengetahui" agak ke kanan (indent dari kiri halaman)
+SIGNATURE_STYLE = ParagraphStyle(name="RightAligned", alignment=0, leftIndent=400, fontSize=11, leading=15)
+
+KELURAHAN_PAGESIZE = A4
+KELURAHAN_MARGINS = dict(left=40, right=40, top=40, bottom=60)
+KELURAHAN_HEADER = ["No", "Nama Kelurahan", "Kecamatan", "Kode Pos", "Total Pengiriman"]
+KELURAHAN_COL_WIDTHS = [30, 120, 120, 80, 100]
+
+KELURAHAN_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor("#203864")),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('GRID', (0, 0), (-1, -1), 0.25, colors.grey),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.whitesmoke, colors.lightgrey])
+])
+RIGHT_STYLE = ParagraphStyle(name="right", alignment=2, fontSize=11)
+
+
+# ==============================================================
+# 🔹 Data laporan faktur
+# ==============================================================
+def faktur_rows(queryset, chunk_size=CHUNK_SIZE, ids=None):
+    """
+    Hasilkan baris tabel laporan faktur satu per satu.
+
+    Relasi pembeli/vendor/kurir di-join dan detail+barang di-prefetch per
+    chunk, jadi jumlah query sebanding dengan jumlah chunk, bukan jumlah faktur.
+
+    Dengan `ids` (urut naik), faktur diambil per chunk `pk__in` berurutan id:
+    satu `pk__in` berisi semua pilihan melewati batas variabel SQL SQLite
+    (32766) saat admin memilih semua faktur.
+    """
+    if ids is not None or not queryset.ordered:
+        queryset = queryset.order_by('id_faktur')
+    queryset = (
+        queryset
+        .select_related('pembeli', 'vendor', 'kurir')
+        .prefetch_related(Prefetch(
+            'detail',
+            queryset=DetailFaktur.objects.select_related('barang').only(
+                'faktur', 'jumlah_barang', 'barang__nama_barang'
+            ),
+        ))
+    )
+    if ids is None:
+        fakturs = queryset.iterator(chunk_size=chunk_size)
+    else:
+        fakturs = (
+            faktur
+            for start in range(0, len(ids), chunk_size)
+            for faktur in queryset.filter(pk__in=ids[start:start + chunk_size])
+        )
+    for i, faktur in enumerate(fakturs, start=1):
+        details = ", ".join(
+            f"{d.barang.nama_barang} ({d.jumlah_barang})" for d in faktur.detail.all()
+        )
+        yield [
+            str(i),
+            faktur.pembeli.nama,
+            faktur.vendor.nama,
+            faktur.kurir.nama if faktur.kurir else "-",
+            faktur.status,
+            f"Rp {faktur.total_faktur:,.0f}",
+            details,
+        ]
+
+
+def _chunked(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def faktur_tables(rows, rows_per_table=ROWS_PER_TABLE):
+    """Potong baris menjadi tabel kecil; setiap tabel membawa header sendiri."""
+    for chunk in _chunked(rows, rows_per_table):
+        data = [FAKTUR_HEADER]
+        for row in chunk:
+            data.append(row[:-1] + [Paragraph(row[-1], DETAIL_STYLE)])
+        table = Table(data, repeatRows=1, colWidths=FAKTUR_COL_WIDTHS)
+        table.setStyle(FAKTUR_TABLE_STYLE)
+        yield table
+
+
+def count_rows(rows, progress, every=100):
+    """Teruskan baris sambil melaporkan jumlah yang sudah diproses ke `progress`."""
+    done = 0
+    for row in rows:
+        yield row
+        done += 1
+        if done % every == 0:
+            progress(done)
+    progress(done)
+
+
+def signature_flowables():
+    return [
+        Spacer(1, 40),
+        Paragraph("Mengetahui,", SIGNATURE_STYLE),
+        Spacer(1, 8),
+        Paragraph("<b>Pimpinan Trio Prima Logistik</b>", SIGNATURE_STYLE),
+        Spacer(1, 40),
+        Paragraph("................................................", SIGNATURE_STYLE),
+    ]
+
+
+def faktur_flowables(rows, with_title=True, with_signature=True):
+    if with_title:
+        yield Paragraph("LAPORAN DATA FAKTUR TRIO PRIMA LOGISTIK", TITLE_STYLE)
+        yield Spacer(1, 12)
+    yield from faktur_tables(rows)
+    if with_signature:
+        yield from signature_flowables()
+
+
+# ==============================================================
+# 🔹 Data laporan kelurahan
+# ==============================================================
+def kelurahan_rows():
+    """Baris laporan kelurahan dengan pengiriman terbanyak (dibaca dari tabel rollup)."""
+    data = (
+        StatistikKelurahan.objects
+        .select_related("kelurahan__kecamatan")
+        .filter(jumlah_faktur__gt=0)
+        .order_by("-jumlah_faktur")
+    )
+    for i, stat in enumerate(data, start=1):
+        k = stat.kelurahan
+        yield [str(i), k.nama_kelurahan, k.kecamatan.nama_kecamatan, k.kode_pos, str(stat.jumlah_faktur)]
+
+
+def kelurahan_flowables(rows):
+    yield Paragraph("LAPORAN DATA KELURAHAN TRIO PRIMA LOGISTIK", TITLE_STYLE)
+    yield Spacer(1, 12)
+    for chunk in _chunked(rows, ROWS_PER_TABLE * 2):
+        table = Table([KELURAHAN_HEADER] + chunk, repeatRows=1, colWidths=KELURAHAN_COL_WIDTHS)
+        table.setStyle(KELURAHAN_TABLE_STYLE)
+        yield table
+    yield Spacer(1, 30)
+    yield Paragraph("Mengetahui,", RIGHT_STYLE)
+    yield Spacer(1, 10)
+    yield Paragraph("<b>Pimpinan Trio Prima Logistik</b>", RIGHT_STYLE)
+    yield Spacer(1, 40)
+    yield Paragraph("................................................", ParagraphStyle(name="center", alignment=2))
+
+
+# ==============================================================
+# 🔹 Render halaman per halaman
+# ==============================================================
+def draw_pages(canv, flowables, pagesize, margins, first_page=1, page_numbers=True):
+    """
+    Gambar flowable ke canvas halaman demi halaman.
+
+    Berbeda dengan SimpleDocTemplate.build() yang butuh seluruh daftar
+    flowable di memori, fungsi ini hanya mengambil flowable berikutnya dari
+    iterator saat ruang di halaman masih ada. Mengembalikan jumlah halaman.
+    """
+    width, height = pagesize
+    source = iter(flowables)
+    pending = []
+    page = first_page
+
+    while True:
+        frame = Frame(
+            margins['left'], margins['bottom'],
+            width - margins['left'] - margins['right'],
+            height - margins['top'] - margins['bottom'],
+            leftPadding=0, rightPadding=0, topPadding=0, bottomPadding=0,
+        )
+        drawn = 0
+        selesai = False
+        while True:
+            if not pending:
+                nxt = next(source, None)
+                if nxt is None:
+                    selesai = True
+                    break
+                pending.append(nxt)
+            flowable = pending[0]
+            if frame.add(flowable, canv, trySplit=1):
+                pending.pop(0)
+                drawn += 1
+                continue
+            parts = frame.split(flowable, canv)
+            if parts:
+                pending[0:1] = parts
+                continue
+            if not drawn:
+                # Halaman kosong pun tidak cukup: lewati daripada berputar tanpa henti
+                pending.pop(0)
+                continue
+            break
+
+        if page_numbers:
+            _draw_footer(canv, page, pagesize, margins)
+        if selesai:
+            return page - first_page + 1
+        canv.showPage()
+        page += 1
+
+
+def _draw_footer(canv, page, pagesize, margins):
+    canv.saveState()
+    canv.setFont('Helvetica', 8)
+    canv.drawCentredString(pagesize[0] / 2, margins['bottom'] / 2, f"Halaman {page}")
+    canv.restoreState()
+
+
+def build_faktur_pdf(output, rows):
+    """Tulis laporan faktur dari iterator `rows` ke file-like `output`."""
+    canv = canvas.Canvas(output, pagesize=FAKTUR_PAGESIZE, pageCompression=1)
+    canv.setTitle("Laporan Faktur")
+    draw_pages(canv, faktur_flowables(rows), FAKTUR_PAGESIZE, FAKTUR_MARGINS)
+    canv.save()
+
+
+# ==============================================================
+# 🔹 Render paralel per rentang baris
+# ==============================================================
+def render_faktur_fragment(rows, first, last):
+    """
+    Render satu rentang baris menjadi PDF terpisah (dijalankan di proses worker).
+
+    Judul hanya ada di fragmen pertama dan tanda tangan hanya di fragmen
+    terakhir; nomor halaman ditambahkan setelah semua fragmen digabung.
+    """
+    buffer = io.BytesIO()
+    canv = canvas.Canvas(buffer, pagesize=FAKTUR_PAGESIZE, pageCompression=1)
+    draw_pages(
+        canv, faktur_flowables(rows, with_title=first, with_signature=last),
+        FAKTUR_PAGESIZE, FAKTUR_MARGINS, page_numbers=False,
+    )
+    canv.save()
+    return buffer.getvalue()
+
+
+class PdfAppender:
+    """
+    Gabungkan fragmen PDF ReportLab ke `output` satu per satu.
+
+    Objek setiap fragmen langsung ditulis ke `output` dengan nomor objek baru,
+    jadi yang ada di memori hanya satu fragmen ditambah tabel offset xref dan
+    daftar referensi halaman, bukan seluruh dokumen seperti PdfWriter pypdf.
+    Nomor halaman ditambahkan sebagai content stream tambahan per halaman.
+    """
+
+    # Objek yang nomornya tetap; ditulis di awal (font) atau di close()
+    CATALOG, PAGES, INFO, FONT, SAVE_STATE = 1, 2, 3, 4, 5
+    FONT_NAME = "/FHal"
+
+    def __init__(self, output, pagesize, margins, title):
+        self.output = output
+        self.pagesize = pagesize
+        self.margins = margins
+        self.title = title
+        self.offsets = {}
+        self.position = 0
+        self.next_id = self.SAVE_STATE + 1
+        self.kids = []
+
+        self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self._write_object(self.FONT, DictionaryObject({
+            NameObject("/Type"): NameObject("/Font"),
+            NameObject("/Subtype"): NameObject("/Type1"),
+            NameObject("/BaseFont"): NameObject("/Helvetica"),
+            NameObject("/Encoding"): NameObject("/WinAnsiEncoding"),
+        }))
+        # Isi halaman asli dibungkus q ... Q agar state grafisnya tidak bocor ke footer
+        self._write_object(self.SAVE_STATE, self._stream(b"q\n"))
+
+    def _write(self, data):
+        self.output.write(data)
+        self.position += len(data)
+
+    def _new_id(self):
+        self.next_id += 1
+        return self.next_id - 1
+
+    def _write_object(self, number, obj):
+        buffer = io.BytesIO()
+        buffer.write(f"{number} 0 obj\n".encode())
+        obj.write_to_stream(buffer)
+        buffer.write(b"\nendobj\n")
+        self.offsets[number] = self.position
+        self._write(buffer.getvalue())
+
+    @staticmethod
+    def _stream(data):
+        stream = DecodedStreamObject()
+        stream.set_data(data)
+        return stream
+
+    @staticmethod
+    def _ref(number):
+        return IndirectObject(number, 0, None)
+
+    def _footer(self, page):
+        # Sama dengan _draw_footer: Helvetica 8, di tengah margin bawah
+        text = f"Halaman {page}"
+        x = self.pagesize[0] / 2 - stringWidth(text, "Helvetica", 8) / 2
+        y = self.margins["bottom"] / 2
+        return self._stream(
+            f"Q\nq 0 g BT {self.FONT_NAME} 8 Tf {x:.2f} {y:.2f} Td ({text}) Tj ET Q\n".encode()
+        )
+
+    def append(self, data):
+        """Tulis semua halaman fragmen `data` (bytes PDF) ke output."""
+        reader = PdfReader(io.BytesIO(data))
+        renumbered = {}
+        queue = deque()
+
+        def ref(indirect):
+            if indirect.pdf is not reader:
+                return indirect  # referensi milik dokumen gabungan
+            number = renumbered.get(indirect.idnum)
+            if number is None:
+                number = renumbered[indirect.idnum] = self._new_id()
+                queue.append((number, indirect.get_object()))
+            return self._ref(number)
+
+        for page in reader.pages:
+            page_id = renumbered[page.indirect_reference.idnum] = self._new_id()
+            footer_id = self._new_id()
+            self._write_object(footer_id, self._footer(len(self.kids) + 1))
+
+            contents = dict.get(page, "/Contents")
+            contents = list(contents) if isinstance(contents, ArrayObject) else [contents]
+            page[NameObject("/Contents")] = ArrayObject(
+                [self._ref(self.SAVE_STATE), *contents, self._ref(footer_id)]
+            )
+            page[NameObject("/Parent")] = self._ref(self.PAGES)
+            # getitem pypdf me-resolve referensi: dict font yang sama dipakai
+            # ulang oleh reader saat objeknya ditulis
+            if "/Resources" not in page:
+                page[NameObject("/Resources")] = DictionaryObject()
+            resources = page["/Resources"]
+            if "/Font" not in resources:
+                resources[NameObject("/Font")] = DictionaryObject()
+            resources["/Font"][NameObject(self.FONT_NAME)] = self._ref(self.FONT)
+
+            self._write_object(page_id, _renumber(page, ref))
+            self.kids.append(self._ref(page_id))
+            while queue:
+                number, obj = queue.popleft()
+                self._write_object(number, _renumber(obj, ref))
+
+    def close(self):
+        """Tulis pohon halaman, katalog, xref, dan trailer."""
+        self._write_object(self.PAGES, DictionaryObject({
+            NameObject("/Type"): NameObject("/Pages"),
+            NameObject("/Kids"): ArrayObject(self.kids),
+            NameObject("/Count"): NumberObject(len(self.kids)),
+        }))
+        self._write_object(self.CATALOG, DictionaryObject({
+            NameObject("/Type"): NameObject("/Catalog"),
+            NameObject("/Pages"): self._ref(self.PAGES),
+        }))
+        self._write_object(self.INFO, DictionaryObject({
+            NameObject("/Title"): TextStringObject(self.title),
+        }))
+
+        xref = self.position
+        lines = [f"xref\n0 {self.next_id}\n", "0000000000 65535 f \n"]
+        lines += [f"{self.offsets[number]:010d} 00000 n \n" for number in range(1, self.next_id)]
+        lines.append(
+            f"trailer\n<< /Size {self.next_id} /Root {self.CATALOG} 0 R /Info {self.INFO} 0 R >>\n"
+            f"startxref\n{xref}\n%%EOF\n"
+        )
+        self._write("".join(lines).encode())
+
+
+def _renumber(obj, ref):
+    """Ganti (di tempat) setiap referensi objek di `obj` dengan hasil `ref`."""
+    if isinstance(obj, IndirectObject):
+        return ref(obj)
+    if isinstance(obj, DictionaryObject):
+        for key, value in list(dict.items(obj)):
+            dict.__setitem__(obj, key, _renumber(value, ref))
+    elif isinstance(obj, ArrayObject):
+        for index, value in enumerate(obj):
+            obj[index] = _renumber(value, ref)
+    return obj
+
+
+def build_faktur_pdf_parallel(output, rows, workers, rows_per_fragment=ROWS_PER_FRAGMENT):
+    """
+    Seperti build_faktur_pdf, tetapi layout ReportLab dibagi ke beberapa proses.
+
+    Baris dipotong per `rows_per_fragment`, setiap potongan dirender menjadi
+    fragmen PDF di ProcessPoolExecutor, lalu fragmen ditulis ke `output`
+    sesuai urutan begitu selesai (PdfAppender) dan diberi nomor halaman.
+    Jumlah fragmen yang sedang diproses dibatasi agar memori tetap
+    terkendali. Tanpa pypdf atau dengan satu worker, jatuh kembali ke render
+    serial.
+    """
+    if workers <= 1 or PdfReader is None:
+        return build_faktur_pdf(output, rows)
+
+    chunks = _chunked(rows, rows_per_fragment)
+    chunk = next(chunks, None)
+    if chunk is None:
+        return build_faktur_pdf(output, [])
+
+    appender = PdfAppender(output, FAKTUR_PAGESIZE, FAKTUR_MARGINS, "Laporan Faktur")
+    # initializer=django.setup agar modul ini bisa diimpor di worker hasil 'spawn'
+    with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as pool:
+        pending = deque()
+        first = True
+        while chunk is not None:
+            # Intip potongan berikutnya untuk tahu apakah ini fragmen terakhir
+            nxt = next(chunks, None)
+            pending.append(pool.submit(render_faktur_fragment, chunk, first, nxt is None))
+            first = False
+            chunk = nxt
+            while len(pending) > workers * 2:
+                appender.append(pending.popleft().result())
+        while pending:
+            appender.append(pending.popleft().result())
+    appender.close()
+
+
+def build_kelurahan_pdf(output, rows):
+    """Tulis laporan kelurahan dari iterator `rows` ke file-like `output`."""
+    canv = canvas.Canvas(output, pagesize=KELURAHAN_PAGESIZE, pageCompression=1)
+    canv.setTitle("Laporan Kelurahan")
+    draw_pages(canv, kelurahan_flowables(rows), KELURAHAN_PAGESIZE, KELURAHAN_MARGINS)
+    canv.save()
+
+
+def spooled_pdf(build):
+    """Render PDF ke SpooledTemporaryFile; file besar otomatis pindah ke disk."""
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    build(spool)
+    spool.seek(0)
+    return spool
+
+
+def pdf_file_response(build, filename):
+    """
+    Render PDF ke SpooledTemporaryFile lalu kirim sebagai respons streaming.
+
+    File kecil tetap di memori, file besar otomatis pindah ke disk; respons
+    dikirim per blok oleh FileResponse sehingga tidak disalin ulang ke memori.
+    """
+    return FileResponse(spooled_pdf(build), as_attachment=True, filename=filename, content_type="application/pdf")
+
+
+def faktur_pdf_response(queryset):
+    return pdf_file_response(lambda out: build_faktur_pdf(out, faktur_rows(queryset)), "laporan_faktur.pdf")
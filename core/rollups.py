@@ -0,0 +1,177 @@
+# core/rollups.py
+"""
+Pemeliharaan tabel rollup StatistikKelurahan dan StatistikKecamatan.
+
+Setiap faktur menyumbang ke baris wilayah pembelinya: jumlah faktur, jumlah
+per status, dan pendapatan (total faktur yang tidak dibatalkan). Perubahan
+faktur diterapkan sebagai delta F() sehingga biayanya O(1) per perubahan;
+`rebuild_rollups` menghitung ulang semuanya dengan satu agregat per tabel.
+
+Delta dipicu sinyal faktur (core/signals.py), sehingga delete queryset dan
+cascade ikut tercatat; update() massal menghitung ulang wilayah yang
+tersentuh (FakturQuerySet.update di models.py). Hitung ulang tidak lewat
+sinyal, jadi `rebuild_rollups` sendiri menaikkan versi "laporan_wilayah"
+setelah commit.
+
+Model diambil lewat registry aplikasi karena modul ini diimpor models.py.
+"""
+from decimal import Decimal
+
+from django.apps import apps as global_apps
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .versioning import bump_on_commit
+
+STATUS_FIELDS = {
+    'diproses': 'jumlah_diproses',
+    'selesai': 'jumlah_selesai',
+    'dibatalkan': 'jumlah_dibatalkan',
+}
+# Status yang tidak dihitung sebagai pendapatan
+NON_REVENUE = ('dibatalkan',)
+
+
+def _model(name):
+    return global_apps.get_model('core', name)
+
+
+def _contribution(status, total):
+    delta = {'jumlah_faktur': 1, STATUS_FIELDS[status]: 1}
+    if status not in NON_REVENUE:
+        delta['pendapatan'] = Decimal(total or 0)
+    return delta
+
+
+def _region(pembeli_id):
+    Pembeli = _model('Pembeli')
+    return Pembeli.objects.filter(pk=pembeli_id).values_list(
+        'kelurahan_id', 'kelurahan__kecamatan_id'
+    ).first()
+
+
+def _apply(region, delta):
+    """
+    Terapkan delta ke baris kelurahan dan kecamatan.
+
+    Baris yang belum ada hanya dibuat untuk delta penambahan; pengurangan pada
+    baris yang tidak ada (mis. sudah ikut terhapus cascade bersama wilayahnya)
+    diabaikan.
+    """
+    delta = {field: value for field, value in delta.items() if value}
+    if region is None or not delta:
+        return
+    create = all(value > 0 for value in delta.values())
+    kelurahan_id, kecamatan_id = region
+    for model, key, pk in (
+        (_model('StatistikKelurahan'), 'kelurahan_id', kelurahan_id),
+        (_model('StatistikKecamatan'), 'kecamatan_id', kecamatan_id),
+    ):
+        updates = {field: F(field) + value for field, value in delta.items()}
+        if not model.objects.filter(**{key: pk}).update(**updates) and create:
+            model.objects.get_or_create(**{key: pk})
+            model.objects.filter(**{key: pk}).update(**updates)
+
+
+def faktur_changed(old, new):
+    """
+    Pindahkan kontribusi sebuah faktur dari keadaan lama ke keadaan baru.
+
+    `old` dan `new` berupa tuple (pembeli_id, status, total_faktur) atau None
+    (untuk faktur baru / faktur yang dihapus).
+    """
+    if old == new:
+        return
+    old_region = _region(old[0]) if old else None
+    new_region = old_region if old and new and old[0] == new[0] else (_region(new[0]) if new else None)
+
+    with transaction.atomic():
+        if old_region == new_region:
+            delta = {}
+            for state, sign in ((old, -1), (new, 1)):
+                if state:
+                    for field, value in _contribution(state[1], state[2]).items():
+                        delta[field] = delta.get(field, 0) + sign * value
+            _apply(new_region, delta)
+        else:
+            if old:
+                _apply(old_region, {f: -v for f, v in _contribution(old[1], old[2]).items()})
+            if new:
+                _apply(new_region, _contribution(new[1], new[2]))
+
+
+def total_changed(faktur_id, delta):
+    """Tambahkan selisih total faktur ke pendapatan wilayahnya (bila bukan dibatalkan)."""
+    if not delta:
+        return
+    for model, prefix in (
+        (_model('StatistikKelurahan'), 'kelurahan__pembeli__faktur'),
+        (_model('StatistikKecamatan'), 'kecamatan__kelurahan__pembeli__faktur'),
+    ):
+        model.objects.filter(**{
+            prefix: faktur_id,
+            f'{prefix}__status__in': [s for s in STATUS_FIELDS if s not in NON_REVENUE],
+        }).update(pendapatan=F('pendapatan') + delta)
+
+
+def _aggregates():
+    return dict(
+        jumlah_faktur=Count('pk'),
+        jumlah_diproses=Count('pk', filter=Q(status='diproses')),
+        jumlah_selesai=Count('pk', filter=Q(status='selesai')),
+        jumlah_dibatalkan=Count('pk', filter=Q(status='dibatalkan')),
+        pendapatan=Coalesce(
+            Sum('total_faktur', filter=~Q(status__in=NON_REVENUE)), Value(Decimal('0.00'))
+        ),
+    )
+
+
+def rebuild_rollups(kelurahan_ids=None, kecamatan_ids=None, using='default'):
+    """
+    Hitung ulang rollup dari tabel faktur (satu GROUP BY per tabel rollup).
+
+    Tanpa argumen semua wilayah dihitung ulang; dengan `kelurahan_ids` /
+    `kecamatan_ids` hanya wilayah tersebut. Mengembalikan jumlah baris
+    (kelurahan, kecamatan) yang ditulis.
+    """
+    Faktur = _model('Faktur')
+    Kelurahan = _model('Kelurahan')
+    Kecamatan = _model('Kecamatan')
+    StatistikKelurahan = _model('StatistikKelurahan')
+    StatistikKecamatan = _model('StatistikKecamatan')
+
+    written = []
+    for region_model, stat_model, key, path, ids in (
+        (Kelurahan, StatistikKelurahan, 'kelurahan_id', 'pembeli__kelurahan_id', kelurahan_ids),
+        (Kecamatan, StatistikKecamatan, 'kecamatan_id', 'pembeli__kelurahan__kecamatan_id', kecamatan_ids),
+    ):
+        if ids is None and (kelurahan_ids is not None or kecamatan_ids is not None):
+            written.append(0)
+            continue
+
+        fakturs = Faktur.objects.using(using)
+        regions = region_model.objects.using(using)
+        stats = stat_model.objects.using(using)
+        if ids is not None:
+            fakturs = fakturs.filter(**{f'{path}__in': ids})
+            regions = regions.filter(pk__in=ids)
+            stats = stats.filter(**{f'{key}__in': ids})
+
+        totals = {
+            row.pop('region'): row
+            for row in fakturs.values(region=F(path)).annotate(**_aggregates()).order_by()
+        }
+        rows = [
+            stat_model(**{key: pk}, **totals.get(pk, {}))
+            for pk in regions.values_list('pk', flat=True)
+        ]
+        with transaction.atomic(using=using):
+            stats.delete()
+            stat_model.objects.using(using).bulk_create(rows, batch_size=1000)
+        written.append(len(rows))
+
+    # Laporan per wilayah (export_kelurahan_terbanyak) dikunci dengan versi ini
+    bump_on_commit('laporan_wilayah', using=using)
+    return tuple(written)
+
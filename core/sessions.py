@@ -0,0 +1,91 @@
+# core/sessions.py
+"""
+Lapisan session.
+
+- Session umum memakai SESSION_ENGINE (cached_db: baca dari cache, tulis
+  ke cache + database), jadi request yang sudah login biasanya tidak
+  menyentuh tabel django_session. Cache SESSION_CACHE_ALIAS harus dipakai
+  bersama semua worker (lihat core/checks.py).
+- Request di bawah KURIR_SESSION_PATH bisa memakai engine sendiri
+  (KURIR_SESSION_ENGINE, opsional, default None) dengan cookie terpisah.
+  Isi session kurir kecil (kurir_id, kurir_nama), jadi bisa disimpan di
+  cookie bertanda tangan: tanpa baca/tulis database sama sekali.
+  Konsekuensinya, logout hanya menghapus cookie di browser; cookie yang
+  sempat disalin tetap sah sampai SESSION_COOKIE_AGE habis, kecuali
+  kurirnya dihapus atau dinonaktifkan (dicek kurir_required).
+"""
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.sessions.backends.base import UpdateError
+from django.contrib.sessions.exceptions import SessionInterrupted
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date
+
+
+class RoutedSessionMiddleware(SessionMiddleware):
+    """SessionMiddleware Django dengan engine + cookie terpisah untuk halaman kurir."""
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        engine = getattr(settings, "KURIR_SESSION_ENGINE", None)
+        self.KurirSessionStore = import_module(engine).SessionStore if engine else None
+
+    def is_kurir(self, request):
+        return self.KurirSessionStore is not None and request.path.startswith(settings.KURIR_SESSION_PATH)
+
+    def process_request(self, request):
+        if not self.is_kurir(request):
+            return super().process_request(request)
+        request.session = self.KurirSessionStore(request.COOKIES.get(settings.KURIR_SESSION_COOKIE_NAME))
+
+    def process_response(self, request, response):
+        if not self.is_kurir(request):
+            return super().process_response(request, response)
+        return save_session(
+            request, response, settings.KURIR_SESSION_COOKIE_NAME, settings.KURIR_SESSION_PATH
+        )
+
+
+def save_session(request, response, cookie_name, cookie_path):
+    """Sama dengan SessionMiddleware.process_response, dengan nama dan path cookie sendiri."""
+    try:
+        accessed = request.session.accessed
+        modified = request.session.modified
+        empty = request.session.is_empty()
+    except AttributeError:
+        return response
+
+    if cookie_name in request.COOKIES and empty:
+        response.delete_cookie(
+            cookie_name, path=cookie_path,
+            domain=settings.SESSION_COOKIE_DOMAIN, samesite=settings.SESSION_COOKIE_SAMESITE,
+        )
+        patch_vary_headers(response, ("Cookie",))
+        return response
+
+    if accessed:
+        patch_vary_headers(response, ("Cookie",))
+    if (modified or settings.SESSION_SAVE_EVERY_REQUEST) and not empty and response.status_code < 500:
+        if request.session.get_expire_at_browser_close():
+            max_age = expires = None
+        else:
+            max_age = request.session.get_expiry_age()
+            expires = http_date(time.time() + max_age)
+        try:
+            request.session.save()
+        except UpdateError:
+            raise SessionInterrupted(
+                "The request's session was deleted before the request completed."
+            )
+        response.set_cookie(
+            cookie_name, request.session.session_key,
+            max_age=max_age, expires=expires,
+            domain=settings.SESSION_COOKIE_DOMAIN, path=cookie_path,
+            secure=settings.SESSION_COOKIE_SECURE or None,
+            httponly=settings.SESSION_COOKIE_HTTPONLY or None,
+            samesite=settings.SESSION_COOKIE_SAMESITE,
+        )
+    return response
@@ -0,0 +1,94 @@
+# core/signals.py
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import images, jobs, rollups
+from .models import (
+    Barang, DetailFaktur, Faktur, Kategori, Kecamatan, Kelurahan, Keluhan, Kurir, Pembeli,
+    Vendor,
+)
+from .versioning import bump_on_commit
+
+
+# ==============================================================
+# 🔹 Rollup wilayah (StatistikKelurahan / StatistikKecamatan)
+# ==============================================================
+# Lewat sinyal, bukan override save()/delete(), agar delete queryset, aksi
+# admin delete_selected, dan cascade dari Pembeli/Kelurahan/Kecamatan ikut
+# memperbarui rollup. update() massal ditangani FakturQuerySet.update().
+@receiver(pre_save, sender=Faktur)
+def rollup_faktur_pre_save(sender, instance, raw=False, **kwargs):
+    instance._rollup_old = None
+    if raw or instance._state.adding:
+        return
+    if getattr(instance, '_loaded_rollup', None) != (instance.pembeli_id, instance.status):
+        instance._rollup_old = instance._rollup_state()
+
+
+@receiver(post_save, sender=Faktur)
+def rollup_faktur_post_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        rollups.faktur_changed(None, (instance.pembeli_id, instance.status, instance.total_faktur))
+    elif instance._rollup_old is not None:
+        old = instance._rollup_old
+        rollups.faktur_changed(old, (instance.pembeli_id, instance.status, old[2]))
+    instance._rollup_old = None
+    instance._loaded_rollup = (instance.pembeli_id, instance.status)
+
+
+@receiver(pre_delete, sender=Faktur)
+def rollup_faktur_pre_delete(sender, instance, **kwargs):
+    # Keadaan tersimpan (bukan salinan di memori) yang dikeluarkan dari rollup
+    instance._rollup_old = instance._rollup_state()
+
+
+@receiver(post_delete, sender=Faktur)
+def rollup_faktur_post_delete(sender, instance, **kwargs):
+    old = getattr(instance, '_rollup_old', None)
+    if old is not None:
+        rollups.faktur_changed(old, None)
+
+
+@receiver([post_save, post_delete], sender=Faktur)
+@receiver([post_save, post_delete], sender=Pembeli)
+@receiver([post_save, post_delete], sender=Kelurahan)
+@receiver([post_save, post_delete], sender=Kecamatan)
+def bump_laporan_wilayah(sender, **kwargs):
+    # Laporan per wilayah bergantung pada data ini; naikkan versinya setelah
+    # commit agar proses lain tidak menyimpan data lama di bawah versi baru
+    bump_on_commit("laporan_wilayah")
+
+
+@receiver([post_save, post_delete], sender=Faktur)
+@receiver([post_save, post_delete], sender=DetailFaktur)
+@receiver([post_save, post_delete], sender=Pembeli)
+@receiver([post_save, post_delete], sender=Vendor)
+@receiver([post_save, post_delete], sender=Kurir)
+@receiver([post_save, post_delete], sender=Barang)
+def bump_laporan_faktur(sender, **kwargs):
+    # Isi baris laporan faktur (core.reports.faktur_rows); perubahan massal
+    # lewat Faktur.apply_total_delta / FakturQuerySet.update menaikkannya sendiri
+    bump_on_commit("laporan_faktur")
+
+
+@receiver([post_save, post_delete], sender=Kecamatan)
+@receiver([post_save, post_delete], sender=Kelurahan)
+@receiver([post_save, post_delete], sender=Kategori)
+@receiver([post_save, post_delete], sender=Barang)
+def bump_refdata(sender, **kwargs):
+    # Cache data referensi per proses (core.refdata) dimuat ulang pada akses berikutnya
+    bump_on_commit("refdata")
+
+
+@receiver(post_save, sender=Faktur)
+@receiver(post_save, sender=Keluhan)
+def proses_foto_upload(sender, instance, **kwargs):
+    # Foto baru diproses worker run_jobs (core/images.py), bukan di request upload.
+    # Foto yang gagal diproses tidak diantrikan ulang di setiap save berikutnya;
+    # coba lagi secara eksplisit dengan manage.py process_photos.
+    parameter = images.pending_job(instance)
+    if parameter is not None:
+        transaction.on_commit(lambda: jobs.enqueue("proses_foto", parameter, retry_failed=False))
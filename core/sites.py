@@ -0,0 +1,68 @@
+# core/sites.py
+"""
+Admin site utama. Dipasang sebagai `admin.site` lewat CoreAdminConfig
+(core/apps.py), sehingga semua @admin.register di core/admin.py memakai
+site ini.
+"""
+import datetime
+
+from django.contrib.admin import AdminSite
+from django.core.exceptions import PermissionDenied
+from django.http import FileResponse, Http404
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
+
+from . import profiling
+
+
+# ==============================================================
+# =================== CUSTOM ADMIN SITE ===================
+# ==============================================================
+class MyAdminSite(AdminSite):
+    site_header = "Dashboard Trio Prima Logistik"
+    site_title = "Manajemen Pengiriman"
+    index_title = "Selamat Datang di Sistem Admin Trio Prima Logistik"
+
+    def index(self, request, extra_context=None):
+        user = request.user
+        if not user.is_authenticated:
+            return super().index(request, extra_context)
+        if user.is_superuser or user.groups.filter(name='Admin').exists():
+            return super().index(request, extra_context)
+        elif user.groups.filter(name='Kurir').exists():
+            return redirect('/admin/core/faktur/')
+        elif user.groups.filter(name='Pimpinan').exists():
+            return redirect('/admin/core/faktur/')
+        return super().index(request, extra_context)
+
+    def get_urls(self):
+        custom = [
+            path('profiler/', self.admin_view(self.profiler_view), name='profiler'),
+            path('profiler/<str:name>/', self.admin_view(self.profiler_download), name='profiler_download'),
+        ]
+        return custom + super().get_urls()
+
+    # ========== HASIL SAMPLING PROFILER (lihat core/profiling.py) ==========
+    def profiler_view(self, request):
+        if not profiling.can_profile(request.user):
+            raise PermissionDenied
+        profiles = [
+            dict(entry, waktu=datetime.datetime.fromtimestamp(entry["mtime"]))
+            for entry in profiling.list_profiles()
+        ]
+        context = {
+            **self.each_context(request),
+            "title": "Profiler Request",
+            "profiles": profiles,
+        }
+        return TemplateResponse(request, "admin/profiler.html", context)
+
+    def profiler_download(self, request, name):
+        if not profiling.can_profile(request.user):
+            raise PermissionDenied
+        file_path = profiling.profile_path(name)
+        if file_path is None:
+            raise Http404("Profil tidak ditemukan")
+        return FileResponse(open(file_path, "rb"), as_attachment=True, filename=name,
+                            content_type="text/plain; charset=utf-8")
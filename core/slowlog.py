@@ -0,0 +1,226 @@
+# core/slowlog.py
+"""
+Log query lambat dengan EXPLAIN otomatis.
+
+`install()` (dipanggil dari CoreConfig.ready) memasang execute_wrapper pada
+setiap koneksi database lewat sinyal connection_created. Query yang lebih
+lama dari SLOW_QUERY_MS dicatat ke file JSONL berotasi (SLOW_QUERY_LOG):
+
+- dikelompokkan per fingerprint SQL (core.instrumentation.fingerprint_sql);
+- EXPLAIN QUERY PLAN (SQLite) / EXPLAIN (PostgreSQL, MySQL) hanya dijalankan
+  untuk query baca (SELECT / WITH), sekali per fingerprint per proses;
+- kemunculan berikutnya hanya menambah hitungan dan ditulis ulang paling
+  sering sekali per SLOW_QUERY_FLUSH_SECONDS.
+
+Setiap baris berisi selisih `hits` sejak baris sebelumnya dari proses yang
+sama; `manage.py slow_queries` menjumlahkannya menjadi ringkasan.
+"""
+import atexit
+import contextvars
+import hashlib
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+
+from django.conf import settings
+from django.core.signals import request_finished, request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.urls import Resolver404, resolve
+from django.utils import timezone
+
+from .instrumentation import fingerprint_sql, query_context
+
+logger = logging.getLogger("core.slowquery")
+
+_EXPLAIN = {
+    "sqlite": "EXPLAIN QUERY PLAN ",
+    "postgresql": "EXPLAIN ",
+    "mysql": "EXPLAIN ",
+}
+# Hanya query baca: EXPLAIN untuk INSERT/UPDATE/DELETE ikut meminta kunci tulis
+_EXPLAINABLE = ("SELECT", "WITH")
+
+_current_path = contextvars.ContextVar("core_slowlog_path", default=None)
+_explaining = threading.local()
+_lock = threading.Lock()
+_entries = {}
+_installed = False
+
+
+def query_hash(fingerprint):
+    return hashlib.sha1(fingerprint.encode()).hexdigest()[:12]
+
+
+# ==============================================================
+# 🔹 EXPLAIN
+# ==============================================================
+def explain(connection, sql, params):
+    """Rencana eksekusi query sebagai daftar baris teks (atau pesan error)."""
+    prefix = _EXPLAIN.get(connection.vendor)
+    if prefix is None or not sql.lstrip().upper().startswith(_EXPLAINABLE):
+        return None
+    _explaining.active = True
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(prefix + sql, params)
+            rows = cursor.fetchall()
+    except Exception as exc:  # EXPLAIN tidak boleh mengganggu query aslinya
+        return [f"EXPLAIN gagal: {exc}"]
+    finally:
+        _explaining.active = False
+    if connection.vendor == "sqlite":
+        # (id, parent, notused, detail)
+        return [row[-1] for row in rows]
+    return [" | ".join(str(col) for col in row) for row in rows]
+
+
+# ==============================================================
+# 🔹 Pencatatan
+# ==============================================================
+class _Entry:
+    __slots__ = ("fingerprint", "hash", "sql", "view", "path", "code", "plan",
+                 "hits", "total_ms", "max_ms", "written_at", "pending")
+
+    def __init__(self, fingerprint, sql, view, path, code, plan):
+        self.fingerprint = fingerprint
+        self.hash = query_hash(fingerprint)
+        self.sql = sql
+        self.view = view
+        self.path = path
+        self.code = code
+        self.plan = plan
+        self.hits = self.total_ms = self.max_ms = 0
+        self.written_at = 0.0
+        self.pending = False
+
+    def line(self, with_plan):
+        data = {
+            "time": timezone.now().isoformat(),
+            "hash": self.hash,
+            "fingerprint": self.fingerprint,
+            "hits": self.hits,
+            "total_ms": round(self.total_ms, 2),
+            "max_ms": round(self.max_ms, 2),
+            "view": self.view,
+            "path": self.path,
+            "code": self.code,
+            "pid": os.getpid(),
+        }
+        if with_plan:
+            data["sql"] = self.sql
+            data["plan"] = self.plan
+        return json.dumps(data, ensure_ascii=False)
+
+
+def _write(entry, with_plan):
+    logger.info(entry.line(with_plan))
+    entry.hits = entry.total_ms = entry.max_ms = 0
+    entry.written_at = time.monotonic()
+    entry.pending = False
+
+
+def _view_name(path):
+    if not path:
+        return None
+    try:
+        return resolve(path).view_name
+    except Resolver404:
+        return None
+
+
+def record(connection, sql, params, duration_ms):
+    fingerprint = fingerprint_sql(sql)
+    with _lock:
+        entry = _entries.get(fingerprint)
+    first = entry is None
+    if first:
+        path = _current_path.get()
+        _, code, _ = query_context(sys._getframe(1))
+        entry = _Entry(fingerprint, sql, _view_name(path), path, code,
+                       explain(connection, sql, params))
+
+    with _lock:
+        entry = _entries.setdefault(fingerprint, entry)
+        entry.hits += 1
+        entry.total_ms += duration_ms
+        entry.max_ms = max(entry.max_ms, duration_ms)
+        entry.pending = True
+        due = first or time.monotonic() - entry.written_at >= settings.SLOW_QUERY_FLUSH_SECONDS
+        if due:
+            _write(entry, with_plan=first)
+
+
+def flush():
+    """Tulis hitungan yang belum tercatat (dipanggil saat proses berhenti)."""
+    with _lock:
+        for entry in _entries.values():
+            if entry.pending:
+                _write(entry, with_plan=False)
+
+
+def _slow_query_wrapper(execute, sql, params, many, context):
+    if getattr(_explaining, "active", False):
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration_ms = (time.perf_counter() - start) * 1000
+        threshold = settings.SLOW_QUERY_MS
+        if threshold is not None and duration_ms >= threshold and not many:
+            try:
+                record(context["connection"], sql, params, duration_ms)
+            except Exception:
+                logging.getLogger(__name__).exception("Gagal mencatat query lambat")
+
+
+# ==============================================================
+# 🔹 Pemasangan
+# ==============================================================
+def _attach(connection, **kwargs):
+    # Disisipkan di depan: connection.execute_wrapper() lain (mis. QueryDetector)
+    # melepas wrapper-nya dengan pop() dari belakang daftar.
+    if _slow_query_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _slow_query_wrapper)
+
+
+def _request_started(sender, environ=None, scope=None, **kwargs):
+    path = environ.get("PATH_INFO") if environ else (scope or {}).get("path")
+    _current_path.set(path)
+
+
+def _request_finished(sender, **kwargs):
+    _current_path.set(None)
+
+
+def install():
+    """Pasang pencatat query lambat; tidak melakukan apa-apa bila SLOW_QUERY_MS None."""
+    global _installed
+    if _installed or getattr(settings, "SLOW_QUERY_MS", None) is None:
+        return
+    _installed = True
+
+    os.makedirs(os.path.dirname(settings.SLOW_QUERY_LOG), exist_ok=True)
+    handler = RotatingFileHandler(
+        settings.SLOW_QUERY_LOG,
+        maxBytes=settings.SLOW_QUERY_LOG_MAX_BYTES,
+        backupCount=settings.SLOW_QUERY_LOG_BACKUPS,
+        encoding="utf-8",
+        delay=True,
+    )
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+    connection_created.connect(_attach, dispatch_uid="core_slowlog_attach")
+    for connection in connections.all(initialized_only=True):
+        _attach(connection)
+    request_started.connect(_request_started, dispatch_uid="core_slowlog_request_started")
+    request_finished.connect(_request_finished, dispatch_uid="core_slowlog_request_finished")
+    atexit.register(flush)
@@ -0,0 +1,60 @@
+# core/static_assets.py
+"""
+Pipeline file statis untuk produksi (manage.py build_static).
+
+Template hanya merujuk sebagian kecil isi folder static/ (Bootstrap, Font
+Awesome, dsb. dimuat dari CDN), jadi collectstatic tidak perlu menyalin,
+meng-hash, dan mengompres seluruh static/assets/vendor. ReferencedFilesFinder
+hanya mendaftarkan file STATICFILES_DIRS yang dirujuk `{% static '...' %}`
+di template proyek; file statis milik app (admin, jazzmin) tetap dikumpulkan
+oleh AppDirectoriesFinder.
+
+Rujukan harus berupa literal; `{% static variabel %}` tidak terdeteksi.
+"""
+import os
+import re
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.staticfiles.finders import FileSystemFinder
+
+STATIC_TAG = re.compile(r"""\{%\s*static\s+(['"])(?P<path>[^'"]+)\1""")
+
+
+def template_dirs():
+    """Folder template milik proyek: TEMPLATES DIRS + templates/ app di dalam BASE_DIR."""
+    base = Path(settings.BASE_DIR).resolve()
+    dirs = [Path(d) for engine in settings.TEMPLATES for d in engine.get("DIRS", [])]
+    for app_config in apps.get_app_configs():
+        path = Path(app_config.path).resolve()
+        if path.is_relative_to(base):
+            dirs.append(path / "templates")
+    return [d for d in dirs if d.is_dir()]
+
+
+def referenced_assets():
+    """Path statis (relatif terhadap STATIC_URL) yang dirujuk template proyek."""
+    referenced = set()
+    for directory in template_dirs():
+        for template in directory.rglob("*.html"):
+            text = template.read_text(encoding="utf-8")
+            referenced.update(match["path"] for match in STATIC_TAG.finditer(text))
+    return referenced
+
+
+class ReferencedFilesFinder(FileSystemFinder):
+    """
+    FileSystemFinder yang hanya mendaftarkan file yang dirujuk template.
+
+    Hanya list() (dipakai collectstatic) yang disaring; find() tidak diubah,
+    jadi server development tetap bisa menyajikan file apa pun di static/.
+    """
+
+    def list(self, ignore_patterns):
+        referenced = referenced_assets()
+        for path, storage in super().list(ignore_patterns):
+            prefix = getattr(storage, "prefix", None)
+            name = path.replace(os.sep, "/")
+            if (f"{prefix}/{name}" if prefix else name) in referenced:
+                yield path, storage
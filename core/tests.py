@@ -1,3 +1,1418 @@
-from django.test import TestCase
+import io
+import shutil
+import tempfile
+import time
+from datetime import timedelta
+from decimal import Decimal
 
-# Create your tests here.
+from django.apps import apps as django_apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.contrib.sessions.models import Session
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.db.models import F, Q, Sum
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .instrumentation import NPlusOneError
+from .middleware import PAGE_CACHE_HEADER
+from .management.commands.bench_startup import measure_boot
+from .models import (
+    Barang, BackgroundJob, DetailFaktur, Faktur, Kategori, Kecamatan, Kelurahan,
+    Keluhan, Kurir, Pembeli, StatistikKecamatan, StatistikKelurahan, Vendor,
+    VersiData, VersiProvisioning,
+)
+from . import images, jobs, provisioning, refdata
+from .pagination import encode_cursor, keyset_page
+from .perf_budgets import BUDGETS
+from .report_cache import LRUBytesCache
+from .rollups import rebuild_rollups
+from .static_assets import ReferencedFilesFinder, referenced_assets
+from .versioning import KEY_PREFIX, bump_version, get_version
+
+# Percobaan terukur per endpoint (setelah satu pemanasan); waktu diambil yang terbaik
+RUNS = 3
+# GIF 1x1 untuk upload foto pengiriman
+GIF = (
+    b"GIF89a\x01\x00\x01\x00\x80\x00\x00\x00\x00\x00\xff\xff\xff!\xf9\x04\x01\x00"
+    b"\x00\x00\x00,\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02D\x01\x00;"
+)
+
+_MEDIA = tempfile.mkdtemp(prefix="tpl-test-media-")
+_EXPORTS = tempfile.mkdtemp(prefix="tpl-test-exports-")
+_PROFILES = tempfile.mkdtemp(prefix="tpl-test-profiles-")
+
+
+class FastPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """Awalan hash tetap pbkdf2_sha256$ (dicek Pembeli/Vendor.save) tetapi cepat untuk test."""
+    iterations = 1
+
+
+FAST_HASHERS = ["core.tests.FastPBKDF2PasswordHasher"]
+
+
+# ==============================================================
+# 🔹 Dataset
+# ==============================================================
+class FreshCachesMixin:
+
+    def setUp(self):
+        super().setUp()
+        # Rollback test tidak mengirim sinyal; jangan pakai tabel refdata /
+        # halaman cache dari test lain
+        refdata.clear()
+        caches[settings.PAGE_CACHE_ALIAS].clear()
+        # Salinan stempel versi di file tidak ikut rollback database test
+        caches[settings.VERSION_CACHE_ALIAS].clear()
+
+
+class PerfDataMixin(FreshCachesMixin):
+    """
+    Dataset kecil tapi realistis: cukup banyak baris per halaman agar pola
+    N+1 terlihat (di atas QUERY_DETECTOR_THRESHOLD), tetapi tetap cepat dibuat.
+    """
+
+    KELURAHAN_PER_KECAMATAN = 3
+    PEMBELI = 24
+    FAKTUR = 240
+    DETAIL_PER_FAKTUR = 4
+
+    @classmethod
+    def setUpTestData(cls):
+        kecamatan = Kecamatan.objects.bulk_create(
+            [Kecamatan(nama_kecamatan=f"Kecamatan {i}") for i in range(3)]
+        )
+        kelurahan = Kelurahan.objects.bulk_create([
+            Kelurahan(nama_kelurahan=f"Kelurahan {k.pk}-{i}", kode_pos=f"85{k.pk}{i:02d}", kecamatan=k)
+            for k in kecamatan for i in range(cls.KELURAHAN_PER_KECAMATAN)
+        ])
+        pembeli = Pembeli.objects.bulk_create([
+            Pembeli(
+                nama=f"Pembeli {i}", email=f"pembeli{i}@example.com", password="x",
+                alamat=f"Jalan {i}", no_hp=f"0812{i:06d}", kelurahan=kelurahan[i % len(kelurahan)],
+            )
+            for i in range(cls.PEMBELI)
+        ])
+        vendor = Vendor.objects.bulk_create([
+            Vendor(nama=f"Vendor {i}", email=f"vendor{i}@example.com", password="x",
+                   alamat=f"Gudang {i}", no_hp=f"0813{i:06d}")
+            for i in range(3)
+        ])
+        kategori = Kategori.objects.create(nama="Air")
+        barang = Barang.objects.bulk_create([
+            Barang(nama_barang=f"Barang {i}", harga_barang=Decimal(1000 + i * 250), kategori=kategori)
+            for i in range(10)
+        ])
+        kurir = Kurir.objects.bulk_create([
+            Kurir(nama=f"Kurir {i}", email=f"kurir{i}@test.tpl", password="x", no_hp=f"0814{i:06d}")
+            for i in range(2)
+        ])
+
+        statuses = ["diproses", "diproses", "selesai", "dibatalkan"]
+        fakturs = Faktur.objects.bulk_create([
+            Faktur(
+                status=statuses[i % len(statuses)],
+                pembeli=pembeli[i % len(pembeli)],
+                vendor=vendor[i % len(vendor)],
+                kurir=kurir[i % len(kurir)],
+                berat=Decimal("12.50"), koli=2,
+            )
+            for i in range(cls.FAKTUR)
+        ])
+        details = []
+        for n, faktur in enumerate(fakturs):
+            total = Decimal("0.00")
+            for j in range(cls.DETAIL_PER_FAKTUR):
+                item = barang[(n + j) % len(barang)]
+                subtotal = item.harga_barang * (j + 1)
+                details.append(DetailFaktur(
+                    faktur=faktur, barang=item, jumlah_barang=j + 1,
+                    harga_satuan=item.harga_barang, subtotal=subtotal,
+                ))
+                total += subtotal
+            faktur.total_faktur = total
+        DetailFaktur.objects.bulk_create(details)
+        Faktur.objects.bulk_update(fakturs, ["total_faktur"])
+        rebuild_rollups()
+
+        Keluhan.objects.bulk_create([
+            Keluhan(pembeli=f.pembeli, faktur=f, isi_keluhan=f"Keluhan faktur {f.pk}")
+            for f in fakturs[:60]
+        ])
+
+        cls.pembeli = pembeli[0]
+        cls.vendor = vendor[0]
+        cls.kurir = kurir[0]
+        cls.faktur = next(f for f in fakturs if f.kurir_id == kurir[0].pk)
+        cls.admin = get_user_model().objects.create_superuser("perf-admin", "admin@example.com", "x")
+
+
+
+class BasicDataMixin(FreshCachesMixin):
+    """Dataset minimal untuk test perilaku: dua kecamatan, empat kelurahan, beberapa faktur."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.kecamatan = [Kecamatan.objects.create(nama_kecamatan=f"Kec {i}") for i in range(2)]
+        cls.kelurahan = [
+            Kelurahan.objects.create(nama_kelurahan=f"Kel {k.pk}-{i}", kode_pos="85111", kecamatan=k)
+            for k in cls.kecamatan for i in range(2)
+        ]
+        # bulk_create: save() Pembeli/Vendor meng-hash password (PBKDF2, lambat)
+        cls.pembeli, cls.pembeli_lain = Pembeli.objects.bulk_create([
+            Pembeli(nama="Pembeli A", email="a@test.tpl", password="x",
+                    alamat="Jalan A", no_hp="0811", kelurahan=cls.kelurahan[0]),
+            Pembeli(nama="Pembeli B", email="b@test.tpl", password="x",
+                    alamat="Jalan B", no_hp="0812", kelurahan=cls.kelurahan[3]),
+        ])
+        [cls.vendor] = Vendor.objects.bulk_create([
+            Vendor(nama="Vendor A", email="vendor@test.tpl", password="x", alamat="Gudang", no_hp="0813"),
+        ])
+        cls.kurir = Kurir.objects.create(nama="Kurir A", email="kurir@test.tpl", password="x", no_hp="0814")
+        cls.kategori = Kategori.objects.create(nama="Air")
+        cls.barang = [
+            Barang.objects.create(nama_barang=f"Barang {i}", harga_barang=Decimal(1000 * (i + 1)), kategori=cls.kategori)
+            for i in range(3)
+        ]
+        cls.faktur = cls.buat_faktur(cls.pembeli, [(cls.barang[0], 2), (cls.barang[1], 1)])
+        cls.buat_faktur(cls.pembeli, [(cls.barang[2], 1)], status="selesai")
+        cls.buat_faktur(cls.pembeli_lain, [(cls.barang[1], 3)], status="dibatalkan")
+
+    @classmethod
+    def buat_faktur(cls, pembeli, items, status="diproses"):
+        faktur = Faktur.objects.create(pembeli=pembeli, vendor=cls.vendor, kurir=cls.kurir, status=status)
+        faktur.add_items(items)
+        return faktur
+
+
+# ==============================================================
+# 🔹 Anggaran query & waktu per endpoint (core/perf_budgets.py)
+# ==============================================================
+@override_settings(
+    QUERY_DETECTOR_ENABLED=True,
+    QUERY_DETECTOR_STRICT=True,
+    MEDIA_ROOT=_MEDIA,
+    EXPORT_ROOT=_EXPORTS,
+)
+class EndpointBudgetTests(PerfDataMixin, TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(_MEDIA, ignore_errors=True)
+        shutil.rmtree(_EXPORTS, ignore_errors=True)
+
+    def login_session(self, **values):
+        session = self.client.session
+        session.update(values)
+        session.save()
+
+    def login_kurir(self):
+        # Login lewat view-nya: session kurir bisa ada di cookie sendiri (KURIR_SESSION_ENGINE)
+        response = self.client.post(reverse("kurir_login"), {"email": self.kurir.email, "password": "x"})
+        self.assertRedirects(response, reverse("kurir_dashboard"), fetch_redirect_response=False)
+
+    def assertWithinBudget(self, name, send, status=200):
+        """Jalankan `send()` (pemanasan + RUNS kali) dan cocokkan dengan BUDGETS[name]."""
+        budget = BUDGETS[name]
+        send()
+        best = float("inf")
+        for _ in range(RUNS):
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                response = send()
+                best = min(best, time.perf_counter() - start)
+            self.assertEqual(response.status_code, status, f"{name}: status {response.status_code}")
+
+        sql = "\n".join(f"  {q['sql'][:200]}" for q in queries.captured_queries)
+        self.assertLessEqual(
+            len(queries), budget["queries"],
+            f"{name}: {len(queries)} query melebihi anggaran {budget['queries']}\n{sql}",
+        )
+        self.assertLess(
+            best * 1000, budget["ms"],
+            f"{name}: {best * 1000:.0f} ms melebihi batas {budget['ms']} ms",
+        )
+        return response
+
+    # ---------- publik ----------
+    def test_beranda(self):
+        self.assertWithinBudget("beranda", lambda: self.client.get(reverse("beranda")))
+
+    def test_beranda_pembeli(self):
+        # Seperti setelah login: nama ada di session, beranda tidak perlu query Pembeli
+        self.login_session(pembeli_id=self.pembeli.pk, pembeli_nama=self.pembeli.nama)
+        self.assertWithinBudget("beranda_pembeli", lambda: self.client.get(reverse("beranda")))
+
+    # ---------- pembeli ----------
+    def test_pembeli_register(self):
+        url = reverse("pembeli_register")
+        response = self.assertWithinBudget("pembeli_register", lambda: self.client.get(url))
+        self.assertContains(response, str(self.pembeli.kelurahan))
+
+    def test_pembeli_dashboard(self):
+        self.login_session(pembeli_id=self.pembeli.pk)
+        self.assertWithinBudget("pembeli_dashboard", lambda: self.client.get(reverse("pembeli_dashboard")))
+
+    def test_pembeli_keluhan_riwayat(self):
+        self.login_session(pembeli_id=self.pembeli.pk)
+        self.assertWithinBudget(
+            "pembeli_keluhan_riwayat", lambda: self.client.get(reverse("pembeli_keluhan_riwayat"))
+        )
+
+    def test_pembeli_keluhan_buat(self):
+        self.login_session(pembeli_id=self.pembeli.pk)
+        url = reverse("pembeli_keluhan_buat")
+        self.assertWithinBudget("pembeli_keluhan_buat", lambda: self.client.get(url))
+        faktur = Faktur.objects.filter(pembeli=self.pembeli).first()
+        self.assertWithinBudget(
+            "pembeli_keluhan_buat_post",
+            lambda: self.client.post(url, {"faktur": faktur.pk, "isi_keluhan": "Galon bocor"}),
+            status=302,
+        )
+        self.assertTrue(Keluhan.objects.filter(faktur=faktur, isi_keluhan="Galon bocor").exists())
+
+    # ---------- vendor ----------
+    def test_vendor_dashboard(self):
+        self.login_session(vendor_id=self.vendor.pk)
+        self.assertWithinBudget("vendor_dashboard", lambda: self.client.get(reverse("vendor_dashboard")))
+
+    def test_vendor_keluhan_laporan(self):
+        self.login_session(vendor_id=self.vendor.pk)
+        response = self.assertWithinBudget(
+            "vendor_keluhan_laporan", lambda: self.client.get(reverse("vendor_keluhan_laporan"))
+        )
+        for keluhan in response.context["keluhan_list"]:
+            self.assertEqual(keluhan.faktur.vendor_id, self.vendor.pk)
+
+    # ---------- kurir ----------
+    def test_kurir_dashboard(self):
+        self.login_kurir()
+        url = reverse("kurir_dashboard")
+        response = self.assertWithinBudget("kurir_dashboard", lambda: self.client.get(url))
+        page = response.context["faktur_list"]
+        self.assertTrue(page.has_next)
+        self.assertTrue(all(f.status == "diproses" for f in page))
+
+        next_url = f"{url}?setelah={page.next_cursor}"
+        self.assertWithinBudget("kurir_dashboard_halaman_2", lambda: self.client.get(next_url))
+
+    def test_kurir_faktur_detail(self):
+        self.login_kurir()
+        url = reverse("kurir_faktur_detail", args=[self.faktur.pk])
+        self.assertWithinBudget("kurir_faktur_detail", lambda: self.client.get(url))
+
+    def test_kurir_update_status(self):
+        self.login_kurir()
+        url = reverse("kurir_update_status", args=[self.faktur.pk])
+
+        def send():
+            foto = SimpleUploadedFile("bukti.gif", GIF, content_type="image/gif")
+            return self.client.post(url, {"status": "selesai", "foto_pengiriman": foto})
+
+        self.assertWithinBudget("kurir_update_status", send, status=302)
+        self.faktur.refresh_from_db()
+        self.assertEqual(self.faktur.status, "selesai")
+        self.assertTrue(self.faktur.foto_pengiriman)
+
+    # ---------- admin ----------
+    def test_admin_faktur_changelist(self):
+        self.client.force_login(self.admin)
+        url = reverse("admin:core_faktur_changelist")
+        self.assertWithinBudget("admin_faktur_changelist", lambda: self.client.get(url))
+        self.assertWithinBudget(
+            "admin_faktur_changelist_search",
+            lambda: self.client.get(url, {"q": "Pembeli 1", "status__exact": "diproses"}),
+        )
+
+    def test_admin_faktur_change(self):
+        self.client.force_login(self.admin)
+        url = reverse("admin:core_faktur_change", args=[self.faktur.pk])
+        self.assertWithinBudget("admin_faktur_change", lambda: self.client.get(url))
+
+    def test_admin_pembeli_changelist(self):
+        self.client.force_login(self.admin)
+        url = reverse("admin:core_pembeli_changelist")
+        self.assertWithinBudget("admin_pembeli_changelist", lambda: self.client.get(url))
+
+    def test_admin_faktur_export(self):
+        self.client.force_login(self.admin)
+        ids = list(Faktur.objects.values_list("pk", flat=True)[:100])
+        response = self.assertWithinBudget(
+            "admin_faktur_export",
+            lambda: self.client.post(reverse("admin:core_faktur_changelist"), {
+                "action": "export_laporan_faktur_pdf", "_selected_action": ids,
+            }),
+            status=302,
+        )
+        # Permintaan yang sama dipakai ulang, bukan job baru
+        self.assertEqual(BackgroundJob.objects.count(), 1)
+        self.assertWithinBudget("admin_job_status", lambda: self.client.get(response["Location"]))
+
+    def test_admin_kelurahan_export(self):
+        self.client.force_login(self.admin)
+        ids = list(Kelurahan.objects.values_list("pk", flat=True))
+        self.assertWithinBudget(
+            "admin_kelurahan_export",
+            lambda: self.client.post(reverse("admin:core_kelurahan_changelist"), {
+                "action": "export_kelurahan_terbanyak", "_selected_action": ids,
+            }),
+            status=302,
+        )
+
+
+# ==============================================================
+# 🔹 Total faktur (delta F(), harga satuan, verify_totals)
+# ==============================================================
+class FakturTotalTests(BasicDataMixin, TestCase):
+
+    def assertTotalsMatchLines(self):
+        for faktur in Faktur.objects.annotate(hitung=Sum("detail__subtotal")):
+            self.assertEqual(faktur.total_faktur, faktur.hitung or Decimal("0.00"), f"Faktur #{faktur.pk}")
+
+    def test_detail_save_and_delete_apply_delta(self):
+        self.assertEqual(Faktur.objects.get(pk=self.faktur.pk).total_faktur, Decimal("4000.00"))
+        detail = DetailFaktur(faktur=self.faktur, barang=self.barang[2], jumlah_barang=2)
+        detail.save()
+        self.assertEqual(self.faktur.total_faktur, Decimal("10000.00"))
+        self.assertTotalsMatchLines()
+
+        detail = DetailFaktur.objects.get(pk=detail.pk)
+        self.assertEqual(detail._loaded, (self.faktur.pk, self.barang[2].pk, Decimal("6000.00")))
+        detail.jumlah_barang = 1
+        detail.save()
+        self.assertTotalsMatchLines()
+
+        # Pindah faktur: delta dikurangkan dari faktur lama (dari _loaded), ditambahkan ke yang baru
+        lain = Faktur.objects.exclude(pk=self.faktur.pk).first()
+        detail.faktur = lain
+        detail.save()
+        self.assertTotalsMatchLines()
+
+        DetailFaktur.objects.get(pk=detail.pk).delete()
+        self.assertTotalsMatchLines()
+
+    def test_price_snapshot(self):
+        detail = self.faktur.detail.get(barang=self.barang[0])
+        Barang.objects.filter(pk=self.barang[0].pk).update(harga_barang=Decimal("5000.00"))
+
+        # Harga lama dipertahankan bila hanya jumlah yang berubah
+        detail = DetailFaktur.objects.get(pk=detail.pk)
+        detail.jumlah_barang = 3
+        detail.save()
+        self.assertEqual(detail.harga_satuan, Decimal("1000.00"))
+        self.assertEqual(detail.subtotal, Decimal("3000.00"))
+
+        # Ganti barang: harga satuan diambil dari barang baru
+        detail.barang = self.barang[2]
+        detail.save()
+        self.assertEqual(detail.harga_satuan, Decimal("3000.00"))
+        self.assertTotalsMatchLines()
+
+    def test_add_update_remove_items(self):
+        faktur = Faktur.objects.get(pk=self.faktur.pk)
+        # Harga, INSERT, delta total + dua rollup, savepoint: tetap berapa pun jumlah barisnya
+        with self.assertNumQueries(7):
+            created = faktur.add_items([(self.barang[0], 1), (self.barang[2].pk, 2)])
+        self.assertEqual(len(created), 2)
+        self.assertTotalsMatchLines()
+
+        details = list(faktur.detail.order_by("pk"))
+        details[0].jumlah_barang = 10
+        details[1].barang = self.barang[2]
+        faktur.update_items(details)
+        self.assertEqual(details[1].harga_satuan, Decimal("3000.00"))
+        self.assertEqual(faktur.total_faktur, Faktur.objects.get(pk=faktur.pk).total_faktur)
+        self.assertTotalsMatchLines()
+
+        faktur.remove_items([details[0], details[2].pk])
+        self.assertEqual(faktur.detail.count(), 2)
+        self.assertTotalsMatchLines()
+
+    def test_barang_on_faktur_cannot_be_deleted(self):
+        from django.db.models import ProtectedError
+
+        with self.assertRaises(ProtectedError):
+            self.barang[0].delete()
+        with self.assertRaises(ProtectedError):
+            self.kategori.delete()
+        self.assertTotalsMatchLines()
+        out = io.StringIO()
+        call_command("verify_totals", stdout=out)
+        self.assertNotIn("seharusnya", out.getvalue())
+        # Barang yang belum pernah ditagih tetap bisa dihapus
+        Barang.objects.create(nama_barang="Baru", harga_barang=Decimal("1.00"), kategori=self.kategori).delete()
+
+    def test_verify_totals_fix_repairs_drift(self):
+        Faktur.objects.filter(pk=self.faktur.pk).update_raw(total_faktur=Decimal("1.00"))
+        out = io.StringIO()
+        call_command("verify_totals", stdout=out)
+        self.assertIn(f"Faktur #{self.faktur.pk}: tersimpan 1.00, seharusnya 4000.00", out.getvalue())
+        self.assertEqual(Faktur.objects.get(pk=self.faktur.pk).total_faktur, Decimal("1.00"))
+
+        call_command("verify_totals", fix=True, stdout=io.StringIO())
+        self.assertTotalsMatchLines()
+        # update() di --fix ikut menyinkronkan pendapatan wilayah
+        pendapatan = StatistikKelurahan.objects.get(pk=self.kelurahan[0].pk).pendapatan
+        rebuild_rollups()
+        self.assertEqual(StatistikKelurahan.objects.get(pk=self.kelurahan[0].pk).pendapatan, pendapatan)
+
+    def test_migration_0004_backfills_price_snapshot(self):
+        from importlib import import_module
+
+        migration = import_module("core.migrations.0004_detailfaktur_harga_satuan")
+        DetailFaktur.objects.update(harga_satuan=0, subtotal=0)
+
+        class SchemaEditor:
+            pass
+
+        editor = SchemaEditor()
+        editor.connection = connection
+        # Batch kecil agar beberapa batch ikut teruji
+        batch_size, migration.BATCH_SIZE = migration.BATCH_SIZE, 2
+        try:
+            migration.isi_harga_satuan(django_apps, editor)
+        finally:
+            migration.BATCH_SIZE = batch_size
+
+        for detail in DetailFaktur.objects.select_related("barang"):
+            self.assertEqual(detail.harga_satuan, detail.barang.harga_barang)
+            self.assertEqual(detail.subtotal, detail.harga_satuan * detail.jumlah_barang)
+        self.assertTotalsMatchLines()
+
+
+# ==============================================================
+# 🔹 Rollup wilayah (core/rollups.py, core/signals.py)
+# ==============================================================
+class RollupTests(BasicDataMixin, TestCase):
+
+    def rollups(self):
+        # Baris nol (wilayah tanpa faktur) hanya dibuat oleh rebuild_rollups
+        fields = ("jumlah_faktur", "jumlah_diproses", "jumlah_selesai", "jumlah_dibatalkan", "pendapatan")
+        return tuple(
+            {row[0]: row[1:] for row in model.objects.values_list("pk", *fields) if any(row[1:])}
+            for model in (StatistikKelurahan, StatistikKecamatan)
+        )
+
+    def assertRollupsFresh(self):
+        # Rollup yang dipelihara inkremental harus sama dengan hasil hitung ulang penuh
+        stored = self.rollups()
+        rebuild_rollups()
+        self.assertEqual(stored, self.rollups())
+
+    def test_create_and_items(self):
+        self.assertEqual(StatistikKelurahan.objects.get(pk=self.kelurahan[0].pk).jumlah_faktur, 2)
+        faktur = self.buat_faktur(self.pembeli_lain, [(self.barang[0], 5)], status="selesai")
+        detail = faktur.detail.get()
+        detail.jumlah_barang = 1
+        faktur.update_items([detail])
+        self.assertRollupsFresh()
+
+    def test_status_and_pembeli_change(self):
+        faktur = Faktur.objects.get(pk=self.faktur.pk)
+        faktur.status = "dibatalkan"
+        faktur.save()
+        self.assertRollupsFresh()
+        faktur.pembeli = self.pembeli_lain
+        faktur.save()
+        self.assertRollupsFresh()
+
+    def test_delete(self):
+        Faktur.objects.get(pk=self.faktur.pk).delete()
+        self.assertRollupsFresh()
+
+    def test_queryset_delete(self):
+        Faktur.objects.filter(pembeli=self.pembeli).delete()
+        self.assertEqual(StatistikKelurahan.objects.get(pk=self.kelurahan[0].pk).jumlah_faktur, 0)
+        self.assertRollupsFresh()
+
+    def test_queryset_update(self):
+        Faktur.objects.filter(pembeli=self.pembeli).update(status="selesai")
+        self.assertRollupsFresh()
+        Faktur.objects.filter(pk=self.faktur.pk).update(pembeli=self.pembeli_lain)
+        self.assertRollupsFresh()
+        Faktur.objects.update(total_faktur=Decimal("10.00"))
+        self.assertRollupsFresh()
+
+    def test_cascade_from_pembeli(self):
+        self.pembeli.delete()
+        self.assertRollupsFresh()
+
+    def test_cascade_from_kelurahan(self):
+        self.kelurahan[3].delete()
+        self.assertFalse(StatistikKelurahan.objects.filter(pk=self.kelurahan[3].pk).exists())
+        self.assertRollupsFresh()
+
+    def test_cascade_from_kecamatan(self):
+        self.kecamatan[0].delete()
+        self.assertFalse(StatistikKecamatan.objects.filter(pk=self.kecamatan[0].pk).exists())
+        self.assertRollupsFresh()
+
+    def test_rebuilds_bump_report_version(self):
+        versi = get_version("laporan_wilayah")
+        with self.captureOnCommitCallbacks(execute=True):
+            Faktur.objects.filter(pembeli=self.pembeli).update(pembeli=self.pembeli_lain)
+        self.assertGreater(get_version("laporan_wilayah"), versi)
+
+        versi = get_version("laporan_wilayah")
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("rebuild_rollups", stdout=io.StringIO())
+        self.assertGreater(get_version("laporan_wilayah"), versi)
+
+    def test_migration_0006_backfill(self):
+        from importlib import import_module
+
+        from django.db.migrations.executor import MigrationExecutor
+
+        migration = import_module("core.migrations.0006_statistik_wilayah")
+        apps = MigrationExecutor(connection).loader.project_state(("core", "0006_statistik_wilayah")).apps
+
+        class SchemaEditor:
+            pass
+
+        editor = SchemaEditor()
+        editor.connection = connection
+        expected = self.rollups()
+        StatistikKelurahan.objects.all().delete()
+        StatistikKecamatan.objects.all().delete()
+        migration.isi_statistik(apps, editor)
+        self.assertEqual(self.rollups(), expected)
+
+
+# ==============================================================
+# 🔹 Keyset pagination (core/pagination.py)
+# ==============================================================
+class KeysetPaginationTests(BasicDataMixin, TestCase):
+    SEGMENTS = [Q(status="diproses"), ~Q(status="diproses")]
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        Faktur.objects.bulk_create([
+            Faktur(pembeli=cls.pembeli, vendor=cls.vendor, status=status)
+            for status in ["diproses", "selesai", "dibatalkan", "diproses", "selesai"]
+        ])
+        faktur = Faktur.objects.order_by("pk")
+        cls.expected = (
+            list(faktur.filter(cls.SEGMENTS[0]).order_by("-pk").values_list("pk", flat=True))
+            + list(faktur.filter(cls.SEGMENTS[1]).order_by("-pk").values_list("pk", flat=True))
+        )
+
+    def page(self, cursor=None, **kwargs):
+        kwargs.setdefault("segments", self.SEGMENTS)
+        return keyset_page(Faktur.objects.all(), cursor, keys=("-id_faktur",), per_page=3, **kwargs)
+
+    def test_pages_cross_segment_boundaries(self):
+        seen, cursor, pages = [], None, 0
+        while True:
+            page = self.page(cursor)
+            seen.extend(f.pk for f in page)
+            pages += 1
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+        self.assertEqual(seen, self.expected)
+        self.assertEqual(pages, 3)
+
+    def test_tampered_cursor_restarts_at_first_page(self):
+        first = [f.pk for f in self.page()]
+        valid = self.page().next_cursor
+        for cursor in [
+            "!!!", "bm90LWpzb24", encode_cursor({"a": 1}), encode_cursor([True, [1]]),
+            encode_cursor([9, [1]]), encode_cursor([0, [1, 2]]), encode_cursor([0, ["abc"]]),
+            encode_cursor([0, [None]]), encode_cursor([0, [[1]]]), valid[:-2] + "xx",
+        ]:
+            self.assertEqual([f.pk for f in self.page(cursor)], first, cursor)
+
+    def test_tampered_datetime_cursor(self):
+        keluhan = Keluhan.objects.all()
+        for cursor in [encode_cursor([0, ["bukan-tanggal", 1]]), encode_cursor([0, [1, "x"]])]:
+            page = keyset_page(keluhan, cursor, keys=("-tanggal", "-id_keluhan"))
+            self.assertFalse(page.has_next)
+
+
+# ==============================================================
+# 🔹 Keluhan per faktur (laporan vendor, migrasi 0007)
+# ==============================================================
+class KeluhanTests(BasicDataMixin, TestCase):
+
+    def test_vendor_report_excludes_other_vendors(self):
+        [vendor_lain] = Vendor.objects.bulk_create([
+            Vendor(nama="Vendor B", email="vendor-b@test.tpl", password="x", alamat="Gudang B", no_hp="0815"),
+        ])
+        faktur_lain = Faktur.objects.create(pembeli=self.pembeli, vendor=vendor_lain, status="diproses")
+        milik = Keluhan.objects.create(pembeli=self.pembeli, faktur=self.faktur, isi_keluhan="Galon bocor")
+        Keluhan.objects.create(pembeli=self.pembeli, faktur=faktur_lain, isi_keluhan="Bukan vendor A")
+        Keluhan.objects.create(pembeli=self.pembeli, isi_keluhan="Tanpa faktur")
+
+        session = self.client.session
+        session["vendor_id"] = self.vendor.pk
+        session.save()
+        response = self.client.get(reverse("vendor_keluhan_laporan"))
+        self.assertEqual([k.pk for k in response.context["keluhan_list"]], [milik.pk])
+        self.assertNotContains(response, "Bukan vendor A")
+
+
+class KeluhanMigrationTests(TransactionTestCase):
+    """Backfill 0007 dijalankan sungguhan: mundur ke 0006, isi data lama, maju lagi."""
+    BEFORE = [("core", "0006_statistik_wilayah")]
+    AFTER = [("core", "0007_keluhan_faktur_fk")]
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes("core"))
+        super().tearDown()
+
+    def test_backfill_keeps_only_own_numeric_fakturs(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.BEFORE)
+        apps = executor.loader.project_state(self.BEFORE).apps
+        Kelurahan = apps.get_model("core", "Kelurahan")
+        Pembeli = apps.get_model("core", "Pembeli")
+        Vendor = apps.get_model("core", "Vendor")
+        Faktur = apps.get_model("core", "Faktur")
+        Keluhan = apps.get_model("core", "Keluhan")
+
+        kecamatan = apps.get_model("core", "Kecamatan").objects.create(nama_kecamatan="Kec")
+        kelurahan = Kelurahan.objects.create(nama_kelurahan="Kel", kode_pos="85111", kecamatan=kecamatan)
+        pembeli, lain = (
+            Pembeli.objects.create(nama=nama, email=f"{nama}@test.tpl", password="x", alamat="-",
+                                   no_hp="0", kelurahan=kelurahan)
+            for nama in ("a", "b")
+        )
+        vendor = Vendor.objects.create(nama="V", email="v@test.tpl", password="x", alamat="-", no_hp="0")
+        faktur = Faktur.objects.create(pembeli=pembeli, vendor=vendor)
+        faktur_lain = Faktur.objects.create(pembeli=lain, vendor=vendor)
+        nilai = {
+            "sah": f" {faktur.pk} ",
+            "bukan_angka": "INV-12",
+            "pembeli_lain": str(faktur_lain.pk),
+            "tidak_ada": "999999",
+            "kosong": "",
+        }
+        ids = {
+            kasus: Keluhan.objects.create(pembeli=pembeli, faktur=value, isi_keluhan=kasus).pk
+            for kasus, value in nilai.items()
+        }
+
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.AFTER)
+        Keluhan = executor.loader.project_state(self.AFTER).apps.get_model("core", "Keluhan")
+        hasil = dict(Keluhan.objects.values_list("pk", "faktur_id"))
+        self.assertEqual(hasil[ids["sah"]], faktur.pk)
+        for kasus in ("bukan_angka", "pembeli_lain", "tidak_ada", "kosong"):
+            self.assertIsNone(hasil[ids[kasus]], kasus)
+
+
+# ==============================================================
+# 🔹 Aktor lazy (ActorMiddleware)
+# ==============================================================
+class ActorMiddlewareTests(BasicDataMixin, TestCase):
+
+    def login_session(self, **values):
+        session = self.client.session
+        session.update(values)
+        session.save()
+
+    def test_beranda_fills_missing_name_once(self):
+        self.login_session(pembeli_id=self.pembeli.pk)
+        response = self.client.get(reverse("beranda"))
+        self.assertContains(response, self.pembeli.nama)
+        self.assertEqual(self.client.session["pembeli_nama"], self.pembeli.nama)
+
+    def test_deleted_pembeli_is_logged_out(self):
+        pembeli = Pembeli.objects.create(
+            nama="Sementara", email="sementara@test.tpl", password="x",
+            alamat="-", no_hp="0", kelurahan=self.pembeli.kelurahan,
+        )
+        self.login_session(pembeli_id=pembeli.pk)
+        pembeli.delete()
+        response = self.client.get(reverse("pembeli_dashboard"))
+        self.assertRedirects(response, reverse("pembeli_login"), fetch_redirect_response=False)
+        self.assertNotIn("pembeli_id", self.client.session)
+
+    def test_kurir_required(self):
+        response = self.client.get(reverse("kurir_dashboard"))
+        self.assertRedirects(response, reverse("kurir_login"), fetch_redirect_response=False)
+
+
+class ServerTimingTests(BasicDataMixin, TestCase):
+
+    def test_header_only_for_staff(self):
+        from .instrumentation import perf_stats
+
+        perf_stats.clear()
+        response = self.client.get(reverse("kurir_login"))
+        self.assertNotIn("Server-Timing", response.headers)
+        # Statistik tetap dicatat untuk pengunjung tanpa header
+        self.assertEqual(perf_stats.snapshot()["kurir_login"]["count"], 1)
+
+        staff = get_user_model().objects.create_user("staff-timing", password="x", is_staff=True)
+        self.client.force_login(staff)
+        response = self.client.get(reverse("kurir_login"))
+        self.assertIn("total;dur=", response.headers["Server-Timing"])
+
+    def test_header_with_timing_token(self):
+        from .middleware import timing_token
+
+        response = self.client.get(reverse("kurir_login"), headers={"X-Server-Timing-Token": "salah"})
+        self.assertNotIn("Server-Timing", response.headers)
+        response = self.client.get(reverse("kurir_login"), headers={"X-Server-Timing-Token": timing_token()})
+        self.assertIn("Server-Timing", response.headers)
+
+    def test_header_for_everyone_when_debug(self):
+        with override_settings(DEBUG=True):
+            response = self.client.get(reverse("kurir_login"))
+        self.assertIn("Server-Timing", response.headers)
+
+
+@override_settings(PROFILE_ROOT=_PROFILES)
+class ProfilerTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        from django.contrib.auth.models import Permission
+
+        User = get_user_model()
+        cls.staff = User.objects.create_user("staff-biasa", password="x", is_staff=True)
+        cls.profiler = User.objects.create_user("staff-profiler", password="x", is_staff=True)
+        cls.profiler.user_permissions.add(Permission.objects.get(codename="view_profiler"))
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(_PROFILES, ignore_errors=True)
+
+    def test_staff_without_permission_cannot_profile(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse("kurir_login"), {"_profile": "1"})
+        self.assertNotIn("X-Profile", response.headers)
+        self.assertEqual(self.client.get(reverse("admin:profiler")).status_code, 403)
+
+    def test_trigger_must_be_truthy(self):
+        self.client.force_login(self.profiler)
+        url = reverse("kurir_login")
+        for nilai in ("0", "false", "", "no"):
+            self.assertNotIn("X-Profile", self.client.get(url, headers={"X-Profile": nilai}).headers)
+            self.assertNotIn("X-Profile", self.client.get(url, {"_profile": nilai}).headers)
+        self.assertIn("X-Profile", self.client.get(url, headers={"X-Profile": "1"}).headers)
+        self.assertIn("X-Profile", self.client.get(url, {"_profile": "true"}).headers)
+        self.assertEqual(self.client.get(reverse("admin:profiler")).status_code, 200)
+
+
+# ==============================================================
+# 🔹 Stempel versi (core.versioning, core.report_cache)
+# ==============================================================
+def other_process_bump(name):
+    """Naikkan stempel lewat instance cache terpisah, seperti dari proses lain."""
+    from django.core.cache.backends.filebased import FileBasedCache
+
+    other = FileBasedCache(settings.CACHES[settings.VERSION_CACHE_ALIAS]["LOCATION"], {})
+    VersiData.objects.filter(nama=name).update(versi=F("versi") + 1)
+    other.set(KEY_PREFIX + name, VersiData.objects.get(nama=name).versi, timeout=None)
+
+
+class VersioningTests(FreshCachesMixin, TestCase):
+
+    def test_stamp_is_shared_between_processes(self):
+        versi = get_version("uji")
+        other_process_bump("uji")
+        self.assertEqual(get_version("uji"), versi + 1)
+        self.assertEqual(bump_version("uji"), versi + 2)
+
+    def test_stamp_survives_lost_cache_copy(self):
+        versi = bump_version("uji")
+        # Salinan tidak kedaluwarsa dengan TIMEOUT bawaan alias
+        self.assertIsNone(caches[settings.VERSION_CACHE_ALIAS].default_timeout)
+        caches[settings.VERSION_CACHE_ALIAS].delete(KEY_PREFIX + "uji")
+        # Dibaca ulang dari VersiData, bukan diisi ulang dari jam
+        self.assertEqual(get_version("uji"), versi)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_version("uji"), versi)
+
+    def test_stale_copy_catches_up_with_counter(self):
+        versi = get_version("uji")
+        # Proses lain sudah menaikkan penghitung, tetapi salinan masih lama
+        VersiData.objects.filter(nama="uji").update(versi=F("versi") + 1)
+        self.assertEqual(bump_version("uji"), versi + 2)
+        self.assertEqual(get_version("uji"), versi + 2)
+
+    def test_signals_bump_after_commit(self):
+        versi = get_version("refdata")
+        with self.captureOnCommitCallbacks() as callbacks:
+            Kategori.objects.create(nama="Gas")
+        self.assertEqual(get_version("refdata"), versi)
+        for callback in callbacks:
+            callback()
+        self.assertEqual(get_version("refdata"), versi + 1)
+
+    def test_report_cache_misses_after_bump(self):
+        cache = LRUBytesCache(max_entries=4, max_bytes=1024)
+        cache.set(("laporan", get_version("uji")), b"pdf lama")
+        self.assertEqual(cache.get(("laporan", get_version("uji"))), b"pdf lama")
+        other_process_bump("uji")
+        self.assertIsNone(cache.get(("laporan", get_version("uji"))))
+        cache.set(("laporan", get_version("uji")), b"pdf baru")
+        self.assertEqual(cache.get(("laporan", get_version("uji"))), b"pdf baru")
+
+
+# ==============================================================
+# 🔹 Session (core.sessions, purge_sessions)
+# ==============================================================
+SIGNED_KURIR = "django.contrib.sessions.backends.signed_cookies"
+
+
+class SessionTests(BasicDataMixin, TestCase):
+
+    def login_kurir(self):
+        return self.client.post(reverse("kurir_login"), {"email": self.kurir.email, "password": "x"})
+
+    def test_kurir_uses_regular_session_by_default(self):
+        response = self.login_kurir()
+        self.assertIn(settings.SESSION_COOKIE_NAME, response.cookies)
+        self.assertNotIn(settings.KURIR_SESSION_COOKIE_NAME, response.cookies)
+        self.assertTrue(Session.objects.exists())
+
+    @override_settings(KURIR_SESSION_ENGINE=SIGNED_KURIR)
+    def test_kurir_cookie_routed_by_path(self):
+        response = self.login_kurir()
+        cookie = response.cookies[settings.KURIR_SESSION_COOKIE_NAME]
+        self.assertEqual(cookie["path"], settings.KURIR_SESSION_PATH)
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, response.cookies)
+        self.assertFalse(Session.objects.exists())
+        self.assertEqual(self.client.get(reverse("kurir_dashboard")).status_code, 200)
+        # Di luar /kurir/ cookie kurir tidak dipakai
+        self.assertNotIn("kurir_id", self.client.get(reverse("beranda")).wsgi_request.session)
+
+    @override_settings(KURIR_SESSION_ENGINE=SIGNED_KURIR)
+    def test_logout_clears_kurir_cookie(self):
+        self.login_kurir()
+        response = self.client.get(reverse("kurir_logout"))
+        cookie = response.cookies[settings.KURIR_SESSION_COOKIE_NAME]
+        self.assertEqual(cookie.value, "")
+        self.assertEqual(cookie["max-age"], 0)
+        self.assertRedirects(self.client.get(reverse("kurir_dashboard")), reverse("kurir_login"),
+                             fetch_redirect_response=False)
+
+    @override_settings(KURIR_SESSION_ENGINE=SIGNED_KURIR)
+    def test_inactive_kurir_cookie_is_rejected(self):
+        self.login_kurir()
+        cookie = self.client.cookies[settings.KURIR_SESSION_COOKIE_NAME].value
+        Kurir.objects.filter(pk=self.kurir.pk).update(aktif=False)
+        # Salinan cookie lama pun ditolak setelah kurir dinonaktifkan
+        self.client.cookies[settings.KURIR_SESSION_COOKIE_NAME] = cookie
+        response = self.client.get(reverse("kurir_dashboard"))
+        self.assertRedirects(response, reverse("kurir_login"), fetch_redirect_response=False)
+
+    def test_purge_sessions_in_batches(self):
+        lewat = timezone.now() - timedelta(days=1)
+        Session.objects.bulk_create(
+            [Session(session_key=f"lama{i:02d}", session_data="", expire_date=lewat) for i in range(5)]
+            + [Session(session_key="aktif", session_data="", expire_date=timezone.now() + timedelta(days=1))]
+        )
+        out = io.StringIO()
+        call_command("purge_sessions", batch=2, limit=3, verbosity=2, stdout=out)
+        self.assertIn("2 session terhapus", out.getvalue())
+        self.assertIn("3 session terhapus", out.getvalue())
+        self.assertEqual(Session.objects.count(), 3)
+        call_command("purge_sessions", batch=2, stdout=io.StringIO())
+        self.assertEqual(list(Session.objects.values_list("session_key", flat=True)), ["aktif"])
+
+
+    def test_check_rejects_process_local_session_cache(self):
+        from .checks import check_session_cache_shared
+
+        locmem = {**settings.CACHES, settings.SESSION_CACHE_ALIAS: {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }}
+        with override_settings(WEB_WORKERS=4):
+            self.assertEqual(check_session_cache_shared(None), [])
+            with override_settings(CACHES=locmem):
+                self.assertEqual([e.id for e in check_session_cache_shared(None)], ["core.E001"])
+                with override_settings(SESSION_ENGINE="django.contrib.sessions.backends.db"):
+                    self.assertEqual(check_session_cache_shared(None), [])
+        with override_settings(WEB_WORKERS=1, CACHES=locmem):
+            self.assertEqual(check_session_cache_shared(None), [])
+
+    def test_logout_in_other_worker_is_seen(self):
+        from django.core.cache.backends.filebased import FileBasedCache
+        from django.contrib.sessions.backends.cached_db import KEY_PREFIX as SESSION_PREFIX
+
+        self.login_kurir()
+        key = self.client.cookies[settings.SESSION_COOKIE_NAME].value
+        self.assertEqual(self.client.get(reverse("kurir_dashboard")).status_code, 200)
+        # Worker lain menghapus session (logout / purge_sessions) lewat instance cache-nya sendiri
+        other = FileBasedCache(settings.CACHES[settings.SESSION_CACHE_ALIAS]["LOCATION"], {})
+        other.delete(SESSION_PREFIX + key)
+        Session.objects.filter(session_key=key).delete()
+        response = self.client.get(reverse("kurir_dashboard"))
+        self.assertRedirects(response, reverse("kurir_login"), fetch_redirect_response=False)
+
+# ==============================================================
+# 🔹 Data referensi (core.refdata)
+# ==============================================================
+class RefDataTests(BasicDataMixin, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        # Salinan stempel sudah ada di cache, seperti di server yang berjalan
+        get_version(refdata.VERSION_NAME)
+
+    def test_loaded_once_per_version(self):
+        with self.assertNumQueries(1):
+            refdata.choices("kelurahan")
+        with self.assertNumQueries(0):
+            labels = dict(refdata.choices("kelurahan"))
+            row = refdata.get("kelurahan", str(self.pembeli.kelurahan_id))
+        self.assertEqual(labels[self.pembeli.kelurahan_id], str(self.pembeli.kelurahan))
+        self.assertEqual(str(row), str(self.pembeli.kelurahan))
+
+    def test_save_and_delete_invalidate(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            kategori = Kategori.objects.create(nama="Gas")
+        self.assertIn((kategori.pk, "Gas"), refdata.choices("kategori"))
+        kategori.nama = "Gas LPG"
+        with self.captureOnCommitCallbacks(execute=True):
+            kategori.save()
+        self.assertIn((kategori.pk, "Gas LPG"), refdata.choices("kategori"))
+        pk = kategori.pk
+        with self.captureOnCommitCallbacks(execute=True):
+            kategori.delete()
+        self.assertIsNone(refdata.get("kategori", pk))
+
+    def test_bump_from_other_process_reloads(self):
+        kategori = Kategori.objects.create(nama="Gas")
+        refdata.choices("kategori")
+        # update() tidak mengirim sinyal: cache lama tetap dipakai sampai versi naik
+        Kategori.objects.filter(pk=kategori.pk).update(nama="Gas LPG")
+        with self.assertNumQueries(0):
+            self.assertEqual(refdata.get("kategori", kategori.pk).nama, "Gas")
+        other_process_bump("refdata")
+        with self.assertNumQueries(1):
+            self.assertEqual(refdata.get("kategori", kategori.pk).nama, "Gas LPG")
+
+    def test_register_form_still_validates_against_database(self):
+        from .forms import PembeliRegisterForm
+
+        form = PembeliRegisterForm(data={"kelurahan": "999999"})
+        self.assertFalse(form.is_valid())
+        self.assertIn("kelurahan", form.errors)
+
+
+# ==============================================================
+# 🔹 Cache halaman anonim (AnonymousPageCacheMiddleware)
+# ==============================================================
+class PageCacheTests(BasicDataMixin, TestCase):
+
+    def test_anonymous_beranda_served_from_cache(self):
+        first = self.client.get(reverse("beranda"))
+        self.assertEqual(first[PAGE_CACHE_HEADER], "miss")
+        with self.assertNumQueries(0):
+            second = self.client.get(reverse("beranda"))
+        self.assertEqual(second[PAGE_CACHE_HEADER], "hit")
+        self.assertEqual(second.content, first.content)
+        self.assertIn("Cookie", second["Vary"])
+
+    def test_logged_in_visitor_bypasses_cache(self):
+        self.client.get(reverse("beranda"))
+        session = self.client.session
+        session.update({"pembeli_id": self.pembeli.pk, "pembeli_nama": self.pembeli.nama})
+        session.save()
+        response = self.client.get(reverse("beranda"))
+        self.assertNotIn(PAGE_CACHE_HEADER, response)
+        self.assertContains(response, f"Selamat Datang, {self.pembeli.nama}")
+        self.assertContains(response, reverse("pembeli_logout"))
+
+    def test_query_string_is_not_cached(self):
+        self.client.get(reverse("beranda"), {"utm_source": "x"})
+        response = self.client.get(reverse("beranda"))
+        self.assertEqual(response[PAGE_CACHE_HEADER], "miss")
+
+
+# ==============================================================
+# 🔹 Pipeline foto upload (core.images)
+# ==============================================================
+def camera_jpeg(size=(400, 200), orientation=6):
+    """JPEG seperti dari kamera ponsel: orientasi + metadata lain di EXIF."""
+    from PIL import Image
+
+    exif = Image.Exif()
+    exif[0x0112] = orientation
+    exif[0x010F] = "PhoneCam"
+    out = io.BytesIO()
+    Image.new("RGB", size, "orange").save(out, "JPEG", exif=exif)
+    return out.getvalue()
+
+
+@override_settings(MEDIA_ROOT=_MEDIA, IMAGE_MAX_SIZE=100, IMAGE_THUMB_SIZE=20)
+class ImagePipelineTests(BasicDataMixin, TestCase):
+
+    def test_encode_rotates_resizes_and_strips_metadata(self):
+        from PIL import Image
+
+        full, thumb = images.encode(io.BytesIO(camera_jpeg()))
+        with Image.open(io.BytesIO(full)) as image:
+            self.assertEqual(image.format, "WEBP")
+            self.assertEqual(image.size, (50, 100))
+            self.assertEqual(dict(image.getexif()), {})
+        with Image.open(io.BytesIO(thumb)) as image:
+            self.assertEqual(image.size, (10, 20))
+
+    @override_settings(IMAGE_MAX_PIXELS=400 * 199)
+    def test_oversized_image_is_rejected(self):
+        with self.assertRaisesMessage(ValueError, "IMAGE_MAX_PIXELS"):
+            images.encode(io.BytesIO(camera_jpeg()))
+
+    def test_failed_photo_is_not_requeued_on_save(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            keluhan = Keluhan.objects.create(
+                pembeli=self.pembeli, isi_keluhan="Foto rusak",
+                foto=SimpleUploadedFile("IMG_0002.jpg", b"bukan gambar", content_type="image/jpeg"),
+            )
+        job = BackgroundJob.objects.get(jenis="proses_foto")
+        jobs.run_job(job.pk)
+        job.refresh_from_db()
+        self.assertEqual(job.status, "gagal")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            keluhan.save()
+        self.assertEqual(BackgroundJob.objects.filter(jenis="proses_foto").count(), 1)
+        # process_photos tetap bisa mencoba ulang secara eksplisit
+        call_command("process_photos", stdout=io.StringIO())
+        self.assertEqual(BackgroundJob.objects.filter(jenis="proses_foto", status="antri").count(), 1)
+
+    def test_shared_original_is_kept_until_last_row(self):
+        from django.core.files.base import ContentFile
+        from django.core.files.storage import default_storage
+
+        # Seperti manage.py seed: beberapa baris menunjuk ke satu file foto
+        name = default_storage.save("keluhan_images/default.jpg", ContentFile(camera_jpeg()))
+        with self.captureOnCommitCallbacks(execute=True):
+            keluhan = [
+                Keluhan.objects.create(pembeli=self.pembeli, isi_keluhan=f"Keluhan {i}", foto=name)
+                for i in range(2)
+            ]
+        pertama, kedua = BackgroundJob.objects.filter(jenis="proses_foto").order_by("id_job")
+        jobs.run_job(pertama.pk)
+        self.assertTrue(default_storage.exists(name))
+        jobs.run_job(kedua.pk)
+        self.assertFalse(default_storage.exists(name))
+        for row in keluhan:
+            row.refresh_from_db()
+            self.assertTrue(row.foto.name.endswith(".webp"))
+            self.assertTrue(default_storage.exists(row.foto.name))
+
+    def test_upload_is_processed_by_worker(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            keluhan = Keluhan.objects.create(
+                pembeli=self.pembeli, isi_keluhan="Galon bocor",
+                foto=SimpleUploadedFile("IMG_0001.jpg", camera_jpeg(), content_type="image/jpeg"),
+            )
+        original = keluhan.foto.name
+        job = BackgroundJob.objects.get(jenis="proses_foto")
+        self.assertEqual(job.parameter, {"model": "keluhan", "pk": keluhan.pk, "foto": original})
+
+        jobs.run_job(job.pk)
+        keluhan.refresh_from_db()
+        self.assertTrue(keluhan.foto.name.endswith(".webp"))
+        self.assertEqual(keluhan.foto_thumb.name, images.thumb_name(keluhan.foto.name))
+        self.assertFalse(keluhan.foto.storage.exists(original))
+
+        # Foto yang sudah diproses tidak masuk antrian lagi
+        with self.captureOnCommitCallbacks(execute=True):
+            keluhan.save()
+        self.assertEqual(BackgroundJob.objects.filter(jenis="proses_foto").count(), 1)
+
+        session = self.client.session
+        session["pembeli_id"] = self.pembeli.pk
+        session.save()
+        response = self.client.get(reverse("pembeli_keluhan_riwayat"))
+        self.assertContains(response, keluhan.foto_thumb.url)
+        self.assertContains(response, f'href="{keluhan.foto.url}"')
+
+
+# ==============================================================
+# 🔹 Antrian background job (core/jobs.py)
+# ==============================================================
+class JobQueueTests(TestCase):
+
+    def test_claim_sets_heartbeat(self):
+        job = jobs.enqueue("laporan_kelurahan_pdf")
+        self.assertEqual(jobs.claim_next(), job.pk)
+        job.refresh_from_db()
+        self.assertEqual(job.status, "berjalan")
+        self.assertIsNotNone(job.diperbarui_pada)
+
+    @override_settings(JOB_STALE_TIMEOUT=60)
+    def test_stale_running_job_is_failed(self):
+        lama = timezone.now() - timedelta(seconds=120)
+        macet = BackgroundJob.objects.create(
+            jenis="laporan_kelurahan_pdf", kunci="a", status="berjalan", diperbarui_pada=lama,
+        )
+        tanpa_detak = BackgroundJob.objects.create(
+            jenis="laporan_kelurahan_pdf", kunci="b", status="berjalan", dibuat_pada=lama,
+        )
+        aktif = BackgroundJob.objects.create(
+            jenis="laporan_kelurahan_pdf", kunci="c", status="berjalan", diperbarui_pada=timezone.now(),
+        )
+        self.assertIsNone(jobs.claim_next())
+        statuses = dict(BackgroundJob.objects.values_list("pk", "status"))
+        self.assertEqual(statuses[macet.pk], "gagal")
+        self.assertEqual(statuses[tanpa_detak.pk], "gagal")
+        self.assertEqual(statuses[aktif.pk], "berjalan")
+        # Job yang sama bisa dimasukkan ulang setelah gagal
+        self.assertNotEqual(jobs.enqueue("laporan_kelurahan_pdf").pk, macet.pk)
+
+
+    def test_admin_status_and_download_are_restricted(self):
+        from django.contrib.auth.models import Permission
+
+        User = get_user_model()
+        pemilik = User.objects.create_user("pemilik", password="x", is_staff=True)
+        lain = User.objects.create_user("lain", password="x", is_staff=True)
+        tanpa_izin = User.objects.create_user("tanpa-izin", password="x", is_staff=True)
+        izin = Permission.objects.get(codename="view_backgroundjob")
+        pemilik.user_permissions.add(izin)
+        lain.user_permissions.add(izin)
+        admin = User.objects.create_superuser("job-admin", "job-admin@example.com", "x")
+
+        job = jobs.enqueue("laporan_kelurahan_pdf", user=pemilik)
+        status_url = reverse("admin:core_backgroundjob_status", args=[job.pk])
+        download_url = reverse("admin:core_backgroundjob_download", args=[job.pk])
+        for user, expected in ((pemilik, 200), (admin, 200), (lain, 403), (tanpa_izin, 403)):
+            self.client.force_login(user)
+            self.assertEqual(self.client.get(status_url).status_code, expected, user.username)
+            if expected == 403:
+                self.assertEqual(self.client.get(download_url).status_code, 403, user.username)
+        # Job yang sama dari pengguna lain tidak dipakai ulang
+        self.assertNotEqual(jobs.enqueue("laporan_kelurahan_pdf", user=lain).pk, job.pk)
+
+
+# ==============================================================
+# 🔹 Laporan PDF (core.reports)
+# ==============================================================
+class ReportMergeTests(TestCase):
+
+    def test_fragments_are_appended_with_page_numbers(self):
+        from pypdf import PdfReader
+
+        from . import reports
+        from .management.commands.bench_report import Command as BenchReport
+
+        rows = BenchReport().synthetic_rows(120, seed=1)
+        fragments = [
+            reports.render_faktur_fragment(rows[:40], True, False),
+            reports.render_faktur_fragment(rows[40:80], False, False),
+            reports.render_faktur_fragment(rows[80:], False, True),
+        ]
+        output = io.BytesIO()
+        appender = reports.PdfAppender(output, reports.FAKTUR_PAGESIZE, reports.FAKTUR_MARGINS, "Laporan Faktur")
+        for fragment in fragments:
+            appender.append(fragment)
+        appender.close()
+
+        merged = PdfReader(io.BytesIO(output.getvalue()), strict=True)
+        self.assertEqual(merged.metadata.title, "Laporan Faktur")
+        self.assertEqual(len(merged.pages), sum(len(PdfReader(io.BytesIO(f)).pages) for f in fragments))
+        for number, page in enumerate(merged.pages, start=1):
+            self.assertTrue(page.extract_text().rstrip().endswith(f"Halaman {number}"))
+        self.assertIn("LAPORAN", merged.pages[0].extract_text().upper())
+
+
+@override_settings(EXPORT_ROOT=_EXPORTS)
+class FakturExportJobTests(BasicDataMixin, TestCase):
+
+    def export(self, ids):
+        self.client.post(reverse("admin:core_faktur_changelist"), {
+            "action": "export_laporan_faktur_pdf", "_selected_action": ids,
+        })
+        return BackgroundJob.objects.latest("id_job")
+
+    def test_selection_is_stored_as_id_ranges(self):
+        self.assertEqual(jobs.id_ranges([1, 2, 3, 5, 7, 8]), [[1, 3], [5, 5], [7, 8]])
+        self.assertEqual(jobs.expand_ranges([[1, 3], [5, 5], [7, 8]]), [1, 2, 3, 5, 7, 8])
+
+        self.client.force_login(get_user_model().objects.create_superuser("ekspor", "e@example.com", "x"))
+        ids = sorted(Faktur.objects.values_list("pk", flat=True))
+        job = self.export(ids)
+        self.assertEqual(job.parameter["rentang"], jobs.id_ranges(ids))
+        jobs.run_job(job.pk)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.total), ("selesai", len(ids)))
+
+    def test_changed_data_gets_new_job(self):
+        self.client.force_login(get_user_model().objects.create_superuser("ekspor", "e@example.com", "x"))
+        ids = list(Faktur.objects.values_list("pk", flat=True))
+        job = self.export(ids)
+        self.assertEqual(self.export(ids).pk, job.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            Faktur.objects.filter(pk=ids[0]).update(status="selesai")
+        self.assertNotEqual(self.export(ids).pk, job.pk)
+
+    def test_rows_are_read_in_id_chunks(self):
+        from . import reports
+
+        ids = sorted(Faktur.objects.values_list("pk", flat=True))
+        semua = list(reports.faktur_rows(Faktur.objects.all()))
+        with self.assertNumQueries(4):
+            # Dua chunk pk__in, masing-masing + prefetch detail
+            per_chunk = list(reports.faktur_rows(Faktur.objects.all(), chunk_size=2, ids=ids))
+        self.assertEqual(per_chunk, semua)
+
+
+# ==============================================================
+# 🔹 File statis (core.static_assets)
+# ==============================================================
+class StaticAssetsTests(TestCase):
+
+    def test_only_referenced_files_are_collected(self):
+        referenced = referenced_assets()
+        self.assertIn("assets/img/logo.png", referenced)
+        listed = {path.replace("\\", "/") for path, _ in ReferencedFilesFinder().list([])}
+        self.assertEqual(listed, referenced)
+        # Finder tetap menemukan file lain untuk server development
+        self.assertTrue(ReferencedFilesFinder().find("assets/css/main.css"))
+
+
+# ==============================================================
+# 🔹 Detektor N+1 sendiri
+# ==============================================================
+@override_settings(QUERY_DETECTOR_ENABLED=True, QUERY_DETECTOR_STRICT=True, QUERY_DETECTOR_THRESHOLD=5)
+class QueryDetectorTests(PerfDataMixin, TestCase):
+
+    def test_strict_mode_raises_on_n_plus_one(self):
+        from .instrumentation import QueryDetector, format_findings
+
+        with QueryDetector() as detector:
+            names = [f.pembeli.nama for f in Faktur.objects.all()[:10]]
+        self.assertEqual(len(names), 10)
+        findings = detector.findings(threshold=5)
+        self.assertEqual(len(findings), 1)
+        self.assertEqual(findings[0]["suggestion"], "Faktur: select_related('pembeli')")
+        self.assertIn("select_related('pembeli')", format_findings("test", findings))
+
+    def test_strict_mode_fails_request(self):
+        self.client.force_login(self.admin)
+        with override_settings(QUERY_DETECTOR_THRESHOLD=1):
+            with self.assertRaises(NPlusOneError):
+                self.client.get(reverse("admin:core_faktur_changelist"))
+
+
+# ==============================================================
+# 🔹 Log query lambat (core.slowlog)
+# ==============================================================
+class SlowQueryLogTests(TestCase):
+
+    def setUp(self):
+        from . import slowlog
+
+        self.slowlog = slowlog
+        slowlog._entries.clear()
+        self.addCleanup(slowlog._entries.clear)
+
+    def lines(self, logs):
+        import json
+
+        return [json.loads(record.getMessage()) for record in logs.records]
+
+    def test_threshold(self):
+        with override_settings(SLOW_QUERY_MS=10_000):
+            with self.assertNoLogs("core.slowquery", "INFO"):
+                list(Kategori.objects.all())
+        with override_settings(SLOW_QUERY_MS=0):
+            with self.assertLogs("core.slowquery", "INFO") as logs:
+                list(Kategori.objects.filter(nama="Gas"))
+        self.assertIn('"core_kategori"."nama" = ?', self.lines(logs)[0]["fingerprint"])
+
+    def test_fingerprint_dedupe_and_hits(self):
+        sql = 'SELECT "id_kategori" FROM "core_kategori" WHERE "id_kategori" = %s'
+        with self.assertLogs("core.slowquery", "INFO") as logs:
+            for pk, ms in ((1, 300), (2, 500), (3, 400)):
+                self.slowlog.record(connection, sql.replace("%s", str(pk)), (), ms)
+            self.slowlog.flush()
+        pertama, sisa = self.lines(logs)
+        # Baris pertama langsung ditulis dengan EXPLAIN; sisanya dijumlah sampai flush
+        self.assertEqual((pertama["hits"], pertama["max_ms"]), (1, 300))
+        self.assertIn("plan", pertama)
+        self.assertEqual((sisa["hits"], sisa["total_ms"], sisa["max_ms"]), (2, 900, 500))
+        self.assertNotIn("plan", sisa)
+        self.assertEqual(pertama["hash"], sisa["hash"])
+        self.assertEqual(len(self.slowlog._entries), 1)
+
+    def test_explain_only_for_reads(self):
+        plan = self.slowlog.explain(connection, 'SELECT * FROM "core_kategori" WHERE "nama" = %s', ["Gas"])
+        self.assertTrue(plan)
+        self.assertTrue(any("core_kategori" in line for line in plan))
+        for sql in (
+            'UPDATE "core_kategori" SET "nama" = %s',
+            'DELETE FROM "core_kategori"',
+            'INSERT INTO "core_kategori" ("nama") VALUES (%s)',
+        ):
+            self.assertIsNone(self.slowlog.explain(connection, sql, ["Gas"]))
+
+
+# ==============================================================
+# 🔹 Startup & provisioning
+# ==============================================================
+class StartupTests(TestCase):
+
+    def test_boot_is_lean(self):
+        # Tanpa query database dan tanpa ReportLab dkk. (lihat bench_startup.HEAVY_MODULES)
+        boot = measure_boot(importtime=True)
+        self.assertEqual(boot["connections"], [])
+        self.assertEqual(boot["heavy_modules"], {})
+
+    def test_provisioning_runs_once_per_version(self):
+        # Database test sudah di-migrate, jadi post_migrate sudah memprovisioning
+        self.assertTrue(VersiProvisioning.objects.filter(versi=provisioning.VERSION).exists())
+        with self.assertNumQueries(1):
+            self.assertFalse(provisioning.provision(django_apps, verbosity=0))
+
+    @override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+    def test_seed_demo_on_empty_database(self):
+        call_command("seed", stdout=io.StringIO())
+        counts = {model.__name__: model.objects.count() for model in (
+            Kecamatan, Kelurahan, Pembeli, Vendor, Kurir, Faktur, DetailFaktur, Keluhan,
+        )}
+        self.assertEqual(counts, {
+            "Kecamatan": 2, "Kelurahan": 3, "Pembeli": 2, "Vendor": 2,
+            # kurir1@example.com dari provisioning dipakai ulang, bukan diduplikasi
+            "Kurir": len(provisioning.DUMMY_KURIR), "Faktur": 3, "DetailFaktur": 6, "Keluhan": 2,
+        })
+        response = self.client.post(reverse("kurir_login"), {"email": "kurir1@example.com", "password": "kurir123"})
+        self.assertRedirects(response, reverse("kurir_dashboard"), fetch_redirect_response=False)
+        response = self.client.post(reverse("pembeli_login"), {"email": "verel@example.com", "password": "pembeli123"})
+        self.assertRedirects(response, reverse("beranda"), fetch_redirect_response=False)
+        self.assertTrue(self.client.login(username="admin", password="admin123"))
+
+    @override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+    def test_seed_scale(self):
+        from . import datagen
+
+        call_command("seed", scale=30, batch=10, stdout=io.StringIO())
+        self.assertEqual(Faktur.objects.count(), 30)
+        self.assertEqual(StatistikKelurahan.objects.aggregate(n=Sum("jumlah_faktur"))["n"], 30)
+        response = self.client.post(reverse("kurir_login"), {
+            "email": datagen.bench_email("kurir", 0), "password": datagen.BENCH_PASSWORD,
+        })
+        self.assertRedirects(response, reverse("kurir_dashboard"), fetch_redirect_response=False)
+
+    def test_provisioning_after_flush(self):
+        # flush mengirim post_migrate tanpa `apps`
+        VersiProvisioning.objects.all().delete()
+        call_command("flush", interactive=False, verbosity=0)
+        self.assertTrue(VersiProvisioning.objects.filter(versi=provisioning.VERSION).exists())
+
+    def test_provisioning_is_idempotent(self):
+        VersiProvisioning.objects.all().delete()
+        kurir = Kurir.objects.count()
+        self.assertTrue(provisioning.provision(django_apps, verbosity=0))
+        self.assertEqual(Kurir.objects.count(), kurir)
+        self.assertTrue(get_user_model().objects.get(username="pimpinan1").groups.filter(name="Pimpinan").exists())
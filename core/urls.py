@@ -1,6 +1,7 @@
 from django.urls import path
 from . import views_kurir
 from . import views
+from . import views_perf
 
 urlpatterns = [
     path("", views.index, name="beranda"),
@@ -24,4 +25,7 @@ urlpatterns = [
     path("vendor/logout/", views.vendor_logout, name="vendor_logout"),
     path("vendor/dashboard/", views.vendor_dashboard, name="vendor_dashboard"),
     path("vendor/keluhan/laporan/", views.vendor_keluhan_laporan, name="vendor_keluhan_laporan"),
+
+    # Statistik performa (staff)
+    path("perf/stats/", views_perf.perf_stats_view, name="perf_stats"),
 ]
\ No newline at end of file
@@ -0,0 +1,78 @@
+# core/versioning.py
+"""
+Stempel versi data untuk invalidasi cache.
+
+Setiap nama stempel (mis. "laporan_wilayah") punya angka versi yang dinaikkan
+setiap data terkait berubah, sehingga semua entri cache yang memakai versi
+lama otomatis tidak terpakai lagi. Cache di memori proses seperti
+core.refdata dan core.report_cache hanya benar karena kuncinya memakai angka
+bersama ini.
+
+Penghitungnya baris VersiData: kenaikan memakai UPDATE ... versi + 1 di
+database, jadi atomik antar proses dan tidak ada kenaikan yang hilang.
+Salinannya disimpan tanpa kedaluwarsa di cache VERSION_CACHE_ALIAS (file di
+bawah BASE_DIR, lihat settings.CACHES) agar pembacaan tidak butuh query.
+Setelah menulis salinan, penulis membaca ulang database dan menulis lagi
+bila angkanya sudah naik; penulis terakhir selalu melihat angka terbaru,
+jadi salinan tidak tertinggal walaupun dua proses menaikkan bersamaan.
+
+Naikkan versi setelah commit (bump_on_commit): bila dinaikkan di dalam
+transaksi, proses lain bisa membangun ulang cache dari data lama dengan
+versi baru, dan rollback tetap menaikkan versi.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import F
+
+KEY_PREFIX = "data-version:"
+
+
+def _cache():
+    return caches[settings.VERSION_CACHE_ALIAS]
+
+
+def _stored(name):
+    from .models import VersiData
+
+    version = VersiData.objects.filter(nama=name).values_list("versi", flat=True).first()
+    if version is None:
+        # Mulai dari waktu sekarang (ms) supaya tidak bertabrakan dengan versi
+        # yang masih tersimpan di proses lain bila database dibuat ulang.
+        row, _ = VersiData.objects.get_or_create(nama=name, defaults={"versi": int(time.time() * 1000)})
+        version = row.versi
+    return version
+
+
+def _publish(name, version):
+    cache = _cache()
+    while True:
+        cache.set(KEY_PREFIX + name, version, timeout=None)
+        current = _stored(name)
+        if current == version:
+            return version
+        version = current
+
+
+def get_version(name):
+    version = _cache().get(KEY_PREFIX + name)
+    if version is None:
+        version = _publish(name, _stored(name))
+    return version
+
+
+def bump_version(name):
+    from .models import VersiData
+
+    rows = VersiData.objects.filter(nama=name)
+    if not rows.update(versi=F("versi") + 1):
+        _stored(name)
+        rows.update(versi=F("versi") + 1)
+    return _publish(name, _stored(name))
+
+
+def bump_on_commit(name, using=None):
+    """bump_version(name) setelah transaksi yang sedang berjalan di-commit."""
+    transaction.on_commit(lambda: bump_version(name), using=using)
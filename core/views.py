@@ -4,13 +4,17 @@ from django.http import HttpResponseForbidden
 from django.contrib.auth.hashers import make_password, check_password
 from . import models
 from .forms import LoginPembeliForm, KeluhanForm, PembeliRegisterForm
+from .pagination import CURSOR_PARAM, keyset_page
 from functools import wraps
-from .models import Pembeli, Vendor
 # Helper decorators
+# request.pembeli / request.vendor dipasang lazy oleh core.middleware.ActorMiddleware;
+# view di bawah decorator ini memakai objek yang sama tanpa query ulang.
 def pembeli_required(view_func):
     @wraps(view_func)
     def wrapper(request, *args, **kwargs):
-        if 'pembeli_id' not in request.session:
+        if not request.pembeli:
+            # Belum login, atau pembeli di session sudah dihapus
+            request.session.pop('pembeli_id', None)
             return redirect('pembeli_login')
         return view_func(request, *args, **kwargs)
     return wrapper
@@ -18,7 +22,8 @@ def pembeli_required(view_func):
 def vendor_required(view_func):
     @wraps(view_func)
     def wrapper(request, *args, **kwargs):
-        if 'vendor_id' not in request.session:
+        if not request.vendor:
+            request.session.pop('vendor_id', None)
             return redirect('vendor_login')
         return view_func(request, *args, **kwargs)
     return wrapper
@@ -31,34 +36,30 @@ def index(request):
     """
     Menampilkan halaman beranda (user_beranda.html) dengan personalisasi nama 
     berdasarkan user yang sedang login (Pembeli atau Vendor).
+
+    Nama diambil dari session (disimpan saat login), jadi halaman ini tidak
+    menjalankan query selain membaca session. Session lama tanpa nama
+    dilengkapi sekali dari request.pembeli / request.vendor.
     """
     nama_user = None
     user_type = None
-    
-    # 1. Cek apakah Pembeli/Pelanggan sedang login
-    pembeli_id = request.session.get('pembeli_id')
-    if pembeli_id:
-        try:
-            # Ambil objek Pelanggan berdasarkan ID sesi
-            pelanggan = Pembeli.objects.get(pk=pembeli_id)
-            nama_user = pelanggan.nama  # Asumsi field nama ada di model Pelanggan
-            user_type = 'Pembeli'
-        except Pembeli.DoesNotExist:
-            # Jika ID ada di sesi tapi objek tidak ditemukan (data error/hilang)
-            pass 
-
-    # 2. Cek apakah Vendor sedang login
-    vendor_id = request.session.get('vendor_id')
-    if vendor_id and not nama_user: # Prioritas Pembeli, jika belum dapat nama, cek Vendor
-        try:
-            # Ambil objek Vendor berdasarkan ID sesi
-            vendor = Vendor.objects.get(pk=vendor_id)
-            nama_user = vendor.nama # Asumsi field nama_vendor ada di model Vendor
-            user_type = 'Vendor'
-        except Vendor.DoesNotExist:
-            pass
 
-    # 3. Definisikan konteks untuk dikirim ke template
+    # Prioritas Pembeli, jika belum dapat nama, cek Vendor
+    for actor, label in (('pembeli', 'Pembeli'), ('vendor', 'Vendor')):
+        if f'{actor}_id' not in request.session:
+            continue
+        nama_key = f'{actor}_nama'
+        if nama_key not in request.session:
+            obj = getattr(request, actor)
+            if not obj:
+                # ID ada di sesi tapi objek tidak ditemukan (data error/hilang)
+                continue
+            request.session[nama_key] = obj.nama
+        nama_user = request.session[nama_key]
+        user_type = label
+        break
+
+    # Definisikan konteks untuk dikirim ke template
     context = {
         # Jika nama_user terisi, kirim nama tersebut. Jika tidak (belum login), 
         # nama akan tetap None, dan template akan menangani logika if/else nya.
@@ -116,9 +117,8 @@ def pembeli_logout(request):
 
 @pembeli_required
 def pembeli_dashboard(request):
-    pembeli_id = request.session.get('pembeli_id')
-    pembeli = models.Pembeli.objects.get(pk=pembeli_id)
-    faktur_list = models.Faktur.objects.filter(pembeli=pembeli).order_by('-id_faktur')[:5]  # Last 5 invoices
+    pembeli = request.pembeli
+    faktur_list = models.Faktur.objects.filter(pembeli=pembeli).select_related('vendor').order_by('-id_faktur')[:5]  # Last 5 invoices
 
     return render(request, 'pembeli/pembeli_dashboard.html', {
         'pembeli': pembeli,
@@ -127,11 +127,10 @@ def pembeli_dashboard(request):
 
 @pembeli_required
 def pembeli_keluhan_buat(request):
-    pembeli_id = request.session.get('pembeli_id')
-    pembeli = models.Pembeli.objects.get(pk=pembeli_id)
+    pembeli = request.pembeli
     
     # Filter Faktur hanya untuk Pembeli yang sedang login
-    faktur_pembeli = models.Faktur.objects.filter(pembeli=pembeli)
+    faktur_pembeli = models.Faktur.objects.filter(pembeli=pembeli).select_related('pembeli')
     
     if request.method == 'POST':
         # Instantiate Form dengan queryset yang sudah difilter
@@ -139,15 +138,7 @@ def pembeli_keluhan_buat(request):
         if form.is_valid():
             keluhan = form.save(commit=False)
             keluhan.pembeli = pembeli
-
-            # Logika KRITIS: Ambil ID dari objek Faktur yang dipilih dan simpan sebagai string
-            faktur_obj = form.cleaned_data.get('faktur')
-            if faktur_obj:
-                keluhan.faktur = str(faktur_obj.id_faktur)  # Menyimpan ID Faktur sebagai string
-            else:
-                keluhan.faktur = None  # Jika tidak ada faktur yang dipilih
-
-            # Simpan objek keluhan yang sudah dimodifikasi
+            # Faktur (opsional) sudah terisi oleh form sebagai foreign key
             keluhan.save()
             messages.success(request, "Keluhan Anda berhasil dikirim.")
             return redirect('pembeli_dashboard')
@@ -159,9 +150,12 @@ def pembeli_keluhan_buat(request):
 
 @pembeli_required
 def pembeli_keluhan_riwayat(request):
-    pembeli_id = request.session.get('pembeli_id')
-    pembeli = models.Pembeli.objects.get(pk=pembeli_id)
-    keluhan_list = models.Keluhan.objects.filter(pembeli=pembeli).order_by('-tanggal')
+    pembeli = request.pembeli
+    keluhan_list = keyset_page(
+        models.Keluhan.objects.filter(pembeli=pembeli),
+        request.GET.get(CURSOR_PARAM),
+        keys=('-tanggal', '-id_keluhan'),
+    )
 
     return render(request, 'pembeli/pembeli_keluhan_riwayat.html', {
         'pembeli': pembeli,
@@ -234,8 +228,7 @@ def vendor_logout(request):
 
 @vendor_required
 def vendor_dashboard(request):
-    vendor_id = request.session.get('vendor_id')
-    vendor = models.Vendor.objects.get(pk=vendor_id)
+    vendor = request.vendor
 
     return render(request, 'vendor/vendor_dashboard.html', {
         'vendor': vendor
@@ -243,13 +236,14 @@ def vendor_dashboard(request):
 
 @vendor_required
 def vendor_keluhan_laporan(request):
-    vendor_id = request.session.get('vendor_id')
-    vendor = models.Vendor.objects.get(pk=vendor_id)
+    vendor = request.vendor
     
-    # Get keluhan related to this vendor's faktur
-    keluhan_list = models.Keluhan.objects.filter(
-        pembeli__faktur__vendor=vendor
-    ).distinct().order_by('-tanggal')
+    # Keluhan yang menunjuk faktur milik vendor ini (satu join lewat index faktur_id)
+    keluhan_list = keyset_page(
+        models.Keluhan.objects.filter(faktur__vendor=vendor).select_related('pembeli'),
+        request.GET.get(CURSOR_PARAM),
+        keys=('-tanggal', '-id_keluhan'),
+    )
 
     return render(request, 'vendor/vendor_keluhan_laporan.html', {
         'vendor': vendor,
@@ -2,8 +2,33 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.auth import logout
 from django.http import HttpResponseForbidden
+from django.db.models import Q
 from django.views.decorators.http import require_POST
+from functools import wraps
 from .models import Kurir, Faktur, DetailFaktur
+from .pagination import CURSOR_PARAM, keyset_page
+
+# Urutan dashboard: pengiriman yang masih diproses lebih dulu, lalu selesai, lalu dibatalkan
+KURIR_SEGMENTS = [Q(status=status) for status, _ in Faktur.STATUS_CHOICES]
+
+
+def kurir_required(view_func):
+    """
+    Tolak request tanpa kurir aktif di session.
+
+    Kurir dimuat sekali (request.kurir, lazy dari ActorMiddleware) agar
+    kurir yang dihapus atau dinonaktifkan admin langsung keluar, termasuk
+    bila session kurir disimpan di cookie (KURIR_SESSION_ENGINE).
+    """
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if not request.session.get("kurir_id"):
+            return redirect("kurir_login")
+        if not request.kurir or not request.kurir.aktif:
+            request.session.flush()
+            return redirect("kurir_login")
+        return view_func(request, *args, **kwargs)
+    return wrapper
 
 
 # ========== LOGIN KURIR ==========
@@ -28,12 +53,17 @@ def kurir_login(request):
 
 
 # ========== DASHBOARD KURIR ==========
+@kurir_required
 def kurir_dashboard(request):
-    kurir_id = request.session.get("kurir_id")
-    if not kurir_id:
-        return redirect("kurir_login")
+    kurir_id = request.session["kurir_id"]
 
-    faktur_list = Faktur.objects.filter(kurir_id=kurir_id).select_related("pembeli", "vendor")
+    # Keyset per (status, id_faktur) memakai index core_faktur_kurir_idx
+    faktur_list = keyset_page(
+        Faktur.objects.filter(kurir_id=kurir_id).select_related("pembeli", "vendor"),
+        request.GET.get(CURSOR_PARAM),
+        keys=("-id_faktur",),
+        segments=KURIR_SEGMENTS,
+    )
 
     return render(request, "core/kurir/dashboard.html", {
         "faktur_list": faktur_list,
@@ -42,12 +72,11 @@ def kurir_dashboard(request):
 
 
 # ========== DETAIL FAKTUR ==========
+@kurir_required
 def kurir_faktur_detail(request, faktur_id):
-    kurir_id = request.session.get("kurir_id")
-    if not kurir_id:
-        return redirect("kurir_login")
+    kurir_id = request.session["kurir_id"]
 
-    faktur = get_object_or_404(Faktur, id_faktur=faktur_id)
+    faktur = get_object_or_404(Faktur.objects.select_related("pembeli", "vendor"), id_faktur=faktur_id)
 
     # Cegah akses faktur milik kurir lain
     if faktur.kurir_id != kurir_id:
@@ -64,10 +93,9 @@ def kurir_faktur_detail(request, faktur_id):
 
 # ========== UPDATE STATUS + FOTO PENGIRIMAN ==========
 @require_POST
+@kurir_required
 def kurir_update_status(request, faktur_id):
-    kurir_id = request.session.get("kurir_id")
-    if not kurir_id:
-        return redirect("kurir_login")
+    kurir_id = request.session["kurir_id"]
 
     faktur = get_object_or_404(Faktur, id_faktur=faktur_id)
 
@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+
+from .instrumentation import perf_stats
+
+
+# ========== STATISTIK PERFORMA (staff) ==========
+@staff_member_required
+def perf_stats_view(request):
+    """Persentil waktu request per nama URL dari jendela bergulir proses ini."""
+    return JsonResponse({
+        "window": settings.PERF_STATS_WINDOW,
+        "views": perf_stats.snapshot(),
+    }, json_dumps_params={"indent": 2})